@@ -2,6 +2,7 @@
 
 import os
 from dotenv import load_dotenv
+from app.utils.db_pool import build_engine_options
 
 load_dotenv()
 
@@ -11,10 +12,116 @@ POSTGRES_HOST = os.getenv('COMPETITION_POSTGRES_HOST',"localhost")
 POSTGRES_PORT = os.getenv('POSTGRES_PORT',"5432")
 POSTGRES_DB = os.getenv('COMPETITION_POSTGRES_DB',"competition")
 
+# Pool de conexiones y timeouts del servidor
+DB_POOL_SIZE = int(os.getenv('COMPETITION_DB_POOL_SIZE', 10))
+DB_MAX_OVERFLOW = int(os.getenv('COMPETITION_DB_MAX_OVERFLOW', 20))
+DB_POOL_TIMEOUT = int(os.getenv('COMPETITION_DB_POOL_TIMEOUT', 30))  # segundos esperando una conexión libre
+DB_POOL_RECYCLE = int(os.getenv('COMPETITION_DB_POOL_RECYCLE', 1800))  # segundos de vida de una conexión
+DB_POOL_PRE_PING = os.getenv('COMPETITION_DB_POOL_PRE_PING', "si") == "si"
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv('COMPETITION_DB_STATEMENT_TIMEOUT_MS', 30000))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.getenv('COMPETITION_DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000))
+# "si" cuando la app se conecta a través de PgBouncer en modo transaction pooling
+DB_PGBOUNCER = os.getenv('COMPETITION_DB_PGBOUNCER', "no") == "si"
+
+# Réplicas de lectura opcionales: URLs completas separadas por comas
+REPLICA_URIS = [url.strip() for url in os.getenv('COMPETITION_POSTGRES_REPLICA_URLS', "").split(",") if url.strip()]
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv('COMPETITION_DB_REPLICA_MAX_LAG_SECONDS', 5))
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('COMPETITION_DB_REPLICA_LAG_CHECK_INTERVAL', 2))
+
+# Archivo frío de respuestas de competencias finalizadas. El directorio debe ser un volumen
+# compartido (NFS, EFS, etc.) por el scheduler y todas las réplicas web: el scheduler lo escribe
+# y cualquier réplica lo lee. Si falta el archivo de un quiz archivado, la lectura responde 503.
+ANSWERS_ARCHIVE_DIR = os.getenv('COMPETITION_ANSWERS_ARCHIVE_DIR', "archive/answers")
+# Solo los archivos de hasta este tamaño (comprimidos) se cachean decodificados; los demás se leen en streaming
+ANSWERS_ARCHIVE_CACHE_MAX_BYTES = int(os.getenv('COMPETITION_ANSWERS_ARCHIVE_CACHE_MAX_BYTES', 256 * 1024))
+ANSWERS_ARCHIVE_BATCH_SIZE = int(os.getenv('COMPETITION_ANSWERS_ARCHIVE_BATCH_SIZE', 5000))
+ANSWERS_ARCHIVE_INTERVAL_HOURS = int(os.getenv('COMPETITION_ANSWERS_ARCHIVE_INTERVAL_HOURS', 6))
+# Creación anticipada (y retiro) de las particiones de respuestas
+ANSWERS_PARTITION_INTERVAL_MINUTES = int(os.getenv('COMPETITION_ANSWERS_PARTITION_INTERVAL_MINUTES', 10))
+
+# Inscripción masiva: máximo de IDs aceptados por request
+BULK_ENROLL_MAX_IDS = int(os.getenv('COMPETITION_BULK_ENROLL_MAX_IDS', 50000))
+# Finalización por lotes: máximo de envíos aceptados por request
+BATCH_FINISH_MAX_SUBMISSIONS = int(os.getenv('COMPETITION_BATCH_FINISH_MAX_SUBMISSIONS', 1000))
+# Margen tras el end_time del quiz admitido en el finished_at declarado (desfase de relojes de los dispositivos)
+BATCH_FINISH_GRACE_SECONDS = int(os.getenv('COMPETITION_BATCH_FINISH_GRACE_SECONDS', 60))
+
+# Ranking en vivo por SSE (LISTEN/NOTIFY). Con PgBouncer en modo transacción LISTEN no funciona:
+# COMPETITION_LEADERBOARD_LISTEN_URL debe apuntar directo al primario.
+LEADERBOARD_LISTEN_URI = os.getenv('COMPETITION_LEADERBOARD_LISTEN_URL', "")
+LEADERBOARD_STREAM_MAX_CLIENTS = int(os.getenv('COMPETITION_LEADERBOARD_STREAM_MAX_CLIENTS', 500))  # por worker
+# Tipo de worker y hilos de gunicorn (gunicorn.conf.py los define). Cada cliente SSE retiene un hilo:
+# con 'sync' el stream se desactiva y con 'gthread' el cupo queda en threads - 2. Vacío: servidor de desarrollo.
+WEB_WORKER_CLASS = os.getenv('COMPETITION_WEB_WORKER_CLASS', "")
+WEB_THREADS = int(os.getenv('COMPETITION_WEB_THREADS', 1))
+LEADERBOARD_STREAM_QUEUE_SIZE = int(os.getenv('COMPETITION_LEADERBOARD_STREAM_QUEUE_SIZE', 100))  # eventos pendientes por cliente
+LEADERBOARD_STREAM_HEARTBEAT_SECONDS = float(os.getenv('COMPETITION_LEADERBOARD_STREAM_HEARTBEAT_SECONDS', 15))
+
+# Logging: nivel global, niveles por módulo ("scheduler=DEBUG,app.access=WARNING") y formato (json/text)
+LOG_LEVEL = os.getenv('COMPETITION_LOG_LEVEL', "INFO").upper()
+LOG_LEVELS = os.getenv('COMPETITION_LOG_LEVELS', "")
+LOG_FORMAT = os.getenv('COMPETITION_LOG_FORMAT', "json")
+
+# Presupuesto de consultas SQL por request: global y por endpoint ("competition.get_competitions=5,...").
+# 0 lo desactiva. Con DB_QUERY_BUDGET_ENFORCE = "si" exceder el presupuesto lanza un error (desarrollo/tests).
+DB_QUERY_BUDGET = int(os.getenv('COMPETITION_DB_QUERY_BUDGET', 50))
+DB_QUERY_BUDGETS = os.getenv('COMPETITION_DB_QUERY_BUDGETS', "")
+
+# Las métricas se agregan entre workers de gunicorn vía PROMETHEUS_MULTIPROC_DIR (lo define
+# gunicorn.conf.py). Cada cuánto muestrea cada worker sus gauges de estado (pool, clientes SSE).
+METRICS_SAMPLE_SECONDS = float(os.getenv('COMPETITION_METRICS_SAMPLE_SECONDS', 5))
+
 class Config:
     SQLALCHEMY_DATABASE_URI = f"postgresql+psycopg2://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SEED_DB = os.getenv("COMPETITION_SEED_DB", "no")
+    # "si": el proceso web también ejecuta el scheduler (cómodo en desarrollo)
+    RUN_SCHEDULER = os.getenv("COMPETITION_RUN_SCHEDULER", "si")
+
+    DB_STATEMENT_TIMEOUT_MS = DB_STATEMENT_TIMEOUT_MS
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = DB_IDLE_IN_TRANSACTION_TIMEOUT_MS
+    DB_PGBOUNCER = DB_PGBOUNCER
+    SQLALCHEMY_ENGINE_OPTIONS = build_engine_options(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        statement_timeout_ms=DB_STATEMENT_TIMEOUT_MS,
+        idle_in_transaction_timeout_ms=DB_IDLE_IN_TRANSACTION_TIMEOUT_MS,
+        pgbouncer=DB_PGBOUNCER,
+    )
+
+    SQLALCHEMY_REPLICA_URIS = REPLICA_URIS
+    DB_REPLICA_MAX_LAG_SECONDS = DB_REPLICA_MAX_LAG_SECONDS
+    DB_REPLICA_LAG_CHECK_INTERVAL = DB_REPLICA_LAG_CHECK_INTERVAL
+
+    ANSWERS_ARCHIVE_DIR = ANSWERS_ARCHIVE_DIR
+    ANSWERS_ARCHIVE_CACHE_MAX_BYTES = ANSWERS_ARCHIVE_CACHE_MAX_BYTES
+    ANSWERS_ARCHIVE_BATCH_SIZE = ANSWERS_ARCHIVE_BATCH_SIZE
+    ANSWERS_ARCHIVE_INTERVAL_HOURS = ANSWERS_ARCHIVE_INTERVAL_HOURS
+    ANSWERS_PARTITION_INTERVAL_MINUTES = ANSWERS_PARTITION_INTERVAL_MINUTES
+
+    BULK_ENROLL_MAX_IDS = BULK_ENROLL_MAX_IDS
+    BATCH_FINISH_MAX_SUBMISSIONS = BATCH_FINISH_MAX_SUBMISSIONS
+    BATCH_FINISH_GRACE_SECONDS = BATCH_FINISH_GRACE_SECONDS
+
+    LEADERBOARD_LISTEN_URI = LEADERBOARD_LISTEN_URI
+    LEADERBOARD_STREAM_MAX_CLIENTS = LEADERBOARD_STREAM_MAX_CLIENTS
+    LEADERBOARD_STREAM_QUEUE_SIZE = LEADERBOARD_STREAM_QUEUE_SIZE
+    LEADERBOARD_STREAM_HEARTBEAT_SECONDS = LEADERBOARD_STREAM_HEARTBEAT_SECONDS
+    WEB_WORKER_CLASS = WEB_WORKER_CLASS
+    WEB_THREADS = WEB_THREADS
+
+    METRICS_SAMPLE_SECONDS = METRICS_SAMPLE_SECONDS
+
+    DB_QUERY_BUDGET = DB_QUERY_BUDGET
+    DB_QUERY_BUDGETS = DB_QUERY_BUDGETS
+    DB_QUERY_BUDGET_ENFORCE = os.getenv("COMPETITION_DB_QUERY_BUDGET_ENFORCE", "si") == "si"
+
+    LOG_LEVEL = LOG_LEVEL
+    LOG_LEVELS = LOG_LEVELS
+    LOG_FORMAT = LOG_FORMAT
 
 
 
@@ -29,6 +136,10 @@ class TestingConfig(Config):
 class ProductionConfig(Config):
     # SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     DEBUG = False
+    # En producción el scheduler corre como proceso separado (flask run_scheduler)
+    RUN_SCHEDULER = os.getenv("COMPETITION_RUN_SCHEDULER", "no")
+    # En producción solo se registra un warning
+    DB_QUERY_BUDGET_ENFORCE = os.getenv("COMPETITION_DB_QUERY_BUDGET_ENFORCE", "no") == "si"
 
 config_dict = {
     'development': DevelopmentConfig,
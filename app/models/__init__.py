@@ -4,3 +4,4 @@ from .competition_quiz import CompetitionQuiz
 from .competition_participant import CompetitionParticipant
 from .competition_quiz_participants import CompetitionQuizParticipants
 from .competition_quiz_answer import CompetitionQuizAnswer
+from .competition_quiz_question_stats import CompetitionQuizQuestionStats
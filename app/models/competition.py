@@ -1,8 +1,8 @@
 from extensions import db
 from sqlalchemy.orm import validates, relationship
 from datetime import datetime, timezone
-from app.utils.lib.pretty import pretty_print_dict
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy import update, or_
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 from app.models.competition_quiz import CompetitionQuiz
 from app.models.competition_participant import CompetitionParticipant
 from dateutil import parser
@@ -35,6 +35,8 @@ class Competition(db.Model):
 
     # Límite de participantes (0 significa sin límite)
     participant_limit = db.Column(db.Integer, nullable=False, default=0)
+    # Contador desnormalizado de inscriptos, mantenido con UPDATE atómicos (ver add_participant)
+    participant_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     # Coste de inscripción
     currency_cost = db.Column(db.Integer, nullable=False, default=100)
@@ -48,6 +50,7 @@ class Competition(db.Model):
     __table_args__ = (
         db.Index('idx_state_end_date', 'state', 'end_date'),  # Índice combinado
         db.CheckConstraint('participant_limit >= 0', name='check_participant_limit_positive'),
+        db.CheckConstraint('participant_count >= 0', name='check_participant_count_positive'),
         db.CheckConstraint('currency_cost >= 0', name='check_currency_cost_positive'),
         db.CheckConstraint('ticket_cost >= 0', name='check_ticket_cost_positive'),
         db.CheckConstraint('credit_cost >= 0', name='check_credit_cost_positive'),
@@ -109,17 +112,52 @@ class Competition(db.Model):
         db.session.delete(quiz)
         db.session.commit()
 
+    @classmethod
+    def reserve_participant_slot(cls, competition_id):
+        """
+        Incrementa participant_count solo si queda cupo, en un único UPDATE condicional.
+        El UPDATE bloquea la fila de la competencia hasta el commit, por lo que dos
+        inscripciones concurrentes no pueden superar participant_limit.
+
+        :return: Nuevo valor de participant_count, o None si no hay cupo (o no existe la competencia).
+        """
+        return db.session.execute(
+            update(cls)
+            .where(
+                cls.id == competition_id,
+                or_(cls.participant_limit == 0, cls.participant_count < cls.participant_limit)
+            )
+            .values(participant_count=cls.participant_count + 1)
+            .returning(cls.participant_count)
+            .execution_options(synchronize_session=False)
+        ).scalar_one_or_none()
+
+    @classmethod
+    def release_participant_slot(cls, competition_id):
+        """
+        Decrementa participant_count de forma atómica.
+        """
+        db.session.execute(
+            update(cls)
+            .where(cls.id == competition_id, cls.participant_count > 0)
+            .values(participant_count=cls.participant_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+
     def add_participant(self, participant_id):
         """
         Inscribe un participante en la competencia.
         """
-        if self.participant_limit > 0 and len(self.participants) >= self.participant_limit:
+        if Competition.reserve_participant_slot(self.id) is None:
+            db.session.rollback()
             raise ValueError("Se ha alcanzado el límite de participantes.")
-        if CompetitionParticipant.query.filter_by(competition_id=self.id, participant_id=participant_id).first():
-            raise ValueError(f"El participante {participant_id} ya está inscrito en la competencia {self.id}.")
         new_participant = CompetitionParticipant(competition_id=self.id, participant_id=participant_id)
         db.session.add(new_participant)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            raise ValueError(f"El participante {participant_id} ya está inscrito en la competencia {self.id}.")
 
     def remove_participant(self, participant_id):
         """
@@ -129,6 +167,7 @@ class Competition(db.Model):
         if not participant:
             raise ValueError(f"El participante {participant_id} no está inscrito en la competencia {self.id}.")
         db.session.delete(participant)
+        Competition.release_participant_slot(self.id)
         db.session.commit()
 
     def set_state(self, new_state):
@@ -149,8 +188,7 @@ class Competition(db.Model):
 
    
     def __repr__(self):
-        pretty_print_dict(self.to_dict())
-        return ""
+        return f"<Competition {self.id} - {self.title} ({self.state})>"
 
     def to_dict(self):
         return {
@@ -165,6 +203,7 @@ class Competition(db.Model):
             "start_date": safe_date_isoformat(self.start_date),
             "end_date": safe_date_isoformat(self.end_date),
             "participant_limit": self.participant_limit,
+            "participant_count": self.participant_count,
             "currency_cost": self.currency_cost,
             "ticket_cost": self.ticket_cost,
             "credit_cost": self.credit_cost,
@@ -33,6 +33,12 @@ class CompetitionParticipant(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('competition_id', 'participant_id', name='uq_competition_participant'),  # Evita duplicados
+        # Ranking: WHERE competition_id = ? ORDER BY score DESC, resuelto solo con el índice
+        db.Index(
+            'idx_competition_participants_ranking', 'competition_id', db.text('score DESC'),
+            postgresql_include=['participant_id']
+        ),
+        db.Index('idx_competition_participants_participant', 'participant_id'),  # Búsquedas por participante
     )
 
     def __repr__(self):
@@ -40,6 +40,8 @@ class CompetitionQuiz(db.Model):
 
     start_time = db.Column(db.DateTime(timezone=True), nullable=True)
     end_time = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Momento en que las respuestas se movieron al archivo frío (None = siguen en la base)
+    answers_archived_at = db.Column(db.DateTime(timezone=True), nullable=True)
     created_at = db.Column(
         db.DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
@@ -64,6 +66,11 @@ class CompetitionQuiz(db.Model):
     __table_args__ = (
         db.UniqueConstraint('competition_id', 'quiz_id', name='uq_competition_quiz'),  # Evita duplicados
         db.CheckConstraint('time_limit >= 0', name='check_time_limit_positive'),
+        # Índice parcial para el scheduler: status = 'ACTIVO' AND end_time <= now()
+        db.Index(
+            'idx_competition_quizzes_active_end_time', 'end_time',
+            postgresql_where=db.text("status = 'ACTIVO'")
+        ),
     )
 
     # Validaciones
@@ -1,12 +1,39 @@
+import logging
+import re
 from extensions import db
 from datetime import datetime, timezone
+from sqlalchemy import text, select, delete, exists, func, or_
+from app.models.competition import Competition
+
+logger = logging.getLogger(__name__)
 
 class CompetitionQuizAnswer(db.Model):
+    """
+    Respuestas de los participantes. La tabla está particionada por RANGE (competition_id), con una
+    partición por competencia: al archivar o purgar una competencia finalizada sus respuestas se quitan
+    con DETACH PARTITION ... CONCURRENTLY y DROP, sin borrarlas fila por fila. competition_id repite el
+    del quiz para poder particionar por él; las consultas deben filtrar siempre con of_quiz (competencia
+    y quiz) para que Postgres descarte las demás particiones.
+
+    Las particiones no se crean en el camino de las requests (el DDL toma un lock exclusivo sobre la
+    tabla padre): el job de mantenimiento (`flask maintain_answer_partitions`, también en el scheduler
+    y en init_db) las crea por adelantado para los próximos PARTITIONS_AHEAD ids de competencia. Por
+    encima de ellas, OVERFLOW_PARTITION ([primer id sin partición, MAXVALUE)) recibe las respuestas de
+    las competencias que se adelanten al job. No hay partición DEFAULT: con una, Postgres no permite
+    DETACH CONCURRENTLY.
+
+    db.create_all() crea la tabla padre sin ninguna partición, donde todo INSERT falla:
+    usar las migraciones, que crean las particiones de las competencias existentes y la de desborde.
+    """
     __tablename__ = 'competition_quiz_answers'
+    OVERFLOW_PARTITION = 'competition_quiz_answers_overflow'
+    PARTITIONS_AHEAD = 50  # Ids de competencia con partición creada por delante del próximo a asignar
 
-    id = db.Column(db.Integer, primary_key=True)
+    # La clave de partición debe formar parte de la clave primaria
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    competition_id = db.Column(db.Integer, primary_key=True, nullable=False)  # Igual al del quiz
     competition_quiz_id = db.Column(
-        db.Integer, 
+        db.Integer,
         db.ForeignKey('competition_quizzes.id'),  # Relación directa con el quiz de la competencia
         nullable=False
     )
@@ -26,14 +53,222 @@ class CompetitionQuizAnswer(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint(
-            'competition_quiz_id', 
-            'participant_id', 
-            'question_id', 
+            'competition_id',
+            'competition_quiz_id',
+            'participant_id',
+            'question_id',
             name='uq_quiz_participant_answer'
         ),  # Evita respuestas duplicadas a la misma pregunta
         db.Index('idx_quiz_participant', 'competition_quiz_id', 'participant_id'),  # Búsquedas rápidas
+        # Paginación por cursor y exportación: ORDER BY created_at, id dentro de un quiz
+        db.Index('idx_quiz_answers_keyset', 'competition_quiz_id', 'created_at', 'id'),
+        {'postgresql_partition_by': 'RANGE (competition_id)'},
     )
 
+    @classmethod
+    def of_quiz(cls, quiz):
+        """
+        Condiciones para filtrar las respuestas de un quiz (CompetitionQuiz o fila con id y
+        competition_id). Incluyen la clave de partición: sin ella Postgres revisa cada partición.
+        """
+        return cls.competition_id == quiz.competition_id, cls.competition_quiz_id == quiz.id
+
+    # Particiones
+
+    @classmethod
+    def partition_name(cls, competition_id):
+        return f"{cls.__tablename__}_c{int(competition_id)}"
+
+    @classmethod
+    def existing_partitions(cls, connection):
+        """
+        :return: (ids de competencia con partición propia, ordenados; primer id de la partición de
+                 desborde, o None si la tabla no tiene particiones).
+        """
+        rows = connection.execute(text(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ), {"parent": cls.__tablename__}).all()
+        prefix = f"{cls.__tablename__}_c"
+        own = sorted(int(name[len(prefix):]) for name, _ in rows if name.startswith(prefix))
+        overflow_start = next(
+            (int(re.search(r"FROM \((\d+)\)", bound).group(1)) for name, bound in rows if name == cls.OVERFLOW_PARTITION),
+            None
+        )
+        return own, overflow_start
+
+    @staticmethod
+    def _next_competition_id(connection):
+        # La secuencia puede estar por delante de MAX(id): se toma la que más avanzó
+        return connection.execute(text(
+            "SELECT GREATEST("
+            "COALESCE((SELECT MAX(id) FROM competitions), 0), "
+            "COALESCE(pg_sequence_last_value(CAST(pg_get_serial_sequence('competitions', 'id') AS regclass)), 0)"
+            ") + 1"
+        )).scalar()
+
+    @classmethod
+    def ensure_partitions(cls, connection, loaded=()):
+        """
+        Crea las particiones de las competencias que hoy caen en la de desborde y de los próximos
+        PARTITIONS_AHEAD ids de competencia, y corre la de desborde por encima de ellas.
+
+        Correr la de desborde la desadjunta un momento (lock exclusivo sobre la tabla padre), así que
+        solo se hace cuando quedan menos de PARTITIONS_AHEAD / 2 particiones libres por delante.
+
+        :param loaded: Ids de competencia cuyas tablas se crearon sueltas (create_detached_partition)
+                       y ya tienen filas: se adjuntan en lugar de crearse.
+        :return: Nombres de las particiones creadas o adjuntadas.
+        """
+        if connection.dialect.name != 'postgresql':
+            return []
+        _, overflow_start = cls.existing_partitions(connection)
+        if overflow_start is None:
+            return []
+        next_id = cls._next_competition_id(connection)
+        if not loaded and overflow_start - next_id >= cls.PARTITIONS_AHEAD // 2:
+            return []
+
+        end = next_id + cls.PARTITIONS_AHEAD
+        # Los ids entre medio que no son competencias no se van a asignar: quedan sin partición
+        competition_ids = set(connection.execute(
+            select(Competition.id).where(Competition.id >= overflow_start)
+        ).scalars())
+        competition_ids.update(range(max(overflow_start, next_id), end))
+        return cls._split_overflow(connection, sorted(competition_ids), end, set(loaded))
+
+    @classmethod
+    def _split_overflow(cls, connection, competition_ids, end, loaded):
+        parent, overflow = cls.__tablename__, cls.OVERFLOW_PARTITION
+        connection.execute(text(f"ALTER TABLE {parent} DETACH PARTITION {overflow}"))
+        created = []
+        for competition_id in competition_ids:
+            name = cls.partition_name(competition_id)
+            bounds = f"FOR VALUES FROM ({competition_id}) TO ({competition_id + 1})"
+            if competition_id in loaded:
+                # Construye sus índices y valida la FK de una sola vez
+                connection.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {name} {bounds}"))
+            else:
+                connection.execute(text(f"CREATE TABLE {name} PARTITION OF {parent} {bounds}"))
+            created.append(name)
+        # Respuestas de competencias que se adelantaron al job: pasan a su partición
+        moved = connection.execute(text(
+            f"WITH moved AS (DELETE FROM {overflow} WHERE competition_id < {end} RETURNING *) "
+            f"INSERT INTO {parent} SELECT * FROM moved"
+        )).rowcount
+        connection.execute(text(f"ALTER TABLE {parent} ATTACH PARTITION {overflow} FOR VALUES FROM ({end}) TO (MAXVALUE)"))
+        if moved:
+            logger.warning("%s respuestas movidas de %s a sus particiones", moved, overflow)
+        return created
+
+    @classmethod
+    def maintain_partitions(cls, session, lock_timeout_ms=5000):
+        """
+        Pasada del job de mantenimiento: crea las particiones que faltan, en una sola transacción.
+        Con lock_timeout, si una request tiene tomada la tabla, la pasada falla rápido (y se reintenta
+        en la próxima) en vez de encolar a las requests detrás de ella.
+
+        Las particiones de competencias finalizadas las elimina el archivado (drop_competition_answers).
+
+        :return: Nombres de las particiones creadas.
+        """
+        connection = session.connection()
+        try:
+            if connection.dialect.name == 'postgresql':
+                connection.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout_ms)}"))
+            created = cls.ensure_partitions(connection)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        return created
+
+    @classmethod
+    def create_detached_partition(cls, connection, competition_id):
+        """
+        Crea la tabla de una competencia sin adjuntarla, para cargas masivas: sin índices ni FK
+        por fila, COPY es mucho más rápido. Luego se adjunta con ensure_partitions(loaded=...),
+        que construye los índices y valida la FK de una sola vez.
+        """
+        connection.execute(text(
+            f"CREATE TABLE {cls.partition_name(competition_id)} "
+            f"(LIKE {cls.__tablename__} INCLUDING DEFAULTS)"
+        ))
+
+    @classmethod
+    def drop_competition_answers(cls, session, competition_id, batch_size=5000):
+        """
+        Elimina todas las respuestas de una competencia. Si tiene partición propia, la desadjunta con
+        DETACH PARTITION ... CONCURRENTLY (no bloquea a las demás competencias) y la elimina; si sus
+        filas quedaron en la partición de desborde, las borra en lotes (delete_in_batches).
+
+        DETACH CONCURRENTLY no puede correr dentro de una transacción: se usa una conexión en
+        autocommit, y antes se cierra la transacción de la sesión.
+
+        :return: True si se eliminó una partición, False si se borró en lotes.
+        """
+        session.commit()
+        if db.engine.dialect.name == 'postgresql' and cls._drop_partition(cls.partition_name(competition_id)):
+            return True
+        cls.delete_in_batches(session, competition_id, batch_size)
+        return False
+
+    @classmethod
+    def stored_for(cls, competition_id):
+        """
+        Condición SQL: la competencia todavía tiene respuestas en la base, porque su partición propia
+        existe (aunque ya esté desadjuntada) o porque tiene filas en la de desborde.
+
+        :param competition_id: Columna o valor con el id de la competencia.
+        """
+        return or_(
+            func.to_regclass(func.concat(f"{cls.__tablename__}_c", competition_id)).isnot(None),
+            exists().where(cls.competition_id == competition_id),
+        )
+
+    @classmethod
+    def _drop_partition(cls, name):
+        with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            pending = connection.execute(text(
+                "SELECT inhdetachpending FROM pg_inherits "
+                "WHERE inhrelid = to_regclass(:name) AND inhparent = CAST(:parent AS regclass)"
+            ), {"name": name, "parent": cls.__tablename__}).scalar()
+            if pending is not None:
+                # Un DETACH CONCURRENTLY interrumpido deja la partición pendiente: se completa con FINALIZE
+                mode = "FINALIZE" if pending else "CONCURRENTLY"
+                connection.execute(text(f"ALTER TABLE {cls.__tablename__} DETACH PARTITION {name} {mode}"))
+            # También cubre una pasada anterior que llegó a desadjuntarla pero no a eliminarla
+            if not connection.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar():
+                return False
+            connection.execute(text(f"DROP TABLE {name}"))
+            return True
+
+    @classmethod
+    def delete_in_batches(cls, session, competition_id, batch_size=5000):
+        """
+        Borra las respuestas de una competencia en lotes de `batch_size`, con un commit por lote,
+        para no generar una transacción gigante. Solo para filas sin partición propia (en la de
+        desborde): en otro caso usar drop_competition_answers.
+
+        :return: Cantidad de filas borradas.
+        """
+        batch_ids = (
+            select(cls.id)
+            .where(cls.competition_id == competition_id)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        stmt = delete(cls).where(cls.competition_id == competition_id, cls.id.in_(batch_ids))
+
+        total = 0
+        while True:
+            deleted = session.execute(stmt, execution_options={"synchronize_session": False}).rowcount
+            session.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
+
     def __repr__(self):
         return f"<CompetitionQuizAnswer Quiz {self.competition_quiz_id} - Participante {self.participant_id} - Pregunta {self.question_id} - Respuesta {self.answer_id}>"
 
@@ -44,4 +279,5 @@ class CompetitionQuizAnswer(db.Model):
             "participant_id": self.participant_id,
             "answer_id": self.answer_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
-        }
\ No newline at end of file
+        }
+
@@ -35,6 +35,16 @@ class CompetitionQuizParticipants(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('competition_quiz_id', 'participant_id', name='uq_competition_quiz_participant'),  # Evita inscripciones duplicadas
+        # Orden por puntaje dentro de un quiz (process_quiz_results y ranking por quiz)
+        db.Index(
+            'idx_cqp_quiz_score', 'competition_quiz_id', db.text('score DESC'),
+            postgresql_include=['participant_id', 'end_time', 'score_competition']
+        ),
+        # Historial de un participante: WHERE participant_id = ? ORDER BY end_time DESC, resuelto solo con el índice
+        db.Index(
+            'idx_cqp_participant_history', 'participant_id', 'end_time', 'id',
+            postgresql_include=['competition_quiz_id', 'score', 'score_competition', 'start_time', 'updated_at']
+        ),
     )
 
     def __repr__(self):
@@ -0,0 +1,44 @@
+from extensions import db
+from datetime import datetime, timezone
+from sqlalchemy.dialects.postgresql import JSONB
+
+class CompetitionQuizQuestionStats(db.Model):
+    """
+    Estadísticas precalculadas por pregunta de un quiz de competencia: intentos, aciertos
+    y distribución de las respuestas elegidas. Se calculan al procesar el quiz (COMPUTABLE)
+    y se sirven desde esta tabla, sin recorrer las respuestas.
+    """
+    __tablename__ = 'competition_quiz_question_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    competition_quiz_id = db.Column(
+        db.Integer,
+        db.ForeignKey('competition_quizzes.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    question_id = db.Column(db.Integer, nullable=False)  # ID de la pregunta (del MS de quizzes)
+    attempts = db.Column(db.Integer, nullable=False, default=0)  # Respuestas recibidas
+    correct = db.Column(db.Integer, nullable=False, default=0)  # Respuestas correctas
+    # {answer_id: cantidad de participantes que la eligieron}
+    answer_distribution = db.Column(JSONB, nullable=False, default=dict)
+    computed_at = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint('competition_quiz_id', 'question_id', name='uq_quiz_question_stats'),
+    )
+
+    def __repr__(self):
+        return f"<CompetitionQuizQuestionStats Quiz {self.competition_quiz_id} - Pregunta {self.question_id}>"
+
+    def to_dict(self):
+        return {
+            "question_id": self.question_id,
+            "attempts": self.attempts,
+            "correct": self.correct,
+            "accuracy": round(self.correct / self.attempts, 4) if self.attempts else None,
+            "answers": self.answer_distribution,
+        }
@@ -1,17 +1,20 @@
+import logging
 from flask import Blueprint, request, jsonify
-from app.models import CompetitionQuiz
 from app.services.competition_quiz import CompetitionQuizService
 from werkzeug.exceptions import NotFound, BadRequest
+from app.utils.errors.CustomException import QueryBudgetExceeded
+from app.utils.lib.streaming import stream_json_response
 
 competition_quiz_bp = Blueprint('competition_quiz', __name__)
+logger = logging.getLogger(__name__)
 
 @competition_quiz_bp.route('', methods=['GET'])
 def list_competition_quizzes():
-    print("🔎 xxxxxxGET /competition-quiz llamado")
-    quizzes = CompetitionQuiz.query.all()
-    quizzes_list = [q.to_dict() for q in quizzes]
-    print(f"🔎 Se encontraron {len(quizzes_list)} CompetitionQuiz")
-    return jsonify({"quizzes": quizzes_list}), 200
+    """
+    Lista todos los CompetitionQuiz en streaming: { "quizzes": [...] } o NDJSON si se pide.
+    """
+    quizzes = CompetitionQuizService.get_all_competition_quizzes()
+    return stream_json_response(quizzes, wrap_key="quizzes")
 
 @competition_quiz_bp.route('/<int:competition_quiz_id>', methods=['PATCH'])
 def update_competition_quiz(competition_quiz_id):
@@ -19,19 +22,33 @@ def update_competition_quiz(competition_quiz_id):
     Actualiza los campos start_time, end_time y time_limit de un CompetitionQuiz.
     Request JSON esperado: { "start_time": ..., "end_time": ..., "time_limit": ... }
     """
-    print(f"XXXXXXXXXXX PUT /competition-quiz/{competition_quiz_id} llamado")
     data = request.get_json()
     if not data:
-        print("❌ No se recibieron datos JSON válidos")
         return jsonify({"msg": "Datos inválidos."}), 400
     try:
-        print(f"🔄 Actualizando CompetitionQuiz con ID {competition_quiz_id}...")
         updated_quiz = CompetitionQuizService.update_competition_quiz(competition_quiz_id, data)
-        print(f"✅ CompetitionQuiz actualizado: {updated_quiz.to_dict()}")
-        return jsonify({"msg": "CompetitionQuiz actualizado correctamente.", "quiz": updated_quiz.to_dict()}), 200
+        quiz_data = updated_quiz.to_dict()
+        logger.info("CompetitionQuiz %s actualizado", competition_quiz_id)
+        return jsonify({"msg": "CompetitionQuiz actualizado correctamente.", "quiz": quiz_data}), 200
     except (NotFound, BadRequest) as e:
-        print(f"❌ Error esperado: {str(e)}")
+        logger.info("No se pudo actualizar CompetitionQuiz %s: %s", competition_quiz_id, e)
         return jsonify({"msg": str(e)}), 400
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
-        print(f"❌ Error inesperado: {str(e)}")
+        logger.exception("Error inesperado actualizando CompetitionQuiz %s", competition_quiz_id)
         return jsonify({"msg": f"Error inesperado: {str(e)}"}), 500
+
+@competition_quiz_bp.route('/<int:competition_quiz_id>/stats', methods=['GET'])
+def get_competition_quiz_stats(competition_quiz_id):
+    """
+    Estadísticas por pregunta de un quiz procesado: intentos, aciertos, porcentaje de acierto
+    y cantidad de participantes que eligió cada respuesta.
+    """
+    try:
+        stats = CompetitionQuizService.get_question_stats(competition_quiz_id)
+        return jsonify(stats), 200
+    except NotFound as e:
+        return jsonify({"msg": str(e.description)}), 404
+    except BadRequest as e:
+        return jsonify({"msg": str(e.description)}), 400
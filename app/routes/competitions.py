@@ -1,7 +1,9 @@
 # Importaciones necesarias
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify
 from app.services import CompetitionService, CompetitionParticipantService, CompetitionQuizService
 from werkzeug.exceptions import NotFound, BadRequest
+from app.utils.errors.CustomException import QueryBudgetExceeded
+from app.utils.lib.streaming import stream_json_response
 
 # Blueprint para agrupar las rutas relacionadas con "Competition"
 competition_bp = Blueprint('competition', __name__)
@@ -42,6 +44,10 @@ def create_competition():
             "msg": "Competition created successfully.",
             "competition": competition.to_dict()
         }), 201
+    except BadRequest as e:
+        return jsonify({"msg": "Invalid data.", "error": e.description}), 400
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"msg": "An error occurred.", "error": str(e)}), 500
 
@@ -56,14 +62,18 @@ def get_all_competitions():
     Método: GET
     Endpoint: /competitions/
 
+    La lista se envía en streaming desde un cursor de servidor (array JSON, o NDJSON con
+    ?format=ndjson / Accept: application/x-ndjson) y se comprime según Accept-Encoding.
+
     Respuestas:
     - 200: Lista de competencias
     - 500: Error al obtener los datos
     """
     try:
         competitions = CompetitionService.get_all_competitions()
-        result = [competition.to_dict() for competition in competitions]
-        return jsonify(result), 200
+        return stream_json_response(competitions)
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"msg": "An error occurred.", "error": str(e)}), 500
 
@@ -85,6 +95,8 @@ def get_competition_by_id(id):
     try:
         competition = CompetitionService.get_competition(id)
         return jsonify(competition.to_dict()), 200
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"msg": f"Error fetching competition: {str(e)}"}), 400
 
@@ -115,6 +127,8 @@ def update_competition(id):
             "msg": "Competition updated successfully.",
             "competition": updated_competition.to_dict()
         }), 200
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"msg": f"Error updating competition: {str(e)}"}), 400
 
@@ -136,6 +150,8 @@ def delete_competition(id):
     try:
         CompetitionService.delete_competition(id)
         return jsonify({"msg": "Competition deleted successfully."}), 200
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"msg": f"Error deleting competition: {str(e)}"}), 400
 
@@ -160,9 +176,43 @@ def add_participant_to_competition(competition_id, participant_id):
             "msg": "Participant added to competition successfully.",
             "participant": participant.to_dict()
         }), 201
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"msg": f"Error adding participant to competition: {str(e)}"}), 400
 
+# --------------------------------------------
+# 📌 Ruta: Inscribir muchos participantes en una competencia
+# --------------------------------------------
+@competition_bp.route('/<int:competition_id>/participants', methods=['POST'])
+def add_participants_to_competition(competition_id):
+    """
+    Inscribe una lista de participantes en una competencia, en una sola transacción.
+
+    Método: POST
+    Endpoint: /competitions/<competition_id>/participants
+
+    Request JSON esperado:
+    {
+        "participant_ids": [1, 2, 3, ...]
+    }
+
+    Respuestas:
+    - 200: Resultado por participante ("enrolled", "already_registered" o "limit_reached")
+    - 400: Lista inválida
+    - 404: Competencia no encontrada
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        result = CompetitionParticipantService.add_participants_to_competition(
+            competition_id, data.get("participant_ids")
+        )
+        return jsonify({"msg": "Bulk enrollment processed.", **result}), 200
+    except NotFound as e:
+        return jsonify({"msg": str(e.description)}), 404
+    except BadRequest as e:
+        return jsonify({"msg": f"Error adding participants to competition: {e.description}"}), 400
+
 # --------------------------------------------
 # 📌 Ruta: Obtener ranking de una competencia
 # --------------------------------------------
@@ -181,9 +231,54 @@ def get_competition_ranking(competition_id):
     try:
         ranking = CompetitionParticipantService.get_competition_ranking_with_quizzes_computables(competition_id)
         return jsonify(ranking), 200
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({"msg": f"Error fetching competition ranking: {str(e)}"}), 400
 
+# --------------------------------------------
+# 📡 Ruta: Ranking en vivo (Server-Sent Events)
+# --------------------------------------------
+@competition_bp.route('/<int:competition_id>/ranking/stream', methods=['GET'])
+def stream_competition_ranking(competition_id):
+    """
+    Envía el ranking de una competencia por Server-Sent Events, en lugar de consultarlo periódicamente.
+
+    Método: GET
+    Endpoint: /competitions/<competition_id>/ranking/stream
+
+    Eventos:
+    - snapshot: al conectarse, el ranking completo [{participant_id, score, rank}]
+    - delta: cada vez que se procesan resultados, solo los participantes cuyo puntaje o puesto
+      cambió (changed) y los que ya no están (removed)
+    Cada conexión retiene un hilo del worker: con workers sync el stream está desactivado y con
+    gthread admite hasta COMPETITION_WEB_THREADS - 2 clientes. Para muchos clientes, servir esta
+    ruta desde un proceso aparte (muchos hilos o COMPETITION_WEB_WORKER_CLASS=gevent).
+
+    Respuestas:
+    - 200: Stream text/event-stream
+    - 404: Competencia no encontrada
+    - 503: Stream desactivado en este servidor, o se alcanzó el máximo de clientes del worker
+    """
+    hub = current_app.extensions['leaderboard_hub']
+    if not hub.enabled:
+        return jsonify({"msg": "El ranking en vivo no está disponible en este servidor: consultar /ranking."}), 503
+
+    try:
+        CompetitionService.get_competition(competition_id)
+    except NotFound as e:
+        return jsonify({"msg": str(e)}), 404
+
+    client = hub.subscribe(competition_id)
+    if client is None:
+        return jsonify({"msg": "Demasiados clientes conectados, reintentar más tarde."}), 503, {"Retry-After": "5"}
+
+    return Response(
+        hub.events(competition_id, client),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
 # --------------------------------------------
 # 📚 Ruta: Obtener competencias de un usuario
 # --------------------------------------------
@@ -222,6 +317,8 @@ def get_user_competitions(user_id):
         # Por ejemplo, estado inválido
         return jsonify({ "msg": str(ve) }), 400
 
+    except QueryBudgetExceeded:
+        raise
     except Exception as e:
         return jsonify({
             "msg": "Error al obtener competencias del usuario",
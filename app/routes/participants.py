@@ -0,0 +1,31 @@
+from flask import Blueprint, request, jsonify
+from app.services import ParticipantHistoryService
+from werkzeug.exceptions import BadRequest
+
+# 📦 Blueprint para consultas centradas en un participante (a través de todas sus competencias)
+participant_bp = Blueprint('participant', __name__)
+
+# -------------------------------------------------------
+# 📜 Historial de resultados de un participante (paginado por cursor)
+# GET /<participant_id>/history?per_page=50&cursor=<next_cursor>
+# -------------------------------------------------------
+@participant_bp.route('/<int:participant_id>/history', methods=['GET'])
+def get_participant_history(participant_id):
+    """
+    Devuelve los quizzes finalizados por un participante en todas sus competencias, del más reciente
+    al más antiguo, con su puntaje, el puntaje para la competencia, los tiempos y su puesto actual
+    en cada competencia.
+
+    Parámetros opcionales:
+    - cursor: el next_cursor de la página anterior (sin cursor se obtiene la primera página)
+    - per_page: cantidad de resultados por página (por defecto 50, máximo 1000)
+    """
+    try:
+        result = ParticipantHistoryService.get_history(
+            participant_id=participant_id,
+            cursor=request.args.get('cursor'),
+            per_page=request.args.get('per_page', 50, type=int)
+        )
+        return jsonify(result), 200
+    except BadRequest as e:
+        return jsonify({"error": e.description}), 400
@@ -1,6 +1,11 @@
 from flask import Blueprint, request, jsonify
 from app.services import CompetitionQuizParticipantService
-from werkzeug.exceptions import BadRequest, NotFound
+from werkzeug.exceptions import BadRequest, NotFound, ServiceUnavailable
+from app.utils.lib.streaming import (
+    stream_json_response, wants_stream, stream_download_response, csv_chunks, ndjson_chunks,
+    CSV_MIMETYPE, NDJSON_MIMETYPE
+)
+from app.services.answer_archive_service import ARCHIVE_COLUMNS
 
 # 📦 Blueprint para rutas relacionadas con la participación en quizzes dentro de competencias
 quiz_participation_bp = Blueprint('quiz', __name__)
@@ -57,6 +62,44 @@ def finish_quiz(competition_quiz_id, participant_id):
     except (BadRequest, NotFound) as e:
         return jsonify({"error": str(e)}), e.code if hasattr(e, 'code') else 400
 
+# -------------------------------------------------------
+# 🗂️ Finalizar un quiz para muchos participantes (envíos sin conexión)
+# POST /<competition_quiz_id>/finish-batch
+# -------------------------------------------------------
+@quiz_participation_bp.route('/<int:competition_quiz_id>/finish-batch', methods=['POST'])
+def finish_quiz_batch(competition_quiz_id):
+    """
+    Finaliza el quiz de una competencia para varios participantes en una sola request.
+
+    El cuerpo de la solicitud debe incluir un JSON con la siguiente estructura:
+    {
+        "submissions": [
+            {
+                "participant_id": 1,
+                "finished_at": "2025-05-01T10:15:00Z",
+                "answers": [
+                    {"question_id": 1, "answer_id": 1},
+                    {"question_id": 2, "answer_id": 2}
+                ]
+            }
+        ]
+    }
+
+    Devuelve un resultado por envío ("finished" con su resumen, o "error" con el motivo).
+    """
+    data = request.get_json(silent=True)
+    if not data or 'submissions' not in data:
+        return jsonify({"error": "Missing submissions in request body"}), 400
+
+    try:
+        result = CompetitionQuizParticipantService.finish_quiz_batch(
+            competition_quiz_id=competition_quiz_id,
+            submissions=data['submissions']
+        )
+        return jsonify(result), 200
+    except (BadRequest, NotFound) as e:
+        return jsonify({"error": str(e)}), e.code if hasattr(e, 'code') else 400
+
 # -------------------------------------------------------
 # 🔍 Obtener respuestas de un participante específico
 # GET /<competition_quiz_id>/participant/<participant_id>/answers
@@ -74,32 +117,91 @@ def get_user_quiz_answers(competition_quiz_id, participant_id):
         return jsonify(answers), 200
     except (BadRequest, NotFound) as e:
         return jsonify({"error": str(e)}), e.code if hasattr(e, 'code') else 400
+    except ServiceUnavailable as e:  # Quiz archivado cuyo archivo no está disponible en este host
+        return jsonify({"error": e.description}), 503
 
 # -------------------------------------------------------
-# 📋 Obtener todas las respuestas del quiz (paginado)
-# GET /<competition_quiz_id>/answers?page=1&per_page=50
+# 📋 Obtener todas las respuestas del quiz (paginado por cursor)
+# GET /<competition_quiz_id>/answers?per_page=50&cursor=<next_cursor>
 # -------------------------------------------------------
 @quiz_participation_bp.route('/<int:competition_quiz_id>/answers', methods=['GET'])
 def get_all_quiz_answers(competition_quiz_id):
     """
-    Devuelve todas las respuestas enviadas en un quiz específico (soporta paginación).
+    Devuelve todas las respuestas enviadas en un quiz específico, paginadas por cursor.
 
     Parámetros opcionales:
-    - page: número de página (por defecto 1)
-    - per_page: cantidad de respuestas por página (por defecto 50)
+    - cursor: el next_cursor de la página anterior (sin cursor se obtiene la primera página)
+    - per_page: cantidad de respuestas por página (por defecto 50, máximo 1000)
+    - include_total: si es true, incluye el total de respuestas (requiere un COUNT)
+    - page (obsoleto): número de página, como antes de la paginación por cursor. Se acepta
+      durante la transición (se ignora si hay cursor): responde además total, pages,
+      current_page y next_cursor, con el header Deprecation
+    - stream: si es true (o se pide NDJSON con ?format=ndjson / Accept), se envían todas
+      las respuestas en streaming, sin paginar, comprimidas según Accept-Encoding
     """
-    page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
-    
+    include_total = request.args.get('include_total', '').lower() in ('1', 'true', 'si')
+    page = request.args.get('page', type=int)
+
     try:
+        if wants_stream():
+            answers = CompetitionQuizParticipantService.iter_all_for_quiz(competition_quiz_id)
+            return stream_json_response(answers, serialize=lambda answer: answer, wrap_key="answers")
+
         result = CompetitionQuizParticipantService.get_all_for_quiz(
             competition_quiz_id=competition_quiz_id,
-            page=page,
-            per_page=per_page
+            cursor=request.args.get('cursor'),
+            per_page=per_page,
+            include_total=include_total,
+            page=page
         )
-        return jsonify(result), 200
+        response = jsonify(result)
+        if "current_page" in result:  # Se respondió con la paginación por número de página
+            response.headers['Deprecation'] = 'true'
+        return response, 200
+    except BadRequest as e:
+        return jsonify({"error": e.description}), 400
     except NotFound as e:
         return jsonify({"error": str(e)}), 404
+    except ServiceUnavailable as e:
+        return jsonify({"error": e.description}), 503
+
+# -------------------------------------------------------
+# 📤 Exportar todas las respuestas del quiz (CSV o NDJSON)
+# GET /<competition_quiz_id>/answers/export
+# -------------------------------------------------------
+@quiz_participation_bp.route('/<int:competition_quiz_id>/answers/export', methods=['GET'])
+def export_quiz_answers(competition_quiz_id):
+    """
+    Descarga todas las respuestas de un quiz en una sola pasada, en streaming.
+
+    Parámetros opcionales:
+    - format: csv (por defecto) o ndjson
+    - gzip: si es true, el archivo se entrega comprimido (.gz); si no, se comprime
+      el transporte según Accept-Encoding
+    """
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({"error": "format debe ser csv o ndjson"}), 400
+    gzip_file = request.args.get('gzip', '').lower() in ('1', 'true', 'si')
+
+    try:
+        rows = CompetitionQuizParticipantService.iter_answers_export(competition_quiz_id)
+    except NotFound as e:
+        return jsonify({"error": str(e)}), 404
+    except ServiceUnavailable as e:
+        return jsonify({"error": e.description}), 503
+
+    filename = f"competition_quiz_{competition_quiz_id}_answers.{fmt}"
+    if fmt == 'csv':
+        rows = ((*row[:-1], row[-1].isoformat()) for row in rows)
+        return stream_download_response(csv_chunks(ARCHIVE_COLUMNS, rows), CSV_MIMETYPE, filename, gzip_file)
+
+    answers = (
+        {**dict(zip(ARCHIVE_COLUMNS, row)), "created_at": row[-1].isoformat()}
+        for row in rows
+    )
+    return stream_download_response(ndjson_chunks(answers), NDJSON_MIMETYPE, filename, gzip_file)
 
 # -------------------------------------------------------
 # 📚 Obtener detalle completo del quiz respondido por un usuario
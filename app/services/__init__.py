@@ -2,3 +2,5 @@ from .competition import CompetitionService
 from .competition_participant_service import CompetitionParticipantService
 from .competition_quiz_participant_service import CompetitionQuizParticipantService
 from .competition_quiz import CompetitionQuizService
+from .answer_archive_service import AnswerArchiveService
+from .participant_history_service import ParticipantHistoryService
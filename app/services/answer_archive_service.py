@@ -0,0 +1,319 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+import zlib
+from bisect import bisect_left
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+
+from flask import current_app
+from sqlalchemy import select, exists
+from werkzeug.exceptions import ServiceUnavailable
+from extensions import db
+from app.models import Competition, CompetitionQuiz, CompetitionQuizAnswer
+
+logger = logging.getLogger(__name__)
+
+# Formato del archivo: JSON columnar comprimido con gzip, un archivo por CompetitionQuiz.
+# Guardar columnas (y no filas) agrupa valores parecidos y comprime mucho mejor.
+# Una línea de cabecera y luego una línea por bloque de filas (columnas del bloque), para poder
+# leerlo en streaming sin cargar el quiz entero. Versión 3: cabecera y bloques son miembros gzip
+# separados (el archivo sigue siendo un gzip válido) y la cabecera indexa cada bloque con su
+# posición y los participantes que contiene, así que buscar a un participante descomprime solo
+# sus bloques. La versión 2 no tiene índice y la 1 es una sola línea: se leen completas.
+ARCHIVE_FORMAT_VERSION = 3
+ARCHIVE_COLUMNS = ('id', 'participant_id', 'question_id', 'answer_id', 'is_correct', 'created_at')
+
+
+class AnswerArchiveService:
+
+    @staticmethod
+    def archive_path(competition_quiz_id):
+        return os.path.join(
+            current_app.config['ANSWERS_ARCHIVE_DIR'],
+            f"competition_quiz_{int(competition_quiz_id)}.cols.json.gz"
+        )
+
+    @staticmethod
+    def archive_finished_competitions():
+        """
+        Archiva las respuestas de todos los quizzes de competencias 'finalizada' que sigan en la base
+        y, con todos los quizzes de una competencia archivados, elimina su partición.
+
+        La eliminación no depende de lo archivado en esta pasada: se eliminan las respuestas de toda
+        competencia finalizada y archivada que aún las tenga, así una pasada interrumpida entre el
+        archivado y la eliminación se completa en la siguiente.
+
+        :return: Dict {competition_quiz_id: filas archivadas}.
+        """
+        quizzes = db.session.scalars(
+            select(CompetitionQuiz)
+            .join(Competition, Competition.id == CompetitionQuiz.competition_id)
+            .where(
+                Competition.state == 'finalizada',
+                CompetitionQuiz.answers_archived_at.is_(None)
+            )
+            .order_by(CompetitionQuiz.competition_id, CompetitionQuiz.id)
+        ).all()
+
+        archived = {}
+        for quiz in quizzes:
+            archived[quiz.id] = AnswerArchiveService.archive_quiz(quiz)
+
+        batch_size = current_app.config['ANSWERS_ARCHIVE_BATCH_SIZE']
+        for competition_id in AnswerArchiveService._archived_competitions_with_answers():
+            CompetitionQuizAnswer.drop_competition_answers(db.session, competition_id, batch_size)
+        return archived
+
+    @staticmethod
+    def _archived_competitions_with_answers():
+        """
+        :return: Ids de las competencias finalizadas, con todos sus quizzes archivados, cuyas
+                 respuestas siguen en la base.
+        """
+        unarchived = exists().where(
+            CompetitionQuiz.competition_id == Competition.id,
+            CompetitionQuiz.answers_archived_at.is_(None)
+        )
+        return db.session.scalars(
+            select(Competition.id)
+            .where(
+                Competition.state == 'finalizada',
+                ~unarchived,
+                CompetitionQuizAnswer.stored_for(Competition.id)
+            )
+            .order_by(Competition.id)
+        ).all()
+
+    @staticmethod
+    def archive_quiz(quiz):
+        """
+        Exporta las respuestas de un quiz al archivo frío y lo marca como archivado. Las filas
+        siguen en Postgres hasta que se elimina la partición de su competencia.
+
+        :return: Cantidad de filas archivadas.
+        """
+        rows = db.session.execute(
+            select(*(getattr(CompetitionQuizAnswer, name) for name in ARCHIVE_COLUMNS))
+            .where(*CompetitionQuizAnswer.of_quiz(quiz))
+            .order_by(CompetitionQuizAnswer.created_at.asc(), CompetitionQuizAnswer.id.asc())
+            .execution_options(yield_per=current_app.config['ANSWERS_ARCHIVE_BATCH_SIZE'])
+        )
+        archived = AnswerArchiveService._write_archive(quiz.id, rows.partitions())
+
+        # El archivo ya está escrito: a partir de aquí las lecturas se sirven desde él
+        quiz.answers_archived_at = datetime.now(timezone.utc)
+        db.session.commit()
+        return archived
+
+    @staticmethod
+    def _write_archive(competition_quiz_id, batches):
+        """
+        Escribe el archivo de un quiz, un bloque por cada lote de filas (en el orden de ARCHIVE_COLUMNS).
+
+        Los bloques se comprimen primero a un archivo temporal, porque la cabecera (que va delante)
+        lleva su posición y sus participantes; después se arma el archivo final.
+
+        :return: Cantidad de filas escritas.
+        """
+        path = AnswerArchiveService.archive_path(competition_quiz_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        header = {
+            "version": ARCHIVE_FORMAT_VERSION,
+            "competition_quiz_id": competition_quiz_id,
+            "columns": list(ARCHIVE_COLUMNS),
+            "blocks": [],  # {offset (desde el fin de la cabecera), size, participants (ordenados)}
+        }
+        total = offset = 0
+        # Escritura atómica: nunca queda un archivo a medio escribir en la ruta final
+        tmp_path, blocks_path = f"{path}.tmp", f"{path}.blocks.tmp"
+        with open(blocks_path, 'wb') as blocks:
+            for batch in batches:
+                columns = {name: list(values) for name, values in zip(ARCHIVE_COLUMNS, zip(*batch))}
+                columns['created_at'] = [_to_micros(value) for value in columns['created_at']]
+                data = _compress_line(columns)
+                header["blocks"].append({
+                    "offset": offset,
+                    "size": len(data),
+                    "participants": sorted(set(columns['participant_id'])),
+                })
+                blocks.write(data)
+                offset += len(data)
+                total += len(batch)
+        with open(tmp_path, 'wb') as f, open(blocks_path, 'rb') as blocks:
+            f.write(_compress_line(header))
+            shutil.copyfileobj(blocks, f)
+        os.remove(blocks_path)
+        os.replace(tmp_path, path)
+        return total
+
+    @staticmethod
+    def get_answers(competition_quiz_id, participant_id):
+        """
+        Devuelve las respuestas archivadas de un participante en un quiz, con el mismo formato
+        que CompetitionQuizAnswer.to_dict y ordenadas por (created_at, id).
+
+        Con el índice de la cabecera solo se descomprimen los bloques que lo contienen (sus
+        respuestas se guardan juntas al finalizar, así que suelen ser uno o dos). Los archivos
+        sin índice (versiones 1 y 2) se recorren completos.
+
+        :raises ServiceUnavailable: Si el archivo no está en ANSWERS_ARCHIVE_DIR.
+        """
+        path = AnswerArchiveService.archive_path(competition_quiz_id)
+        stat = _stat_archive(path)
+        index = _load_index(path, stat.st_mtime)
+        if index is None:
+            answers = AnswerArchiveService.iter_answers(competition_quiz_id)
+        else:
+            answers = _iter_indexed_answers(path, index, participant_id)
+        return [answer for answer in answers if answer["participant_id"] == participant_id]
+
+    @staticmethod
+    def iter_answers(competition_quiz_id):
+        """
+        Recorre las respuestas archivadas de un quiz (formato de CompetitionQuizAnswer.to_dict),
+        en orden (created_at, id). La existencia del archivo se valida antes de empezar a iterar.
+
+        Los archivos de hasta ANSWERS_ARCHIVE_CACHE_MAX_BYTES (comprimidos) se decodifican una vez
+        y quedan cacheados; los más grandes se leen en streaming de a un bloque, así que la memoria
+        usada no depende del tamaño del quiz.
+
+        :raises ServiceUnavailable: Si el archivo no está en ANSWERS_ARCHIVE_DIR.
+        """
+        path = AnswerArchiveService.archive_path(competition_quiz_id)
+        stat = _stat_archive(path)
+        if stat.st_size <= current_app.config['ANSWERS_ARCHIVE_CACHE_MAX_BYTES']:
+            return iter(_load_archive(path, stat.st_mtime))
+        return _iter_answers(path)
+
+    @staticmethod
+    def iter_rows(competition_quiz_id):
+        """
+        Devuelve las respuestas archivadas de un quiz como tuplas con todas las columnas de
+        ARCHIVE_COLUMNS (created_at como datetime), en orden (created_at, id), leyendo el
+        archivo de a un bloque.
+
+        :raises ServiceUnavailable: Si el archivo no está en ANSWERS_ARCHIVE_DIR.
+        """
+        path = AnswerArchiveService.archive_path(competition_quiz_id)
+        _stat_archive(path)
+        return _iter_rows(path)
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_micros(value):
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(value):
+    return _EPOCH + timedelta(microseconds=value)
+
+
+def _stat_archive(path):
+    """
+    El quiz figura como archivado pero el archivo no está: ANSWERS_ARCHIVE_DIR no es un volumen
+    compartido por todos los hosts (o se perdió). Las respuestas existen, así que no es un 404.
+    """
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        logger.error("No se encontró el archivo de respuestas %s", path)
+        raise ServiceUnavailable("Archived answers are not available right now.")
+
+
+def _iter_blocks(path):
+    """
+    Recorre el archivo y entrega las columnas de cada bloque, de a uno.
+
+    :return: Generador de (competition_quiz_id, columnas del bloque).
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header["version"] == 1:  # Todo el quiz en una sola línea
+            yield header["competition_quiz_id"], header["columns"]
+            return
+        for line in f:
+            yield header["competition_quiz_id"], json.loads(line)
+
+
+def _iter_rows(path):
+    for _, columns in _iter_blocks(path):
+        columns['created_at'] = map(_from_micros, columns['created_at'])
+        yield from zip(*(columns[name] for name in ARCHIVE_COLUMNS))
+
+
+def _iter_answers(path):
+    for competition_quiz_id, columns in _iter_blocks(path):
+        yield from _block_answers(competition_quiz_id, columns)
+
+
+def _block_answers(competition_quiz_id, columns):
+    for answer_id, participant_id, chosen_answer_id, created_at in zip(
+        columns['id'], columns['participant_id'], columns['answer_id'], columns['created_at']
+    ):
+        yield {
+            "id": answer_id,
+            "competition_quiz_id": competition_quiz_id,
+            "participant_id": participant_id,
+            "answer_id": chosen_answer_id,
+            "created_at": _from_micros(created_at).isoformat(),
+        }
+
+
+def _compress_line(value):
+    # Cada línea es un miembro gzip propio: concatenados siguen formando un gzip válido
+    return gzip.compress((json.dumps(value, separators=(',', ':')) + "\n").encode('utf-8'), compresslevel=9)
+
+
+def _iter_indexed_answers(path, index, participant_id):
+    """
+    Descomprime solo los bloques cuyo índice incluye al participante.
+    """
+    competition_quiz_id, start, blocks = index
+    with open(path, 'rb') as f:
+        for offset, size, participants in blocks:
+            position = bisect_left(participants, participant_id)
+            if position == len(participants) or participants[position] != participant_id:
+                continue
+            f.seek(start + offset)
+            yield from _block_answers(competition_quiz_id, json.loads(gzip.decompress(f.read(size))))
+
+
+@lru_cache(maxsize=64)
+def _load_index(path, mtime):
+    """
+    Lee solo la cabecera (el primer miembro gzip), cacheada por ruta y mtime.
+
+    :return: (competition_quiz_id, posición del primer bloque, [(offset, size, participantes)]),
+             o None si el archivo no tiene índice (versiones 1 y 2).
+    """
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    data, read = bytearray(), 0
+    with open(path, 'rb') as f:
+        while b"\n" not in data and (chunk := f.read(64 * 1024)):
+            read += len(chunk)
+            data += decompressor.decompress(chunk)
+        header = json.loads(bytes(data).split(b"\n", 1)[0])
+        if header["version"] < 3:
+            return None
+        # En la versión 3 la cabecera es todo el primer miembro gzip: falta a lo sumo su cola
+        while not decompressor.eof and (chunk := f.read(64 * 1024)):
+            read += len(chunk)
+            decompressor.decompress(chunk)
+    start = read - len(decompressor.unused_data)
+    return header["competition_quiz_id"], start, [
+        (block["offset"], block["size"], block["participants"]) for block in header["blocks"]
+    ]
+
+
+@lru_cache(maxsize=16)
+def _load_archive(path, mtime):
+    """
+    Decodifica un archivo chico (cacheado por ruta y mtime: si se reescribe, se vuelve a leer).
+    """
+    return tuple(_iter_answers(path))
@@ -1,9 +1,14 @@
 from dateutil import parser
 from datetime import timezone
-from .quiz_validator import validate_quiz_constraints
+from .quiz_validator import QuizConstraints
 from app.models import CompetitionQuiz
 
-def build_quiz_entry(competition, quiz_data, existing_quiz=None):
+def quiz_values(competition, quiz_data, existing_quiz=None, constraints=None):
+    """
+    Valida los datos de un quiz contra la competencia y devuelve los valores de sus columnas.
+
+    :param constraints: QuizConstraints precalculado de la competencia (para validar muchos quizzes).
+    """
     if 'quiz_id' not in quiz_data:
         raise ValueError("Falta quiz_id en los datos del cuestionario.")
 
@@ -15,8 +20,7 @@ def build_quiz_entry(competition, quiz_data, existing_quiz=None):
     if end_time and end_time.tzinfo is None:
         end_time = end_time.replace(tzinfo=timezone.utc)
 
-    validate_quiz_constraints(
-        competition,
+    (constraints or QuizConstraints(competition)).check(
         quiz_data['quiz_id'],
         start_time=start_time,
         end_time=end_time,
@@ -28,11 +32,40 @@ def build_quiz_entry(competition, quiz_data, existing_quiz=None):
     if quiz_data.get('time_limit', 0) < 0:
         raise ValueError("El tiempo límite no puede ser negativo.")
 
+    return {
+        "quiz_id": quiz_data['quiz_id'],
+        "start_time": start_time,
+        "end_time": end_time,
+        "time_limit": quiz_data.get('time_limit', 0),
+        "competition_id": competition.id,
+    }
+
+def build_quiz_entry(competition, quiz_data, existing_quiz=None):
+    values = quiz_values(competition, quiz_data, existing_quiz)
+
     quiz = existing_quiz if existing_quiz else CompetitionQuiz()
-    quiz.quiz_id = quiz_data['quiz_id']
-    quiz.start_time = start_time
-    quiz.end_time = end_time
-    quiz.time_limit = quiz_data.get('time_limit', 0)
-    quiz.competition_id = competition.id
+    for key, value in values.items():
+        setattr(quiz, key, value)
 
     return quiz
+
+def build_quiz_rows(competition, quizzes_data, existing_quiz_ids=()):
+    """
+    Valida en memoria todos los quizzes a agregar y devuelve sus filas, listas para un único INSERT.
+
+    :param existing_quiz_ids: quiz_id ya asociados a la competencia.
+    :raises ValueError: Si algún quiz es inválido o está repetido (no se inserta ninguno).
+    """
+    if not isinstance(quizzes_data, list):
+        raise ValueError("quizzes debe ser una lista.")
+
+    constraints = QuizConstraints(competition)
+    seen = set(existing_quiz_ids)
+    rows = []
+    for quiz_data in quizzes_data:
+        row = quiz_values(competition, quiz_data, constraints=constraints)
+        if row['quiz_id'] in seen:
+            raise ValueError(f"El quiz {row['quiz_id']} ya está asociado a esta competencia.")
+        seen.add(row['quiz_id'])
+        rows.append(row)
+    return rows
@@ -1,36 +1,84 @@
-from .quiz_builder import build_quiz_entry
-from .quiz_validator import validate_quiz_constraints
+from datetime import datetime, timezone
+from sqlalchemy import select, insert, update, delete
+from .quiz_builder import quiz_values
+from .quiz_validator import QuizConstraints
+from app.models import CompetitionQuiz
 from extensions import db
 
+UPDATABLE_FIELDS = {'start_time', 'end_time', 'time_limit'}
+
 def update_quizzes(competition, incoming_quizzes_data):
-    existing_quizzes = {q.quiz_id: q for q in competition.quizzes}
-    incoming_quiz_ids = {q['quiz_id'] for q in incoming_quizzes_data}
-    existing_quiz_ids = set(existing_quizzes.keys())
+    """
+    Sincroniza los quizzes de la competencia con la lista recibida: agrega los nuevos,
+    modifica los existentes que traen fechas/tiempo límite y elimina los que no vienen.
 
-    _add_new_quizzes(competition, incoming_quizzes_data, existing_quiz_ids)
-    _update_existing_quizzes(competition, incoming_quizzes_data, existing_quizzes)
-    _remove_deleted_quizzes(competition, existing_quizzes, incoming_quiz_ids)
+    El diff se calcula en una sola pasada y se valida completo antes de escribir; luego se aplica
+    con un INSERT, un UPDATE por clave primaria (executemany) y un DELETE, sin cargar los quizzes
+    como objetos del ORM.
+    """
+    adds, updates, removals = diff_quizzes(competition, incoming_quizzes_data)
+    _apply_quiz_diff(adds, updates, removals)
 
-def _add_new_quizzes(competition, incoming_quizzes_data, existing_quiz_ids):
-    for quiz_data in incoming_quizzes_data:
-        if quiz_data['quiz_id'] not in existing_quiz_ids:
-            quiz = build_quiz_entry(competition, quiz_data)
-            db.session.add(quiz)
+def diff_quizzes(competition, incoming_quizzes_data):
+    """
+    Compara los quizzes recibidos con los de la base y valida cada cambio.
 
-def _update_existing_quizzes(competition, incoming_quizzes_data, existing_quizzes):
+    :return: (filas a insertar, filas a actualizar con su id, ids a eliminar)
+    :raises ValueError: Si algún cambio no es válido (no se aplica ninguno).
+    """
+    existing_quizzes = {
+        row.quiz_id: row
+        for row in db.session.execute(
+            select(CompetitionQuiz.id, CompetitionQuiz.quiz_id, CompetitionQuiz.start_time)
+            .where(CompetitionQuiz.competition_id == competition.id)
+        )
+    }
+    constraints = QuizConstraints(competition)
+
+    adds, updates, seen = [], [], set()
     for quiz_data in incoming_quizzes_data:
+        if 'quiz_id' not in quiz_data:
+            raise ValueError("Falta quiz_id en los datos del cuestionario.")
         quiz_id = quiz_data['quiz_id']
-        if quiz_id in existing_quizzes and {'start_time', 'end_time', 'time_limit'} & quiz_data.keys():
-            existing_quiz = existing_quizzes[quiz_id]
-            build_quiz_entry(competition, quiz_data, existing_quiz)
+        if quiz_id in seen:
+            raise ValueError(f"El quiz {quiz_id} está repetido.")
+        seen.add(quiz_id)
+
+        existing_quiz = existing_quizzes.get(quiz_id)
+        if existing_quiz is None:
+            adds.append(quiz_values(competition, quiz_data, constraints=constraints))
+        elif UPDATABLE_FIELDS & quiz_data.keys():
+            values = quiz_values(competition, quiz_data, existing_quiz, constraints=constraints)
+            updates.append({
+                "id": existing_quiz.id,
+                "start_time": values['start_time'],
+                "end_time": values['end_time'],
+                "time_limit": values['time_limit'],
+            })
 
-def _remove_deleted_quizzes(competition, existing_quizzes, incoming_quiz_ids):
+    removals = []
     for quiz_id, quiz in existing_quizzes.items():
-        if quiz_id not in incoming_quiz_ids:
-            validate_quiz_constraints(
-                competition,
-                quiz_id=quiz.quiz_id,
-                existing_start_time=quiz.start_time,
-                is_removal=True
-            )
-            db.session.delete(quiz)
+        if quiz_id not in seen:
+            constraints.check(quiz_id, existing_start_time=quiz.start_time, is_removal=True)
+            removals.append(quiz.id)
+
+    return adds, updates, removals
+
+def _apply_quiz_diff(adds, updates, removals):
+    if removals:
+        # Los quizzes que se pueden eliminar no empezaron: no tienen respuestas
+        db.session.execute(
+            delete(CompetitionQuiz)
+            .where(CompetitionQuiz.id.in_(removals))
+            .execution_options(synchronize_session=False)
+        )
+
+    if updates:
+        now = datetime.now(timezone.utc)
+        for values in updates:
+            values['updated_at'] = now
+        db.session.execute(update(CompetitionQuiz), updates)
+
+    if adds:
+        # Las particiones de respuestas las crea por adelantado el job de mantenimiento
+        db.session.execute(insert(CompetitionQuiz), adds)
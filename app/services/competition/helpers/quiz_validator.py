@@ -1,40 +1,67 @@
 from datetime import datetime, timezone
 
-def validate_quiz_constraints(
-    competition, quiz_id,
-    start_time=None, end_time=None,
-    existing_start_time=None,
-    is_modifying=False,
-    is_removal=False
-):
-    now = datetime.now(timezone.utc)
 
-    competition_start = competition.start_date.astimezone(timezone.utc)
-    competition_end = competition.end_date.astimezone(timezone.utc)
+class QuizConstraints:
+    """
+    Reglas de alta, modificación y baja de quizzes de una competencia.
+    Los límites (ahora, fechas de la competencia en UTC, estado) se calculan una sola vez,
+    así validar cientos de quizzes no repite ese trabajo.
+    """
+    def __init__(self, competition, now=None):
+        self.now = now or datetime.now(timezone.utc)
+        self.state = competition.state
+        self.competition_start = competition.start_date.astimezone(timezone.utc)
+        self.competition_end = competition.end_date.astimezone(timezone.utc)
+
+    def check(
+        self, quiz_id,
+        start_time=None, end_time=None,
+        existing_start_time=None,
+        is_modifying=False,
+        is_removal=False
+    ):
+        now = self.now
+
+        if is_removal and self.state not in {'preparacion', 'lista'}:
+            raise ValueError(f"No se puede eliminar quizzes en estado '{self.state}'.")
+
+        if is_modifying and self.state not in {'preparacion', 'lista', 'en curso'}:
+            raise ValueError(f"No se pueden modificar quizzes cuando la competencia tiene estado '{self.state}'.")
 
-    if is_removal and competition.state not in {'preparacion', 'lista'}:
-        raise ValueError(f"No se puede eliminar quizzes en estado '{competition.state}'.")
-    
-    if is_modifying and competition.state not in {'preparacion', 'lista', 'en curso'}:
-        raise ValueError(f"No se pueden modificar quizzes cuando la competencia tiene estado '{competition.state}'.")
-    
-    if not is_removal and not is_modifying and competition.state not in {'preparacion', 'lista', 'en curso'}:
-        raise ValueError(f"No se pueden agregar quizzes en estado '{competition.state}'.")
+        if not is_removal and not is_modifying and self.state not in {'preparacion', 'lista', 'en curso'}:
+            raise ValueError(f"No se pueden agregar quizzes en estado '{self.state}'.")
 
-    if existing_start_time and existing_start_time <= now:
-        if is_modifying:
-            raise ValueError(f"No se puede modificar el quiz '{quiz_id}' porque ya ha comenzado.")
-        if is_removal:
-            raise ValueError(f"No se puede eliminar el quiz '{quiz_id}' porque ya ha comenzado.")
+        if existing_start_time and existing_start_time <= now:
+            if is_modifying:
+                raise ValueError(f"No se puede modificar el quiz '{quiz_id}' porque ya ha comenzado.")
+            if is_removal:
+                raise ValueError(f"No se puede eliminar el quiz '{quiz_id}' porque ya ha comenzado.")
 
-    if start_time and start_time <= now and is_modifying:
-        raise ValueError(f"No se puede asignar una fecha de inicio en el pasado ({quiz_id}).")
+        if start_time and start_time <= now and is_modifying:
+            raise ValueError(f"No se puede asignar una fecha de inicio en el pasado ({quiz_id}).")
 
-    if start_time and start_time < competition_start:
-        raise ValueError("La fecha de inicio del quiz no puede ser anterior a la de la competencia.")
+        if start_time and start_time < self.competition_start:
+            raise ValueError("La fecha de inicio del quiz no puede ser anterior a la de la competencia.")
 
-    if end_time and end_time > competition_end:
-        raise ValueError("La fecha de fin del quiz no puede ser posterior a la de la competencia.")
+        if end_time and end_time > self.competition_end:
+            raise ValueError("La fecha de fin del quiz no puede ser posterior a la de la competencia.")
 
-    if start_time and end_time and start_time > end_time:
-        raise ValueError("La fecha de inicio no puede ser posterior a la de fin.")
+        if start_time and end_time and start_time > end_time:
+            raise ValueError("La fecha de inicio no puede ser posterior a la de fin.")
+
+
+def validate_quiz_constraints(
+    competition, quiz_id,
+    start_time=None, end_time=None,
+    existing_start_time=None,
+    is_modifying=False,
+    is_removal=False
+):
+    QuizConstraints(competition).check(
+        quiz_id,
+        start_time=start_time,
+        end_time=end_time,
+        existing_start_time=existing_start_time,
+        is_modifying=is_modifying,
+        is_removal=is_removal
+    )
@@ -1,28 +1,38 @@
-from app.models import Competition
+from app.models import Competition, CompetitionQuiz, CompetitionQuizAnswer
 from extensions import db
+from sqlalchemy import insert
 from werkzeug.exceptions import BadRequest, NotFound
-from sqlalchemy.orm import joinedload
+from sqlalchemy.orm import selectinload
 from dateutil import parser
+from app.utils.lib.streaming import STREAM_BATCH_SIZE
 
 # Helpers para la lógica de quizzes
 from app.services.competition.helpers.quiz_updater import update_quizzes
-from app.services.competition.helpers.quiz_builder import build_quiz_entry
+from app.services.competition.helpers.quiz_builder import build_quiz_entry, build_quiz_rows
+from app.utils.db_routing import replica_read
+from app.utils.errors.CustomException import QueryBudgetExceeded
 
 
 class CompetitionService:
     # ----------------------------------------------------
     @staticmethod
-    def get_all_competitions():
+    @replica_read
+    def get_all_competitions(batch_size=STREAM_BATCH_SIZE):
         """
         Recupera todas las competencias disponibles en la base de datos,
         incluyendo la relación con quizzes y participantes.
 
-        :return: Lista de instancias de Competition.
+        Las filas se leen desde un cursor de servidor en lotes de `batch_size`;
+        las relaciones se cargan con selectinload por lote (joinedload no es compatible con yield_per).
+
+        :param batch_size: Cantidad de competencias por lote.
+        :return: Iterable de instancias de Competition.
         """
         competitions = (
             Competition.query
-            .options(joinedload(Competition.quizzes), joinedload(Competition.participants))  # Carga relaciones con eficiencia
-            .all()
+            .options(selectinload(Competition.quizzes), selectinload(Competition.participants))  # Carga relaciones con eficiencia
+            .order_by(Competition.id)
+            .yield_per(batch_size)
         )
         return competitions
 
@@ -30,7 +40,9 @@ class CompetitionService:
     @staticmethod
     def create_competition(data):
         """
-        Crea una nueva competencia y opcionalmente asocia quizzes.
+        Crea una nueva competencia y opcionalmente asocia quizzes, en una sola transacción:
+        los quizzes se validan todos en memoria y se insertan con un único INSERT, así que
+        si alguno es inválido no queda creada ninguna parte de la competencia.
 
         :param data: Diccionario con los datos de la competencia.
         :return: Instancia de Competition creada.
@@ -64,12 +76,15 @@ class CompetitionService:
         db.session.flush()  # Necesario para obtener el ID antes del commit
 
         # Procesar y asociar quizzes si vienen incluidos en el payload
-        if 'quizzes' in data:
-            for quiz_data in data['quizzes']:
-                CompetitionService.add_quiz_to_competition(
-                    competition_id=competition.id,
-                    quiz_data=quiz_data
-                )
+        if data.get('quizzes'):
+            try:
+                rows = build_quiz_rows(competition, data['quizzes'])
+            except (ValueError, TypeError) as e:
+                db.session.rollback()
+                raise BadRequest(f"Ocurrió un error al agregar los quizzes: {str(e)}")
+
+            # Las particiones de respuestas las crea por adelantado el job de mantenimiento
+            db.session.execute(insert(CompetitionQuiz), rows)
 
         db.session.commit()
         return competition
@@ -113,6 +128,9 @@ class CompetitionService:
             db.session.commit()
             return quiz
 
+        except QueryBudgetExceeded:
+            db.session.rollback()
+            raise
         except Exception as e:
             db.session.rollback()
             raise BadRequest(f"Ocurrió un error al agregar el quiz: {str(e)}")
@@ -166,3 +184,26 @@ class CompetitionService:
 
         db.session.commit()
         return competition
+
+    # ----------------------------------------------------
+    @staticmethod
+    def purge_answers(competition_id):
+        """
+        Elimina las respuestas de una competencia finalizada quitando su partición
+        (DETACH PARTITION ... CONCURRENTLY y DROP). Si sus respuestas quedaron en la partición de
+        desborde, las borra en lotes.
+
+        :param competition_id: ID de la competencia.
+        :return: Cantidad de quizzes purgados.
+        :raises NotFound: Si la competencia no existe.
+        :raises BadRequest: Si la competencia no está finalizada.
+        """
+        competition = Competition.query.get(competition_id)
+        if not competition:
+            raise NotFound(f"Competition con ID {competition_id} no encontrada.")
+        if competition.state != 'finalizada':
+            raise BadRequest("Solo se pueden purgar respuestas de competencias finalizadas.")
+
+        quizzes = len(competition.quizzes)
+        CompetitionQuizAnswer.drop_competition_answers(db.session, competition_id)
+        return quizzes
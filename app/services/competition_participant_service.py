@@ -1,9 +1,13 @@
 from datetime import datetime
+from flask import current_app
 from app.models import CompetitionParticipant, Competition, CompetitionQuiz, CompetitionQuizParticipants
 from app.utils.lib.constants import CompetitionQuizStatus
 from extensions import db
 from werkzeug.exceptions import BadRequest, NotFound
-from sqlalchemy import desc, select, func
+from sqlalchemy import desc, select, func, literal, update, any_
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from app.utils.db_routing import replica_read
 
 
 class CompetitionParticipantService:
@@ -16,21 +20,107 @@ class CompetitionParticipantService:
         :param participant_id: ID del participante.
         :return: Instancia de la inscripción creada.
         """
-        competition = Competition.query.get(competition_id)
-        if not competition:
-            raise NotFound(f"Competition with ID {competition_id} not found.")
-
-        if competition.participant_limit > 0 and len(competition.participants) >= competition.participant_limit:
+        # Reserva de cupo atómica: O(1) y sin sobreinscripción ante altas concurrentes
+        if Competition.reserve_participant_slot(competition_id) is None:
+            db.session.rollback()
+            if not db.session.get(Competition, competition_id):
+                raise NotFound(f"Competition with ID {competition_id} not found.")
             raise BadRequest("Participant limit reached for this competition.")
 
-        if CompetitionParticipant.query.filter_by(competition_id=competition_id, participant_id=participant_id).first():
-            raise BadRequest(f"Participant {participant_id} is already registered in competition {competition_id}.")
-
         participant = CompetitionParticipant(competition_id=competition_id, participant_id=participant_id)
         db.session.add(participant)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # uq_competition_participant: el rollback también deshace la reserva del cupo
+            db.session.rollback()
+            raise BadRequest(f"Participant {participant_id} is already registered in competition {competition_id}.")
         return participant
 
+    @staticmethod
+    def add_participants_to_competition(competition_id, participant_ids):
+        """
+        Inscribe muchos participantes en una competencia en una sola transacción.
+
+        Bloquea la fila de la competencia (como reserve_participant_slot), así que el cupo que
+        queda no cambia mientras se calcula: se inscriben, en el orden recibido, tantos IDs nuevos
+        como permita participant_limit, con un único INSERT ... SELECT unnest(...) ON CONFLICT DO NOTHING.
+
+        :param competition_id: ID de la competencia.
+        :param participant_ids: Lista de IDs de participantes (los repetidos se consideran una vez).
+        :return: Dict con los totales por resultado y "results": [{"participant_id", "status"}], donde
+                 status es "enrolled", "already_registered" o "limit_reached".
+        """
+        if not isinstance(participant_ids, list) or not participant_ids:
+            raise BadRequest("participant_ids debe ser una lista no vacía de enteros.")
+        if any(type(pid) is not int or pid <= 0 for pid in participant_ids):
+            raise BadRequest("participant_ids solo admite enteros positivos.")
+        max_ids = current_app.config['BULK_ENROLL_MAX_IDS']
+        if len(participant_ids) > max_ids:
+            raise BadRequest(f"Se admiten como máximo {max_ids} participantes por request.")
+
+        requested = list(dict.fromkeys(participant_ids))
+        ids_param = ARRAY(db.Integer)
+
+        competition = db.session.execute(
+            select(Competition.participant_limit, Competition.participant_count)
+            .where(Competition.id == competition_id)
+            .with_for_update()
+        ).one_or_none()
+        if competition is None:
+            db.session.rollback()
+            raise NotFound(f"Competition with ID {competition_id} not found.")
+
+        registered = set(db.session.scalars(
+            select(CompetitionParticipant.participant_id).where(
+                CompetitionParticipant.competition_id == competition_id,
+                CompetitionParticipant.participant_id == any_(literal(requested, ids_param))
+            )
+        ))
+        new_ids = [pid for pid in requested if pid not in registered]
+        if competition.participant_limit:
+            new_ids = new_ids[:max(competition.participant_limit - competition.participant_count, 0)]
+
+        enrolled = set()
+        if new_ids:
+            now = func.now()
+            enrolled = set(db.session.scalars(
+                pg_insert(CompetitionParticipant)
+                .from_select(
+                    ['competition_id', 'participant_id', 'score', 'created_at', 'updated_at'],
+                    select(
+                        literal(competition_id), func.unnest(literal(new_ids, ids_param)),
+                        literal(0), now, now
+                    )
+                )
+                .on_conflict_do_nothing(constraint='uq_competition_participant')
+                .returning(CompetitionParticipant.participant_id)
+            ))
+            db.session.execute(
+                update(Competition)
+                .where(Competition.id == competition_id)
+                .values(participant_count=Competition.participant_count + len(enrolled))
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+
+        results = []
+        for pid in requested:
+            if pid in enrolled:
+                status = "enrolled"
+            elif pid in registered:
+                status = "already_registered"
+            else:
+                status = "limit_reached"
+            results.append({"participant_id": pid, "status": status})
+
+        return {
+            "enrolled": len(enrolled),
+            "already_registered": len(registered),
+            "limit_reached": len(requested) - len(enrolled) - len(registered),
+            "results": results,
+        }
+
     @staticmethod
     def remove_participant_from_competition(competition_id, participant_id):
         """
@@ -50,9 +140,11 @@ class CompetitionParticipantService:
             )
 
         db.session.delete(participant)
+        Competition.release_participant_slot(competition_id)
         db.session.commit()
 
     @staticmethod
+    @replica_read
     def get_competition_ranking(competition_id):
         """
         Obtiene el ranking de participantes en una competencia, ordenado por puntaje descendente.
@@ -74,6 +166,7 @@ class CompetitionParticipantService:
         return [participant.to_dict() for participant in ranking]
 
     @staticmethod
+    @replica_read
     def get_competition_ranking_with_quizzes_computables(competition_id):
         """
         Obtiene el ranking de participantes en una competencia, ordenado por puntaje descendente,
@@ -132,6 +225,7 @@ class CompetitionParticipantService:
         }
 
     @staticmethod
+    @replica_read
     def get_user_competitions(user_id, statuses=None):
         """
         Devuelve las competencias relacionadas con un usuario, clasificadas por estado:
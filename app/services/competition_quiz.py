@@ -1,10 +1,20 @@
-from sqlalchemy import select, func
+import logging
+from sqlalchemy import select, func, insert, delete, literal
 from sqlalchemy.orm import load_only
 from extensions import db
-from app.models import CompetitionQuiz, CompetitionQuizParticipants, CompetitionParticipant
+from app.models import (
+    CompetitionQuiz, CompetitionQuizParticipants, CompetitionParticipant,
+    CompetitionQuizAnswer, CompetitionQuizQuestionStats
+)
 from datetime import datetime, timezone
 from app.utils.lib.constants import CompetitionQuizStatus
 from werkzeug.exceptions import NotFound, BadRequest
+from app.utils.lib.streaming import STREAM_BATCH_SIZE
+from app.utils.db_routing import replica_read
+from app.utils.errors.CustomException import QueryBudgetExceeded
+from app.utils.leaderboard_stream import notify_leaderboard_changed
+
+logger = logging.getLogger(__name__)
 
 class CompetitionQuizService:
     @staticmethod
@@ -25,12 +35,13 @@ class CompetitionQuizService:
             ).scalar_one_or_none()
 
             if not locked_quiz:
-                print(f"🟡 Quiz {competition_quiz.id} ya procesado o no existe")
+                logger.info("Quiz %s ya procesado o no existe", competition_quiz.id)
                 return False
 
-            print(f"🟢 Iniciando procesamiento quiz {locked_quiz.id}")
+            logger.debug("Iniciando procesamiento quiz %s", locked_quiz.id)
 
             CompetitionQuizService._calculate_results(locked_quiz)
+            CompetitionQuizService._compute_question_stats(locked_quiz)
             locked_quiz.set_status(CompetitionQuizStatus.COMPUTABLE)
             db.session.add(locked_quiz)
 
@@ -40,13 +51,20 @@ class CompetitionQuizService:
             # 🔹 Recalcular puntajes de la competencia
             CompetitionQuizService._update_competition_scores(locked_quiz.competition_id)
 
+            # 🔹 Avisar a los workers web (SSE): el NOTIFY se entrega recién con el commit
+            notify_leaderboard_changed(locked_quiz.competition_id)
+
             db.session.commit()  # 🔥 Un solo commit para todo
+            logger.info("Quiz %s procesado", locked_quiz.id, extra={"competition_id": locked_quiz.competition_id})
 
             return True  
 
-        except Exception as e:
-            db.session.rollback()  
-            print(f"🔴 Error crítico procesando quiz {competition_quiz.id}: {str(e)}")
+        except QueryBudgetExceeded:
+            db.session.rollback()
+            raise
+        except Exception:
+            db.session.rollback()
+            logger.exception("Error crítico procesando quiz %s", competition_quiz.id)
             return False
 
     @staticmethod
@@ -62,7 +80,7 @@ class CompetitionQuizService:
         ).all()
 
         if not participations:
-            print(f"⚪ Quiz {quiz.id} sin participaciones válidas")
+            logger.debug("Quiz %s sin participaciones válidas", quiz.id)
             return
 
         puntos_por_puesto = [10, 8, 6, 5, 4, 3, 2, 1]
@@ -81,6 +99,50 @@ class CompetitionQuizService:
             ]
         )
 
+    @staticmethod
+    def _compute_question_stats(quiz):
+        """
+        Calcula en la base, con agregados sobre la partición de la competencia del quiz, los intentos,
+        aciertos y la distribución de respuestas de cada pregunta, y los guarda en
+        competition_quiz_question_stats (reemplazando un cálculo anterior, si lo hubiera).
+
+        :param quiz: CompetitionQuiz (o fila con id y competition_id).
+        """
+        answers = CompetitionQuizAnswer
+        per_answer = (
+            select(
+                answers.question_id,
+                answers.answer_id,
+                func.count().label("chosen"),
+                func.count().filter(answers.is_correct).label("correct"),
+            )
+            .where(*answers.of_quiz(quiz), answers.question_id.isnot(None))
+            .group_by(answers.question_id, answers.answer_id)
+            .subquery()
+        )
+        per_question = (
+            select(
+                literal(quiz.id),
+                per_answer.c.question_id,
+                func.sum(per_answer.c.chosen),
+                func.sum(per_answer.c.correct),
+                func.jsonb_object_agg(per_answer.c.answer_id, per_answer.c.chosen),
+                func.now(),
+            )
+            .group_by(per_answer.c.question_id)
+        )
+
+        db.session.execute(
+            delete(CompetitionQuizQuestionStats)
+            .where(CompetitionQuizQuestionStats.competition_quiz_id == quiz.id)
+        )
+        db.session.execute(
+            insert(CompetitionQuizQuestionStats).from_select(
+                ['competition_quiz_id', 'question_id', 'attempts', 'correct', 'answer_distribution', 'computed_at'],
+                per_question
+            )
+        )
+
     @staticmethod
     def _enforce_computable_limit(competition_id):
         """Asegura que solo haya X quizzes COMPUTABLE en una competencia"""
@@ -97,12 +159,12 @@ class CompetitionQuizService:
             quiz_to_downgrade = computable_quizzes[0]  # El más antiguo
             quiz_to_downgrade.set_status(CompetitionQuizStatus.NO_COMPUTABLE)
             db.session.add(quiz_to_downgrade)
-            print(f"🔻 Quiz {quiz_to_downgrade.id} cambiado a NO_COMPUTABLE")
+            logger.info("Quiz %s cambiado a NO_COMPUTABLE", quiz_to_downgrade.id)
 
     @staticmethod
     def _update_competition_scores(competition_id):
         """Recalcula los puntajes de todos los participantes de la competencia"""
-        print(f"🔄 Recalculando puntajes para competencia {competition_id}")
+        logger.debug("Recalculando puntajes para competencia %s", competition_id)
 
         # 🔹 Obtener la suma de score_competition por participante en quizzes COMPUTABLES
         participant_scores = db.session.execute(
@@ -119,7 +181,7 @@ class CompetitionQuizService:
         ).all()
 
         if not participant_scores:
-            print(f"⚪ No hay participantes con puntajes en competencia {competition_id}")
+            logger.debug("No hay participantes con puntajes en competencia %s", competition_id)
             return
 
         # 🔹 Obtener los IDs de CompetitionParticipant correspondientes
@@ -149,7 +211,70 @@ class CompetitionQuizService:
 
         if updates:
             db.session.bulk_update_mappings(CompetitionParticipant, updates)
-            print(f"✅ Puntajes recalculados para competencia {competition_id}")
+            logger.debug("Puntajes recalculados para competencia %s", competition_id)
+
+    @staticmethod
+    @replica_read
+    def get_question_stats(competition_quiz_id):
+        """
+        Devuelve las estadísticas por pregunta de un quiz ya procesado.
+
+        :param competition_quiz_id: ID del quiz de la competencia.
+        :return: Dict con el quiz, el momento del cálculo y la lista de preguntas.
+        :raises NotFound: Si el quiz no existe.
+        :raises BadRequest: Si el quiz todavía no fue procesado.
+        """
+        quiz = db.session.get(CompetitionQuiz, competition_quiz_id)
+        if not quiz:
+            raise NotFound(f"CompetitionQuiz con ID {competition_quiz_id} no encontrado.")
+        if quiz.status == CompetitionQuizStatus.ACTIVO:
+            raise BadRequest(f"Las estadísticas del quiz {competition_quiz_id} estarán disponibles cuando se procesen sus resultados.")
+
+        stats = db.session.scalars(
+            select(CompetitionQuizQuestionStats)
+            .where(CompetitionQuizQuestionStats.competition_quiz_id == competition_quiz_id)
+            .order_by(CompetitionQuizQuestionStats.question_id)
+        ).all()
+
+        return {
+            "competition_quiz_id": quiz.id,
+            "quiz_id": quiz.quiz_id,
+            "status": quiz.status,
+            "computed_at": stats[0].computed_at.isoformat() if stats else None,
+            "questions": [stat.to_dict() for stat in stats],
+        }
+
+    @staticmethod
+    def backfill_question_stats():
+        """
+        Calcula las estadísticas de los quizzes ya procesados que no las tienen
+        (procesados antes de que existiera la tabla). Un commit por quiz.
+
+        :return: Cantidad de quizzes calculados.
+        """
+        pending = db.session.execute(
+            select(CompetitionQuiz.id, CompetitionQuiz.competition_id)
+            .where(
+                CompetitionQuiz.status != CompetitionQuizStatus.ACTIVO,
+                CompetitionQuiz.answers_archived_at.is_(None),
+                ~select(CompetitionQuizQuestionStats.id)
+                .where(CompetitionQuizQuestionStats.competition_quiz_id == CompetitionQuiz.id)
+                .exists()
+            )
+            .order_by(CompetitionQuiz.id)
+        ).all()
+
+        for quiz in pending:
+            CompetitionQuizService._compute_question_stats(quiz)
+            db.session.commit()
+        return len(pending)
+
+    @staticmethod
+    def get_all_competition_quizzes(batch_size=STREAM_BATCH_SIZE):
+        """
+        Devuelve todos los CompetitionQuiz leídos desde un cursor de servidor en lotes de `batch_size`.
+        """
+        return CompetitionQuiz.query.order_by(CompetitionQuiz.id).yield_per(batch_size)
 
     @staticmethod
     def update_competition_quiz(competition_quiz_id, data):
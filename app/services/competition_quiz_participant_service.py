@@ -1,15 +1,37 @@
+import logging
+import time
 import requests
 from app.models import CompetitionQuizParticipants, CompetitionQuiz, CompetitionParticipant,CompetitionQuizAnswer
 from extensions import db
 from werkzeug.exceptions import BadRequest, NotFound
 import datetime as dt
 from datetime  import timezone
+from itertools import dropwhile, islice
+from sqlalchemy import select, insert, update, any_, literal, tuple_, func
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
+from dateutil import parser as date_parser
+from flask import current_app
+from app.utils.lib.streaming import STREAM_BATCH_SIZE
+from app.utils.lib.pagination import encode_cursor, decode_cursor, MAX_PER_PAGE
+from app.utils.lib.constants import CompetitionQuizStatus
+from app.utils.db_routing import replica_read
+from app.utils.errors.CustomException import QueryBudgetExceeded
+from app.services.answer_archive_service import AnswerArchiveService, ARCHIVE_COLUMNS
+from prometheus_client import Histogram
 import os
 
 # Construcción de la URL base del microservicio de competencias
 QA_SERVICE_URL = 'http://' + os.getenv('QA_HOST', 'localhost') + ':' + os.getenv('QA_PORT', '5013')
 
+logger = logging.getLogger(__name__)
+
+QA_CLIENT_LATENCY = Histogram(
+    'qa_client_request_duration_seconds',
+    'Latencia de las llamadas al microservicio de QA, por endpoint y resultado.',
+    labelnames=('endpoint', 'outcome'),
+)
+
 class CompetitionQuizParticipantService:
 
     # 🧩 Validaciones privadas reutilizables
@@ -79,7 +101,7 @@ class CompetitionQuizParticipantService:
             db.session.commit()
             return participant
 
-        except (SQLAlchemyError, BadRequest, NotFound) as e:
+        except (SQLAlchemyError, BadRequest, NotFound, QueryBudgetExceeded) as e:
             db.session.rollback()
             raise e  # Lo dejamos escalar para ser manejado por el handler global
         except Exception as e:
@@ -114,7 +136,7 @@ class CompetitionQuizParticipantService:
                 "quiz_id": quiz.quiz_id
             }
 
-        except (SQLAlchemyError, BadRequest, NotFound) as e:
+        except (SQLAlchemyError, BadRequest, NotFound, QueryBudgetExceeded) as e:
             db.session.rollback()
             raise e
         except Exception as e:
@@ -136,40 +158,148 @@ class CompetitionQuizParticipantService:
         if not participation:
             raise NotFound("Participant hasn't completed this quiz")
 
-        # Obtener respuestas
-        answers = CompetitionQuizAnswer.query.filter_by(
-            competition_quiz_id=competition_quiz_id,
-            participant_id=participant_id
+        # Respuestas ya movidas al archivo frío
+        if participation.competition_quiz.answers_archived_at:
+            return AnswerArchiveService.get_answers(competition_quiz_id, participant_id)
+
+        # Obtener respuestas (el filtro por competencia limita la lectura a su partición)
+        answers = CompetitionQuizAnswer.query.filter(
+            *CompetitionQuizAnswer.of_quiz(participation.competition_quiz),
+            CompetitionQuizAnswer.participant_id == participant_id
         ).all()
 
         return [answer.to_dict() for answer in answers]
 
     @staticmethod
-    def get_all_for_quiz(competition_quiz_id, page=1, per_page=50):
+    @replica_read
+    def get_all_for_quiz(competition_quiz_id, cursor=None, per_page=50, include_total=False, page=None):
         """
-        Obtiene todas las respuestas de todos los participantes para un cuestionario
+        Obtiene las respuestas de todos los participantes para un cuestionario, paginadas por cursor.
+
+        Cada página continúa desde la posición (created_at, id) de la última fila de la anterior,
+        usando el índice idx_quiz_answers_keyset: el costo de una página no depende de su profundidad.
+
+        page (obsoleto) mantiene la paginación por número de página durante la transición: salta
+        (page - 1) * per_page filas, así que su costo crece con la profundidad. Devuelve además
+        total, pages y current_page como antes, y el next_cursor para pasar a la paginación por cursor.
+
+        :param cursor: Token devuelto como next_cursor por la página anterior (None = primera página).
+        :param per_page: Cantidad de respuestas por página.
+        :param include_total: Si es True, incluye el total de respuestas del quiz (un COUNT adicional).
+        :param page: Número de página (obsoleto; se ignora si hay cursor).
+        :return: Dict con answers, next_cursor (None en la última página) y, si se pidió, total.
+        :raises BadRequest: Si el cursor o la página no son válidos.
         """
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise BadRequest(str(e))
+        if after or page is None:
+            page = None
+        elif page < 1:
+            raise BadRequest("page debe ser mayor o igual a 1.")
+        offset = (page - 1) * per_page if page else 0
+        include_total = include_total or page is not None
+
         # Validar existencia del cuestionario
-        if not CompetitionQuiz.query.get(competition_quiz_id):
+        quiz = CompetitionQuiz.query.get(competition_quiz_id)
+        if not quiz:
+            raise NotFound("Competition quiz not found")
+
+        if quiz.answers_archived_at:
+            # El archivo se recorre en orden: se saltean las filas hasta el cursor sin acumularlas
+            archived = AnswerArchiveService.iter_answers(competition_quiz_id)
+            if after:
+                archived = dropwhile(
+                    lambda answer: (dt.datetime.fromisoformat(answer["created_at"]), answer["id"]) <= after,
+                    archived
+                )
+            page_items = list(islice(archived, offset, offset + per_page + 1))
+            answers = page_items[:per_page]
+            result = {"answers": answers, "next_cursor": None}
+            if len(page_items) > per_page:
+                last = answers[-1]
+                result["next_cursor"] = encode_cursor(dt.datetime.fromisoformat(last["created_at"]), last["id"])
+            if include_total:
+                result["total"] = sum(1 for _ in AnswerArchiveService.iter_answers(competition_quiz_id))
+            return CompetitionQuizParticipantService._with_page_fields(result, page, per_page)
+
+        # Consulta por cursor sobre la partición de la competencia
+        query = (
+            CompetitionQuizAnswer.query
+            .filter(*CompetitionQuizAnswer.of_quiz(quiz))
+            .order_by(CompetitionQuizAnswer.created_at.asc(), CompetitionQuizAnswer.id.asc())
+        )
+        if after:
+            query = query.filter(tuple_(CompetitionQuizAnswer.created_at, CompetitionQuizAnswer.id) > after)
+        rows = query.offset(offset).limit(per_page + 1).all()  # Una fila de más indica si hay otra página
+
+        answers = rows[:per_page]
+        result = {
+            "answers": [answer.to_dict() for answer in answers],
+            "next_cursor": encode_cursor(answers[-1].created_at, answers[-1].id) if len(rows) > per_page else None,
+        }
+        if include_total:
+            result["total"] = db.session.scalar(
+                select(func.count()).where(*CompetitionQuizAnswer.of_quiz(quiz))
+            )
+        return CompetitionQuizParticipantService._with_page_fields(result, page, per_page)
+
+    @staticmethod
+    def _with_page_fields(result, page, per_page):
+        # Campos de la paginación por número de página (obsoleta), solo si se pidió con page
+        if page is not None:
+            result.update(pages=-(-result["total"] // per_page), current_page=page)
+        return result
+
+    @staticmethod
+    @replica_read
+    def iter_all_for_quiz(competition_quiz_id, batch_size=STREAM_BATCH_SIZE):
+        """
+        Devuelve (como dicts) todas las respuestas de un cuestionario leídas desde un cursor de servidor,
+        o desde el archivo frío, en el mismo orden que get_all_for_quiz pero sin paginar ni contar.
+        La existencia del cuestionario se valida antes de empezar a iterar.
+        """
+        quiz = CompetitionQuiz.query.get(competition_quiz_id)
+        if not quiz:
             raise NotFound("Competition quiz not found")
 
-        # Consulta paginada
-        query = CompetitionQuizAnswer.query.filter_by(
-            competition_quiz_id=competition_quiz_id
-        ).order_by(CompetitionQuizAnswer.created_at.asc())
+        if quiz.answers_archived_at:
+            return AnswerArchiveService.iter_answers(competition_quiz_id)
 
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
+        query = (
+            CompetitionQuizAnswer.query
+            .filter(*CompetitionQuizAnswer.of_quiz(quiz))
+            .order_by(CompetitionQuizAnswer.created_at.asc(), CompetitionQuizAnswer.id.asc())
+            .yield_per(batch_size)
         )
+        return (answer.to_dict() for answer in query)
+
+    @staticmethod
+    @replica_read
+    def iter_answers_export(competition_quiz_id, batch_size=STREAM_BATCH_SIZE):
+        """
+        Devuelve todas las respuestas de un cuestionario como tuplas con las columnas de
+        ARCHIVE_COLUMNS, en una sola pasada por un cursor de servidor (o desde el archivo frío),
+        ordenadas por (created_at, id). No construye objetos del ORM.
+        La existencia del cuestionario se valida antes de empezar a iterar.
+        """
+        quiz = CompetitionQuiz.query.get(competition_quiz_id)
+        if not quiz:
+            raise NotFound("Competition quiz not found")
+
+        if quiz.answers_archived_at:
+            return AnswerArchiveService.iter_rows(competition_quiz_id)
+
+        rows = db.session.execute(
+            select(*(getattr(CompetitionQuizAnswer, name) for name in ARCHIVE_COLUMNS))
+            .where(*CompetitionQuizAnswer.of_quiz(quiz))
+            .order_by(CompetitionQuizAnswer.created_at.asc(), CompetitionQuizAnswer.id.asc())
+            .execution_options(yield_per=batch_size)
+        )
+        return (tuple(row) for row in rows)
 
-        return {
-            "answers": [answer.to_dict() for answer in pagination.items],
-            "total": pagination.total,
-            "pages": pagination.pages,
-            "current_page": page
-        } 
     @staticmethod
     def get_complete_quiz_by_user(competition_quiz_id, participant_id):
         """
@@ -204,6 +334,8 @@ class CompetitionQuizParticipantService:
         Llama al microservicio de QA para obtener la respuesta correcta por pregunta.
         Devuelve un dict {question_id: correct_answer_id}
         """
+        started_at = time.perf_counter()
+        outcome = "error"
         try:
             response = requests.post(
                 f"{QA_SERVICE_URL}/answer/answers/check",
@@ -212,15 +344,28 @@ class CompetitionQuizParticipantService:
             )
             response.raise_for_status()
             results = response.json().get("answers", [])
+            outcome = "ok"
 
             return {
                 str(item["question_id"]): item["correct_answer_id"]
                 for item in results
             }
         except requests.RequestException as e:
+            logger.warning("Fallo la validación de respuestas en QA: %s", e)
             raise BadRequest(f"No se pudo validar respuestas: {str(e)}")
+        finally:
+            QA_CLIENT_LATENCY.labels("/answer/answers/check", outcome).observe(time.perf_counter() - started_at)
 
 
+    @staticmethod
+    def _compute_score(correctas, time_limit, tiempo_transcurrido):
+        """
+        Puntaje del quiz: respuestas correctas, ponderadas por el tiempo no utilizado si hay límite.
+        """
+        if time_limit == 0:
+            return correctas
+        return correctas * (time_limit - tiempo_transcurrido)
+
     @staticmethod
     def finish_quiz(competition_quiz_id, participant_id, question_with_answer_choice):
         """
@@ -282,6 +427,7 @@ class CompetitionQuizParticipantService:
 
                 new_answers.append(
                     CompetitionQuizAnswer(
+                        competition_id=competition_id,
                         competition_quiz_id=competition_quiz_id,
                         participant_id=participant_id,
                         answer_id=user_answer_id,
@@ -295,13 +441,15 @@ class CompetitionQuizParticipantService:
             db.session.bulk_save_objects(new_answers)
             participante.end_time = time_finish
 
-            if time_limit == 0:
-                participante.score = correctas
-            else:
-                tiempo_no_utilizado = time_limit - tiempo_transcurrido
-                participante.score = correctas * tiempo_no_utilizado
+            participante.score = CompetitionQuizParticipantService._compute_score(
+                correctas, time_limit, tiempo_transcurrido
+            )
 
             db.session.commit()
+            logger.debug(
+                "Quiz %s finalizado por participante %s", competition_quiz_id, participant_id,
+                extra={"correct_answers": correctas, "score": participante.score}
+            )
 
             return {
                 "competition_id": competition_id,
@@ -320,9 +468,224 @@ class CompetitionQuizParticipantService:
                 } for a in new_answers]
             }
 
-        except (SQLAlchemyError, BadRequest, NotFound) as e:
+        except (SQLAlchemyError, BadRequest, NotFound, QueryBudgetExceeded) as e:
             db.session.rollback()
             raise e
         except Exception as e:
             db.session.rollback()
             raise BadRequest(f"Unexpected error while finishing quiz: {str(e)}")
+
+    @staticmethod
+    def finish_quiz_batch(competition_quiz_id, submissions):
+        """
+        Finaliza el quiz para muchos participantes a la vez (envíos recolectados sin conexión,
+        p. ej. en aulas o kioscos). Cada envío se valida con las mismas reglas que finish_quiz,
+        usando finished_at como instante de finalización.
+
+        Solo se aceptan lotes mientras el quiz está ACTIVO y sin procesar: una vez procesado, sus
+        puntajes ya se volcaron a la competencia y un envío tardío no se contaría. finished_at lo
+        declara el cliente y define el tiempo usado (y con él el puntaje), así que debe caer entre
+        el inicio de la participación y min(ahora, end_time del quiz + BATCH_FINISH_GRACE_SECONDS);
+        fuera de ese rango el envío se rechaza.
+
+        Todos los envíos se validan y se corrigen sin bloquear filas, con una sola llamada al
+        microservicio de QA (las preguntas son las del mismo quiz). Recién después se abre la
+        transacción que bloquea el quiz y las participaciones, vuelve a verificar que sigan
+        abiertas y guarda respuestas y participaciones con un INSERT y un UPDATE masivos. Un
+        envío inválido no impide guardar los demás.
+
+        :param competition_quiz_id: ID del quiz de la competencia.
+        :param submissions: Lista de {"participant_id", "answers": [{question_id, answer_id}], "finished_at"}.
+                            finished_at es opcional (ISO 8601; por defecto, ahora).
+        :return: Dict con los totales y "results": un resultado por envío, en el mismo orden.
+        :raises BadRequest: Si el quiz ya no está ACTIVO o ya fue procesado.
+        """
+        if not isinstance(submissions, list) or not submissions:
+            raise BadRequest("submissions debe ser una lista no vacía.")
+        max_submissions = current_app.config['BATCH_FINISH_MAX_SUBMISSIONS']
+        if len(submissions) > max_submissions:
+            raise BadRequest(f"Se admiten como máximo {max_submissions} envíos por request.")
+
+        try:
+            now = dt.datetime.now(timezone.utc)
+            grace = dt.timedelta(seconds=current_app.config['BATCH_FINISH_GRACE_SECONDS'])
+
+            # 1) Validación y corrección sin bloqueos de filas: la llamada al QA no retiene locks
+            quiz = CompetitionQuizParticipantService._get_quiz_or_404(competition_quiz_id)
+            if quiz.status != CompetitionQuizStatus.ACTIVO or quiz.processed:
+                raise BadRequest("El cuestionario ya fue procesado: no admite más envíos.")
+            competition_id, quiz_ref, time_limit = quiz.competition_id, quiz.quiz_id, quiz.time_limit
+            if time_limit < 0:
+                raise BadRequest(f"El cuestionario no tiene tiempo límite configurado {time_limit}")
+            latest_finish = min(now, quiz.end_time + grace) if quiz.end_time else now
+
+            participant_ids = [item.get('participant_id') for item in submissions if isinstance(item, dict)]
+            participant_ids = [pid for pid in participant_ids if type(pid) is int]
+            ids_param = ARRAY(db.Integer)
+
+            # Inscripciones y participaciones de todos los envíos, en dos consultas
+            registered = set(db.session.scalars(
+                select(CompetitionParticipant.participant_id).where(
+                    CompetitionParticipant.competition_id == competition_id,
+                    CompetitionParticipant.participant_id == any_(literal(participant_ids, ids_param))
+                )
+            ))
+            participations = {
+                row.participant_id: row
+                for row in db.session.execute(
+                    select(
+                        CompetitionQuizParticipants.id,
+                        CompetitionQuizParticipants.participant_id,
+                        CompetitionQuizParticipants.start_time,
+                        CompetitionQuizParticipants.end_time,
+                    ).where(
+                        CompetitionQuizParticipants.competition_quiz_id == competition_quiz_id,
+                        CompetitionQuizParticipants.participant_id == any_(literal(participant_ids, ids_param))
+                    )
+                )
+            }
+            # Se cierra la transacción de lectura: no queda abierta durante la llamada al QA
+            db.session.rollback()
+
+            results = []
+            accepted = []  # (resultado, participación, respuestas, segundos transcurridos, finished_at)
+            seen = set()
+            for item in submissions:
+                result = {"participant_id": item.get('participant_id') if isinstance(item, dict) else None}
+                results.append(result)
+                try:
+                    if not isinstance(item, dict) or type(item.get('participant_id')) is not int:
+                        raise BadRequest("Cada envío debe tener un participant_id entero.")
+                    participant_id = item['participant_id']
+                    if participant_id in seen:
+                        raise BadRequest(f"Envío duplicado para el participante {participant_id}.")
+                    seen.add(participant_id)
+
+                    if participant_id not in registered:
+                        raise NotFound(f"Participant {participant_id} is not registered in competition {competition_id}.")
+                    participation = participations.get(participant_id)
+                    if not participation:
+                        raise BadRequest(f"Participant {participant_id} hasn't started this quiz.")
+                    if participation.end_time:
+                        raise BadRequest("Quiz already completed.")
+
+                    finished_at = now
+                    if item.get('finished_at'):
+                        try:
+                            finished_at = date_parser.isoparse(item['finished_at'])
+                        except (ValueError, TypeError):
+                            raise BadRequest("finished_at inválido. Usar ISO 8601.")
+                        if finished_at.tzinfo is None:
+                            finished_at = finished_at.replace(tzinfo=timezone.utc)
+                    if finished_at < participation.start_time:
+                        raise BadRequest("finished_at no puede ser anterior al inicio del quiz.")
+                    if finished_at > latest_finish:
+                        raise BadRequest("finished_at no puede ser posterior al cierre del quiz ni estar en el futuro.")
+
+                    tiempo_transcurrido = (finished_at - participation.start_time).total_seconds()
+                    if time_limit != 0 and tiempo_transcurrido > time_limit:
+                        raise BadRequest(f"Tiempo límite excedido ({tiempo_transcurrido:.1f}s de {time_limit}s)")
+
+                    answers = item.get('answers')
+                    CompetitionQuizParticipantService._validate_question_with_answer_structure(answers)
+                    question_ids = [answer['question_id'] for answer in answers]
+                    if len(set(question_ids)) != len(question_ids):
+                        raise BadRequest("Pregunta duplicada en las respuestas.")
+                except (BadRequest, NotFound) as e:
+                    result.update(status="error", error=e.description)
+                    continue
+                accepted.append((result, participation, answers, tiempo_transcurrido, finished_at))
+
+            graded = []  # (resultado, participación, filas de respuestas, fila de participación, resumen)
+            if accepted:
+                # Una sola corrección para todas las preguntas del lote
+                questions = {}
+                for _, _, answers, _, _ in accepted:
+                    for answer in answers:
+                        questions.setdefault(answer['question_id'], answer)
+                correct_map = CompetitionQuizParticipantService._check_answer_correctness_bulk(list(questions.values()))
+
+                for result, participation, answers, tiempo_transcurrido, finished_at in accepted:
+                    rows = []
+                    for answer in answers:
+                        correct_answer_id = correct_map.get(str(answer['question_id']))
+                        if correct_answer_id is None:
+                            result.update(status="error", error=f"No se pudo validar la respuesta de la pregunta {answer['question_id']}")
+                            break
+                        rows.append({
+                            "competition_id": competition_id,
+                            "competition_quiz_id": competition_quiz_id,
+                            "participant_id": participation.participant_id,
+                            "question_id": answer['question_id'],
+                            "answer_id": answer['answer_id'],
+                            "is_correct": answer['answer_id'] == correct_answer_id,
+                            "created_at": now,
+                        })
+                    else:
+                        correctas = sum(1 for row in rows if row["is_correct"])
+                        score = CompetitionQuizParticipantService._compute_score(correctas, time_limit, tiempo_transcurrido)
+                        graded.append((
+                            result, participation, rows,
+                            {"id": participation.id, "end_time": finished_at, "score": score, "updated_at": now},
+                            {
+                                "correct_answers": correctas,
+                                "score": score,
+                                "time_spent": f"{tiempo_transcurrido:.2f}s",
+                                "time_limit": f"{time_limit}s"
+                            },
+                        ))
+
+            if graded:
+                # 2) Transacción con bloqueos solo para la re-verificación y las escrituras.
+                # FOR SHARE: si el scheduler está procesando el quiz, se espera y se lee su estado final;
+                # mientras el lote no termine, el scheduler (SKIP LOCKED) lo deja para la próxima pasada.
+                current = db.session.execute(
+                    select(CompetitionQuiz.status, CompetitionQuiz.processed)
+                    .where(CompetitionQuiz.id == competition_quiz_id)
+                    .with_for_update(read=True)
+                ).first()
+                if not current or current.status != CompetitionQuizStatus.ACTIVO or current.processed:
+                    raise BadRequest("El cuestionario ya fue procesado: no admite más envíos.")
+                # FOR UPDATE: un finish individual pudo finalizar a alguno mientras se corregía el lote
+                still_open = set(db.session.scalars(
+                    select(CompetitionQuizParticipants.id)
+                    .where(
+                        CompetitionQuizParticipants.id == any_(literal([g[1].id for g in graded], ids_param)),
+                        CompetitionQuizParticipants.end_time.is_(None),
+                    )
+                    .with_for_update()
+                ))
+
+                answer_rows, participation_rows = [], []
+                for result, participation, rows, participation_row, summary in graded:
+                    if participation.id not in still_open:
+                        result.update(status="error", error="Quiz already completed.")
+                        continue
+                    answer_rows.extend(rows)
+                    participation_rows.append(participation_row)
+                    result.update(status="finished", summary=summary)
+
+                if participation_rows:
+                    db.session.execute(insert(CompetitionQuizAnswer), answer_rows)
+                    db.session.execute(update(CompetitionQuizParticipants), participation_rows)
+                db.session.commit()
+
+        except (SQLAlchemyError, BadRequest, NotFound, QueryBudgetExceeded) as e:
+            db.session.rollback()
+            raise e
+        except Exception as e:
+            db.session.rollback()
+            raise BadRequest(f"Unexpected error while finishing quiz batch: {str(e)}")
+
+        finished = sum(1 for result in results if result["status"] == "finished")
+        logger.info(
+            "Lote de finalizaciones del quiz %s: %s de %s", competition_quiz_id, finished, len(results),
+            extra={"competition_quiz_id": competition_quiz_id, "finished": finished, "submissions": len(results)}
+        )
+        return {
+            "competition_id": competition_id,
+            "quiz_id": quiz_ref,
+            "finished": finished,
+            "failed": len(results) - finished,
+            "results": results,
+        }
@@ -0,0 +1,108 @@
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import aliased
+from werkzeug.exceptions import BadRequest
+from extensions import db
+from app.models import Competition, CompetitionQuiz, CompetitionParticipant, CompetitionQuizParticipants
+from app.utils.db_routing import replica_read
+from app.utils.lib.pagination import encode_cursor, decode_cursor, MAX_PER_PAGE
+
+
+def history_query(participant_id, after=None, limit=50):
+    """
+    Resultados finalizados de un participante en todas sus competencias, del más reciente al más antiguo.
+    Recorre el índice cubriente idx_cqp_participant_history (participant_id, end_time); el puesto en la
+    competencia se cuenta sobre idx_competition_participants_ranking.
+
+    :param after: Posición (end_time, id) de la última fila de la página anterior.
+    """
+    quiz_result = CompetitionQuizParticipants
+    enrollment = CompetitionParticipant
+    rival = aliased(CompetitionParticipant)
+
+    competition_rank = (
+        select(func.count() + 1)
+        .where(rival.competition_id == enrollment.competition_id, rival.score > enrollment.score)
+        .correlate(enrollment)
+        .scalar_subquery()
+    )
+
+    stmt = (
+        select(
+            quiz_result.id,
+            quiz_result.competition_quiz_id,
+            quiz_result.score,
+            quiz_result.score_competition,
+            quiz_result.start_time,
+            quiz_result.end_time,
+            CompetitionQuiz.quiz_id,
+            CompetitionQuiz.status,
+            Competition.id.label("competition_id"),
+            Competition.title.label("competition_title"),
+            Competition.state.label("competition_state"),
+            enrollment.score.label("competition_score"),
+            competition_rank.label("competition_rank"),
+        )
+        .join(CompetitionQuiz, CompetitionQuiz.id == quiz_result.competition_quiz_id)
+        .join(Competition, Competition.id == CompetitionQuiz.competition_id)
+        .outerjoin(
+            enrollment,
+            (enrollment.competition_id == Competition.id) & (enrollment.participant_id == quiz_result.participant_id)
+        )
+        .where(quiz_result.participant_id == participant_id, quiz_result.end_time.isnot(None))
+        .order_by(quiz_result.end_time.desc(), quiz_result.id.desc())
+        .limit(limit)
+    )
+    if after:
+        stmt = stmt.where(tuple_(quiz_result.end_time, quiz_result.id) < after)
+    return stmt
+
+
+class ParticipantHistoryService:
+
+    @staticmethod
+    @replica_read
+    def get_history(participant_id, cursor=None, per_page=50):
+        """
+        Devuelve el historial de resultados de un participante, paginado por cursor.
+
+        Sin caché: cada página sale de un recorrido del índice cubriente (ver history_query), y una
+        versión que detectara todo cambio (puestos, estados de competencias y quizzes) costaría
+        tanto como la consulta misma.
+
+        :param participant_id: ID del participante.
+        :param cursor: Token devuelto como next_cursor por la página anterior (None = primera página).
+        :param per_page: Cantidad de resultados por página.
+        :return: Dict con results y next_cursor (None en la última página).
+        :raises BadRequest: Si el cursor no es válido.
+        """
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            raise BadRequest(str(e))
+
+        rows = db.session.execute(history_query(participant_id, after, per_page + 1)).all()
+        page = rows[:per_page]
+        results = [
+            {
+                "competition_id": row.competition_id,
+                "competition_title": row.competition_title,
+                "competition_state": row.competition_state,
+                "competition_score": row.competition_score,
+                "competition_rank": row.competition_rank if row.competition_score is not None else None,
+                "competition_quiz_id": row.competition_quiz_id,
+                "quiz_id": row.quiz_id,
+                "quiz_status": row.status,
+                "score": row.score,
+                "score_competition": row.score_competition,
+                "start_time": row.start_time.isoformat() if row.start_time else None,
+                "end_time": row.end_time.isoformat(),
+                "time_spent": round((row.end_time - row.start_time).total_seconds(), 2) if row.start_time else None,
+            }
+            for row in page
+        ]
+        return {
+            "participant_id": participant_id,
+            "results": results,
+            "next_cursor": encode_cursor(page[-1].end_time, page[-1].id) if len(rows) > per_page else None,
+        }
@@ -2,51 +2,116 @@
 from flask import current_app
 from flask.cli import with_appcontext
 import click
-from psycopg2 import connect
-from flask_migrate import upgrade
-from seeders import run_seeders
 
 @click.command("init_db")
 @with_appcontext
 def init_db():
-    """Verifica y crea la base de datos si no existe."""
-    from sqlalchemy.engine.url import make_url
-    db_url = make_url(current_app.config['SQLALCHEMY_DATABASE_URI'])
-    db_name = db_url.database
+    """Crea la base de datos si no existe, aplica migraciones y (opcionalmente) seeders."""
+    from app.utils.db import create_database_if_not_exists, run_migrations_and_seeders
 
-    default_db_url = db_url.set(database='postgres')
+    app = current_app._get_current_object()
     try:
-        conn = connect(
-            dbname=default_db_url.database,
-            user=default_db_url.username,
-            password=default_db_url.password,
-            host=default_db_url.host,
-            port=default_db_url.port,
-        )
-        conn.autocommit = True
-        with conn.cursor() as cursor:
-            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (db_name,))
-            if not cursor.fetchone():
-                cursor.execute(f"CREATE DATABASE {db_name}")
-                click.echo(f"Base de datos '{db_name}' creada exitosamente.")
-            else:
-                click.echo(f"La base de datos '{db_name}' ya existe.")
-            # Ejecutar flask db upgrade antes de los seeders
-            click.echo("Ejecutando migraciones (flask db upgrade)...")
-            upgrade()
-            click.echo("Migraciones completadas con éxito.")
-
-            if current_app.config.get('SEED_DB', 'no') == 'si':
-                run_seeders()
-            
+        create_database_if_not_exists(app)
+        run_migrations_and_seeders(app)
     except Exception as e:
         click.echo(f"Error al verificar/crear la base de datos: {e}")
+        raise SystemExit(1)
 
 
 @click.command("seed")
+@click.option("--competitions", default=10, show_default=True, help="Cantidad de competencias.")
+@click.option("--quizzes", default=5, show_default=True, help="Quizzes por competencia.")
+@click.option("--participants", default=100, show_default=True, help="Participantes por competencia.")
+@click.option("--questions", default=10, show_default=True, help="Preguntas por quiz.")
+@click.option("--users", default=None, type=int, help="Universo de usuarios (por defecto 2 × participants).")
+@click.option("--seed", "random_seed", default=42, show_default=True, help="Semilla para datos reproducibles.")
+@click.option("--chunk-rows", default=200000, show_default=True, help="Filas por cada COPY.")
 @with_appcontext
-def seed():
-    """Ejecuta todos los seeders."""
+def seed(competitions, quizzes, participants, questions, users, random_seed, chunk_rows):
+    """Carga datos sintéticos con COPY (competencias × quizzes × participantes × preguntas)."""
+    from seeders import run_seeders
+
     click.echo("Ejecutando seeders...")
-    # run_seeders()
-    click.echo("Seeders completados con éxito.")
\ No newline at end of file
+    run_seeders(
+        competitions=competitions, quizzes=quizzes, participants=participants, questions=questions,
+        users=users, seed=random_seed, chunk_rows=chunk_rows,
+    )
+
+@click.command("check_plans")
+@click.option("--sample-id", default=1, show_default=True, help="ID usado como parámetro en las consultas.")
+@with_appcontext
+def check_plans(sample_id):
+    """
+    Verifica con EXPLAIN (y enable_seqscan desactivado) que cada consulta caliente tenga un índice utilizable.
+    Que el planner además lo elija se prueba con datos sembrados en benchmarks/bench_plans.py.
+    """
+    from app.utils.commands.plans import explain_hot_queries
+
+    failures = 0
+    sample_ids = dict(competition_id=sample_id, competition_quiz_id=sample_id, participant_id=sample_id)
+    for name, seq_scans, plan in explain_hot_queries(**sample_ids):
+        if seq_scans:
+            failures += 1
+            click.echo(f"❌ {name}: Seq Scan sobre {', '.join(seq_scans)}")
+        else:
+            click.echo(f"✅ {name}: {plan['Node Type']}")
+
+    if failures:
+        click.echo(f"{failures} consulta(s) sin índice utilizable.")
+        raise SystemExit(1)
+    click.echo("Todas las consultas calientes usan índices.")
+
+
+@click.command("purge_answers")
+@click.argument("competition_id", type=int)
+@with_appcontext
+def purge_answers(competition_id):
+    """Elimina las respuestas de una competencia finalizada (quita su partición)."""
+    from app.services import CompetitionService
+
+    purged = CompetitionService.purge_answers(competition_id)
+    click.echo(f"Respuestas eliminadas de {purged} quiz(zes) de la competencia {competition_id}.")
+
+
+@click.command("maintain_answer_partitions")
+@with_appcontext
+def maintain_answer_partitions():
+    """Crea por adelantado las particiones de respuestas de las próximas competencias."""
+    from extensions import db
+    from app.models import CompetitionQuizAnswer
+
+    created = CompetitionQuizAnswer.maintain_partitions(db.session)
+    for name in created:
+        click.echo(f"✅ Creada {name}")
+    click.echo(f"{len(created)} partición(es) creadas.")
+
+
+@click.command("backfill_question_stats")
+@with_appcontext
+def backfill_question_stats():
+    """Calcula las estadísticas por pregunta de los quizzes procesados que aún no las tienen."""
+    from app.services.competition_quiz import CompetitionQuizService
+
+    computed = CompetitionQuizService.backfill_question_stats()
+    click.echo(f"Estadísticas calculadas para {computed} quiz(zes).")
+
+
+@click.command("archive_answers")
+@with_appcontext
+def archive_answers():
+    """Archiva las respuestas de las competencias finalizadas y elimina sus particiones."""
+    from app.services import AnswerArchiveService
+
+    archived = AnswerArchiveService.archive_finished_competitions()
+    for competition_quiz_id, rows in archived.items():
+        click.echo(f"Quiz {competition_quiz_id}: {rows} respuestas archivadas.")
+    click.echo(f"{len(archived)} quiz(zes) archivados.")
+
+
+@click.command("run_scheduler")
+@with_appcontext
+def run_scheduler_command():
+    """Ejecuta el scheduler de jobs en primer plano, como proceso separado de los workers web."""
+    from scheduler import run_scheduler_forever
+
+    run_scheduler_forever(current_app._get_current_object())
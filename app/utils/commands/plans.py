@@ -0,0 +1,92 @@
+from sqlalchemy import select, text, func
+from sqlalchemy.dialects import postgresql
+from extensions import db
+from app.models import CompetitionQuiz, CompetitionParticipant, CompetitionQuizParticipants, CompetitionQuizAnswer
+from app.utils.lib.constants import CompetitionQuizStatus
+from app.services.participant_history_service import history_query
+
+
+def hot_queries(competition_id=1, competition_quiz_id=1, participant_id=1):
+    """
+    Consultas de los caminos calientes del servicio, escritas igual que en los servicios/scheduler.
+    Devuelve una lista de (nombre, statement).
+    """
+    return [
+        ("scheduler: quizzes ACTIVO vencidos", (
+            select(CompetitionQuiz)
+            .where(
+                CompetitionQuiz.end_time <= func.now(),
+                CompetitionQuiz.status == CompetitionQuizStatus.ACTIVO
+            )
+            .with_for_update(skip_locked=True)
+        )),
+        ("ranking de competencia", (
+            select(CompetitionParticipant)
+            .where(CompetitionParticipant.competition_id == competition_id)
+            .order_by(CompetitionParticipant.score.desc())
+        )),
+        ("puntajes por quiz (process_quiz_results)", (
+            select(CompetitionQuizParticipants)
+            .where(
+                CompetitionQuizParticipants.competition_quiz_id == competition_quiz_id,
+                CompetitionQuizParticipants.end_time.isnot(None)
+            )
+            .order_by(CompetitionQuizParticipants.score.desc())
+        )),
+        ("competencias de un participante", (
+            select(CompetitionParticipant.competition_id)
+            .where(CompetitionParticipant.participant_id == participant_id)
+        )),
+        ("quizzes de un participante", (
+            select(CompetitionQuizParticipants)
+            .where(CompetitionQuizParticipants.participant_id == participant_id)
+        )),
+        ("historial de un participante", history_query(participant_id)),
+        ("respuestas de un participante en un quiz", (
+            select(CompetitionQuizAnswer)
+            .where(
+                CompetitionQuizAnswer.competition_id == competition_id,
+                CompetitionQuizAnswer.competition_quiz_id == competition_quiz_id,
+                CompetitionQuizAnswer.participant_id == participant_id
+            )
+        )),
+    ]
+
+
+def _seq_scans(plan_node):
+    """
+    Recorre el plan (EXPLAIN FORMAT JSON) y devuelve las tablas leídas con Seq Scan.
+    """
+    found = []
+    if plan_node.get("Node Type") == "Seq Scan":
+        found.append(plan_node.get("Relation Name"))
+    for child in plan_node.get("Plans", []):
+        found.extend(_seq_scans(child))
+    return found
+
+
+def explain_hot_queries(force_index=True, **sample_ids):
+    """
+    Ejecuta EXPLAIN sobre cada consulta caliente.
+
+    Con force_index=True se desactiva enable_seqscan: el planner solo vuelve a un Seq Scan si no
+    existe ningún índice utilizable, así que el chequeo no depende del volumen de datos (sirve contra
+    cualquier base, pero no detecta un índice que existe y el planner dejó de elegir). Con
+    force_index=False el planner elige libremente: el resultado solo es representativo sobre una base
+    con un volumen parecido al de producción (ver benchmarks/bench_plans.py).
+
+    :param sample_ids: competition_id, competition_quiz_id y participant_id usados como parámetros.
+    :return: Lista de (nombre, tablas con Seq Scan, plan).
+    """
+    results = []
+    dialect = postgresql.dialect()
+    for name, stmt in hot_queries(**sample_ids):
+        sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+        with db.engine.connect() as connection:
+            with connection.begin():
+                if force_index:
+                    connection.execute(text("SET LOCAL enable_seqscan = off"))
+                plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        root = plan[0]["Plan"]
+        results.append((name, _seq_scans(root), root))
+    return results
@@ -1,44 +1,72 @@
-import os
 from sqlalchemy import text, create_engine
-from flask_migrate import upgrade
-from seeders import run_seeders
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.exc import OperationalError
 
 def create_database_if_not_exists(app):
-    """Crea la base de datos en PostgreSQL si no existe"""
-    print("😝 ¿Existe la DB?")
+    """
+    Crea la base de datos en PostgreSQL si no existe.
+    Es un paso de inicialización explícito (flask init_db): no se ejecuta al crear la app.
+
+    :return: True si la base se creó en esta llamada.
+    """
+    db_url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+    db_name = db_url.database
+    print(f"😝 ¿Existe la DB {db_name}?")
 
-    db_url = app.config["SQLALCHEMY_DATABASE_URI"]
-    temp_db_url = db_url.rsplit("/", 1)[0] + "/postgres"
-    
     try:
-        engine = create_engine(temp_db_url, isolation_level="AUTOCOMMIT")
+        engine = create_engine(db_url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+        try:
+            with engine.connect() as connection:
+                exists = connection.execute(
+                    text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                    {"name": db_name}
+                ).scalar()
 
-        with engine.connect() as connection:
-            db_name = os.getenv('COMPETITION_POSTGRES_DB')
-            result = connection.execute(text(f"SELECT 1 FROM pg_database WHERE datname='{db_name}'"))
-            exists = result.scalar()
+                if exists:
+                    print(f"✅ La base de datos {db_name} ya existe.")
+                    return False
 
-            if not exists:
                 print(f"📌 Creando la base de datos {db_name}...")
-                connection.execute(text(f"CREATE DATABASE {db_name}"))
+                # Los identificadores no admiten parámetros: se citan con el preparer del dialecto
+                quoted_name = connection.dialect.identifier_preparer.quote(db_name)
+                connection.execute(text(f"CREATE DATABASE {quoted_name}"))
                 print(f"✅ Base de datos {db_name} creada exitosamente.")
-
-                # Ejecutar migraciones usando Flask Migrate
-                print("📌 Ejecutando migraciones...")
-                with app.app_context():
-                    try:
-                        upgrade()
-                        print("✅ Migraciones aplicadas correctamente.")
-                        print("📌 Iniciando seeders...")
-                        run_seeders()
-                        print("✅ Rutina de seeders finalizada.")
-                    except Exception as e:
-                        print(f"❌ Error al aplicar migraciones: {e}")
-            else:
-                print(f"✅ La base de datos {db_name} ya existe.")
+                return True
+        finally:
+            engine.dispose()
 
     except OperationalError as e:
         print("❌ No se pudo conectar al servidor PostgreSQL.")
         print("🔴 Asegúrate de que el servidor está corriendo (Levantar con docker-compose) y que los datos de conexión son correctos.")
         print(f"📌 Detalles: {e}")
+        raise
+
+
+def run_migrations_and_seeders(app):
+    """
+    Aplica las migraciones pendientes, crea las particiones de respuestas que falten
+    y, si SEED_DB = 'si' y la base no tiene competencias, ejecuta los seeders.
+    init_db corre en cada arranque del contenedor web: con datos ya cargados no se vuelve
+    a sembrar (para cargar más datos a propósito, usar `flask seed`).
+    Los imports son perezosos: Alembic y los seeders no se cargan al servir requests.
+    """
+    from flask_migrate import upgrade
+    from sqlalchemy import select
+    from seeders import run_seeders
+    from extensions import db
+    from app.models import Competition, CompetitionQuizAnswer
+
+    with app.app_context():
+        print("📌 Ejecutando migraciones...")
+        upgrade()
+        print("✅ Migraciones aplicadas correctamente.")
+        created = CompetitionQuizAnswer.maintain_partitions(db.session)
+        print(f"✅ Particiones de respuestas al día ({len(created)} nuevas).")
+        if app.config.get('SEED_DB', 'no') != 'si':
+            return
+        if db.session.execute(select(Competition.id).limit(1)).first():
+            print("⏭️ La base ya tiene datos: se omiten los seeders (usar `flask seed` para cargar más).")
+        else:
+            print("📌 Iniciando seeders...")
+            run_seeders()
+            print("✅ Rutina de seeders finalizada.")
@@ -0,0 +1,120 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from prometheus_client import Histogram
+from app.utils.metrics import sampled_gauge
+
+POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds',
+    'Tiempo de espera para obtener una conexión del pool de SQLAlchemy.',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool que registra cuánto tarda cada checkout (espera en la cola + conexión nueva si hace falta).
+    """
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
+def build_engine_options(
+    pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping,
+    statement_timeout_ms, idle_in_transaction_timeout_ms, pgbouncer=False
+):
+    """
+    Arma SQLALCHEMY_ENGINE_OPTIONS para el engine principal.
+
+    En modo PgBouncer (pool por transacción) no se envían parámetros de arranque (`options`),
+    que PgBouncer rechaza; los timeouts se aplican por transacción con SET LOCAL
+    (ver register_engine_events).
+    """
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": pool_timeout,
+        "pool_recycle": pool_recycle,
+        "pool_pre_ping": pool_pre_ping,
+    }
+    if not pgbouncer:
+        options["connect_args"] = {
+            "options": (
+                f"-c statement_timeout={statement_timeout_ms} "
+                f"-c idle_in_transaction_session_timeout={idle_in_transaction_timeout_ms}"
+            )
+        }
+    return options
+
+
+def register_engine_events(engine, config):
+    """
+    Registra los eventos del engine que dependen de la configuración.
+    Solo hace falta en modo PgBouncer: los SET de sesión no sobreviven entre transacciones.
+    """
+    if not config.get('DB_PGBOUNCER'):
+        return
+
+    statement_timeout_ms = int(config['DB_STATEMENT_TIMEOUT_MS'])
+    idle_in_transaction_timeout_ms = int(config['DB_IDLE_IN_TRANSACTION_TIMEOUT_MS'])
+
+    @event.listens_for(engine, 'begin')
+    def _set_transaction_timeouts(conn):
+        conn.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {statement_timeout_ms}; "
+            f"SET LOCAL idle_in_transaction_session_timeout = {idle_in_transaction_timeout_ms}"
+        )
+
+
+def pool_status(engine):
+    """
+    Estado actual del pool y resumen de la espera de checkout, para health checks y métricas.
+    """
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        })
+    wait = {
+        sample.name.rsplit('_', 1)[1]: sample.value
+        for metric in POOL_CHECKOUT_WAIT.collect() for sample in metric.samples
+        if sample.name.endswith(('_count', '_sum'))
+    }
+    status["checkout_wait"] = {
+        "count": int(wait.get('count', 0)),
+        "sum_seconds": round(wait.get('sum', 0.0), 6),
+    }
+    return status
+
+
+def register_pool_gauges(get_engines):
+    """
+    Expone el estado de los pools como gauges de Prometheus, muestreados en cada worker (ver sampled_gauge).
+
+    :param get_engines: Callable que devuelve {nombre: engine} (primario y réplicas).
+    """
+    def pool_values(read):
+        def collect():
+            values = []
+            for name, engine in get_engines().items():
+                if isinstance(engine.pool, QueuePool):
+                    values.append(({"engine": name}, read(engine.pool)))
+            return values
+        return collect
+
+    labelnames = ('engine',)
+    sampled_gauge('db_pool_size', 'Tamaño configurado del pool.', pool_values(lambda pool: pool.size()), labelnames)
+    sampled_gauge('db_pool_checked_out', 'Conexiones en uso.', pool_values(lambda pool: pool.checkedout()), labelnames)
+    sampled_gauge('db_pool_checked_in', 'Conexiones libres en el pool.', pool_values(lambda pool: pool.checkedin()), labelnames)
+    sampled_gauge(
+        'db_pool_overflow', 'Conexiones abiertas por encima de pool_size.', pool_values(lambda pool: pool.overflow()), labelnames
+    )
@@ -0,0 +1,112 @@
+import logging
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.utils.errors.CustomException import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+# Estadísticas de la request en curso; None fuera de una request (scheduler, CLI)
+_request_stats = ContextVar('db_request_stats', default=None)
+
+
+class QueryStats:
+    __slots__ = ('count', 'seconds', 'endpoint', 'budget', 'enforce', 'exceeded')
+
+    def __init__(self, endpoint=None, budget=0, enforce=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.endpoint = endpoint
+        self.budget = budget
+        self.enforce = enforce
+        self.exceeded = False
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    if stats is None:
+        return
+    if stats.enforce and stats.budget and stats.count >= stats.budget and not stats.exceeded:
+        # Se corta antes de ejecutar la consulta que excede el presupuesto. Solo una vez, para que
+        # el manejo del error (rollback, etc.) pueda seguir usando la base.
+        stats.exceeded = True
+        raise QueryBudgetExceeded(stats.endpoint, stats.count + 1, stats.budget)
+    context._query_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started_at = getattr(context, '_query_started_at', None)
+    if stats is None or started_at is None:
+        return
+    stats.count += 1
+    stats.seconds += time.perf_counter() - started_at
+
+
+def parse_query_budgets(spec):
+    """
+    Convierte "competition.get_competitions=5,quiz.finish_quiz=12" en {"competition.get_competitions": 5, ...}.
+    """
+    budgets = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            endpoint, budget = item.split("=", 1)
+            budgets[endpoint.strip()] = int(budget)
+    return budgets
+
+
+def init_query_tracking(app):
+    """
+    Cuenta las consultas SQL y el tiempo en base de datos de cada request (todos los engines,
+    réplicas incluidas) y los devuelve en X-DB-Query-Count / X-DB-Time-ms y en la línea de acceso.
+
+    Si la request supera su presupuesto (DB_QUERY_BUDGETS por endpoint, o DB_QUERY_BUDGET) se
+    registra un warning; con DB_QUERY_BUDGET_ENFORCE se lanza QueryBudgetExceeded para que los
+    N+1 fallen en desarrollo y en los tests. El error se lanza al intentar la consulta que excede
+    el presupuesto, nunca después de responder: after_request solo informa.
+
+    El rollback del error solo revierte la transacción en curso. Los caminos que hacen commit a
+    mitad de la request (delete_in_batches, backfill_question_stats, el archivado de respuestas)
+    pueden quedar a medio hacer: lo ya confirmado queda escrito. Los manejadores que capturan
+    Exception deben relanzar QueryBudgetExceeded para que el error no se convierta en otro.
+    Las consultas que corren mientras se transmite una respuesta en streaming quedan fuera de
+    la cuenta (los headers ya se enviaron).
+    """
+    from flask import request, g
+
+    default_budget = app.config['DB_QUERY_BUDGET']
+    budgets = parse_query_budgets(app.config['DB_QUERY_BUDGETS'])
+    enforce = app.config['DB_QUERY_BUDGET_ENFORCE']
+
+    @app.before_request
+    def _start_query_tracking():
+        budget = budgets.get(request.endpoint, default_budget)
+        g.db_stats_token = _request_stats.set(QueryStats(request.endpoint, budget, enforce))
+
+    @app.after_request
+    def _report_queries(response):
+        stats = _request_stats.get()
+        if stats is None:
+            return response
+
+        db_time_ms = round(stats.seconds * 1000, 2)
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+        response.headers['X-DB-Time-ms'] = str(db_time_ms)
+        g.log_fields = {**g.get('log_fields', {}), "db_queries": stats.count, "db_time_ms": db_time_ms}
+
+        if stats.budget and (stats.exceeded or stats.count > stats.budget):
+            logger.warning(
+                "Presupuesto de consultas excedido en %s: %s (presupuesto %s)",
+                stats.endpoint, stats.count, stats.budget,
+                extra={"endpoint": stats.endpoint, "db_queries": stats.count, "budget": stats.budget}
+            )
+        return response
+
+    @app.teardown_request
+    def _end_query_tracking(exc):
+        token = g.pop('db_stats_token', None)
+        if token:
+            _request_stats.reset(token)
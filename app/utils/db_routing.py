@@ -0,0 +1,159 @@
+import itertools
+import logging
+import threading
+import time
+import types
+from contextvars import ContextVar
+from functools import wraps
+
+from flask import current_app
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Query
+from app.utils.errors.CustomException import QueryBudgetExceeded
+from app.utils.db_pool import register_engine_events
+
+logger = logging.getLogger(__name__)
+
+# Marca las lecturas que pueden resolverse contra una réplica
+_use_replica = ContextVar('use_replica', default=False)
+
+_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaRouter:
+    """
+    Administra los engines de las réplicas de lectura y elige una por round-robin,
+    descartando las que tienen un retraso de replicación mayor al permitido.
+    El retraso se consulta como máximo una vez cada `lag_check_interval` segundos por réplica.
+    """
+    def __init__(self, urls, engine_options, max_lag_seconds, lag_check_interval):
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_interval = lag_check_interval
+        self.engines = [create_engine(url, **engine_options) for url in urls]
+        self._lag = {}  # engine -> (lag en segundos o None si falló, momento de la medición)
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+
+    def _replica_lag(self, engine):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._lag.get(engine)
+            if cached and now - cached[1] < self.lag_check_interval:
+                return cached[0]
+            # Se registra antes de consultar para que otros hilos no repitan la medición
+            self._lag[engine] = (cached[0] if cached else None, now)
+
+        try:
+            with engine.connect() as connection:
+                lag = float(connection.execute(_REPLICA_LAG_SQL).scalar() or 0)
+        except QueryBudgetExceeded:
+            raise
+        except Exception as e:
+            logger.warning(f"Réplica {engine.url.host} no disponible: {e}")
+            lag = None
+
+        with self._lock:
+            self._lag[engine] = (lag, now)
+        return lag
+
+    def pick(self):
+        """
+        Devuelve un engine de réplica sana, o None si hay que usar el primario.
+        """
+        for _ in range(len(self.engines)):
+            with self._lock:
+                engine = self.engines[next(self._cycle)]
+            lag = self._replica_lag(engine)
+            if lag is not None and lag <= self.max_lag_seconds:
+                return engine
+        return None
+
+    def dispose(self, close=True):
+        for engine in self.engines:
+            engine.dispose(close=close)
+
+
+class RoutingSession(Session):
+    """
+    Sesión que envía a una réplica las consultas ejecutadas dentro de un método @replica_read.
+    Escrituras, flushes y SELECT ... FOR UPDATE siempre van al primario.
+    La réplica elegida queda fija durante la vida de la sesión (una request) para no abrir
+    conexiones contra varias réplicas.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _use_replica.get() and not self._flushing and not _is_write(clause):
+            engine = self.info.get('replica_engine')
+            if engine is None:
+                router = current_app.extensions.get('replica_router')
+                engine = router.pick() if router else None
+                self.info['replica_engine'] = engine
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _is_write(clause):
+    if clause is None:
+        return False
+    return getattr(clause, 'is_dml', False) or getattr(clause, '_for_update_arg', None) is not None
+
+
+def _iter_on_replica(iterable):
+    """
+    Itera un Query o generador perezoso (p. ej. con yield_per) manteniendo la lectura en la réplica.
+    """
+    iterator = None
+    while True:
+        token = _use_replica.set(True)
+        try:
+            if iterator is None:
+                iterator = iter(iterable)
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _use_replica.reset(token)
+        yield item
+
+
+def replica_read(func):
+    """
+    Decorador para métodos de solo lectura: sus consultas se resuelven en una réplica si hay una
+    configurada y al día; si no, en el primario. Si el método devuelve un Query sin ejecutar
+    o un generador, su iteración posterior también se enruta a la réplica.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+        if isinstance(result, (Query, types.GeneratorType)):
+            return _iter_on_replica(result)
+        return result
+    return wrapper
+
+
+def init_replicas(app):
+    """
+    Crea el router de réplicas si hay URLs configuradas.
+    """
+    urls = app.config.get('SQLALCHEMY_REPLICA_URIS') or []
+    if not urls:
+        return
+    router = ReplicaRouter(
+        urls,
+        engine_options=app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+        max_lag_seconds=app.config['DB_REPLICA_MAX_LAG_SECONDS'],
+        lag_check_interval=app.config['DB_REPLICA_LAG_CHECK_INTERVAL'],
+    )
+    for engine in router.engines:
+        register_engine_events(engine, app.config)
+    app.extensions['replica_router'] = router
@@ -47,4 +47,16 @@ class PermissionError(CustomException):
     Error relacionado con permisos.
     """
     def __init__(self, message, code=403):
-        super().__init__(message, code)
\ No newline at end of file
+        super().__init__(message, code)
+
+
+class QueryBudgetExceeded(CustomException):
+    """
+    Un endpoint ejecutó más consultas SQL que su presupuesto (típicamente un N+1).
+    Solo se lanza con DB_QUERY_BUDGET_ENFORCE activo (desarrollo/tests).
+    """
+    def __init__(self, endpoint, count, budget, code=500):
+        super().__init__(f"El endpoint {endpoint} ejecutó {count} consultas SQL (presupuesto: {budget})", code)
+        self.endpoint = endpoint
+        self.count = count
+        self.budget = budget
@@ -1,11 +1,7 @@
 from flask import jsonify
 from app.utils.errors.CustomException import CustomException
-from app.utils.logs.logger_config import setup_logging
 import logging
 
-# Configurar logging al iniciar la aplicación
-setup_logging()
-
 def register_error_handlers(app):
     """
     Registra manejadores de errores personalizados en la aplicación Flask.
@@ -0,0 +1,310 @@
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+
+from sqlalchemy import create_engine, select as sa_select, text
+from sqlalchemy.pool import NullPool
+from extensions import db
+from app.utils.metrics import sampled_gauge
+
+logger = logging.getLogger(__name__)
+
+# Canal de Postgres por el que se avisa que cambiaron los puntajes de una competencia
+LEADERBOARD_CHANNEL = 'competition_leaderboard'
+# Workers de gunicorn que atienden cada conexión en una corrutina en lugar de un hilo
+ASYNC_WORKER_CLASSES = ('gevent', 'eventlet')
+
+
+def notify_leaderboard_changed(competition_id):
+    """
+    Encola un NOTIFY en la transacción actual. Postgres lo entrega a los que escuchan recién
+    cuando la transacción hace commit (y nunca si hace rollback), y agrupa los avisos repetidos.
+    """
+    db.session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": LEADERBOARD_CHANNEL, "payload": json.dumps({"competition_id": competition_id})}
+    )
+
+
+def stream_capacity(worker_class, threads, max_clients):
+    """
+    Cupo de clientes SSE por worker. Cada cliente retiene mientras dure la conexión lo que lo atiende:
+    - servidor de desarrollo (worker_class vacío) y workers asíncronos: max_clients.
+    - gthread: a lo sumo threads - 2, para que siempre queden hilos para las demás requests.
+    - sync (o cualquier otro): 0. Su único hilo quedaría tomado y el timeout mataría al worker.
+
+    :return: Cantidad máxima de clientes; 0 desactiva el stream en este worker.
+    """
+    worker_class = (worker_class or "").lower()
+    if not worker_class or any(name in worker_class for name in ASYNC_WORKER_CLASSES):
+        return max_clients
+    if 'gthread' in worker_class:
+        return max(0, min(max_clients, threads - 2))
+    return 0
+
+
+def _format_event(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _rank(rows):
+    """
+    Convierte [(participant_id, score)] ordenado por puntaje en {participant_id: (score, puesto)}.
+    Los empates comparten puesto (1 + cantidad de participantes con más puntaje).
+    """
+    ranking = {}
+    position, previous_score = 0, None
+    for index, (participant_id, score) in enumerate(rows, start=1):
+        if score != previous_score:
+            position, previous_score = index, score
+        ranking[participant_id] = (score, position)
+    return ranking
+
+
+def _as_entries(ranking, participant_ids):
+    return sorted(
+        ({"participant_id": pid, "score": ranking[pid][0], "rank": ranking[pid][1]} for pid in participant_ids),
+        key=lambda entry: (entry["rank"], entry["participant_id"])
+    )
+
+
+class _Board:
+    """
+    Último ranking conocido de una competencia y las colas de sus clientes conectados.
+    """
+    def __init__(self, ranking):
+        self.ranking = ranking
+        self.version = 0
+        self.clients = set()
+
+
+class LeaderboardHub:
+    """
+    Reparte por SSE los cambios del ranking de las competencias a los clientes de este proceso.
+
+    Un hilo por worker escucha LEADERBOARD_CHANNEL con una conexión propia (fuera del pool).
+    Ante cada aviso, y solo si hay clientes mirando esa competencia, lee el ranking una vez,
+    lo compara con el último que envió y manda a cada cliente solo las filas que cambiaron.
+    """
+    def __init__(self, app, listen_uri, max_clients, queue_size, heartbeat_seconds):
+        self.app = app
+        self.listen_uri = listen_uri
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        self.heartbeat_seconds = heartbeat_seconds
+        self._boards = {}  # competition_id -> _Board
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    # Clientes
+
+    @property
+    def enabled(self):
+        return self.max_clients > 0
+
+    def client_count(self):
+        with self._lock:
+            return sum(len(board.clients) for board in self._boards.values())
+
+    def subscribe(self, competition_id):
+        """
+        Registra un cliente y le deja en su cola el ranking completo como primer evento.
+        Debe llamarse dentro de un contexto de aplicación.
+
+        :return: Cola de eventos SSE ya formateados, o None si se alcanzó el máximo de clientes.
+        """
+        if self.client_count() >= self.max_clients:
+            return None
+        self._ensure_listener()
+
+        with self._lock:
+            board = self._boards.get(competition_id)
+        if board is None:
+            ranking = self._load_ranking(competition_id)
+            with self._lock:
+                board = self._boards.setdefault(competition_id, _Board(ranking))
+
+        client = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            board.clients.add(client)
+            client.put_nowait(_format_event(
+                "snapshot",
+                {"competition_id": competition_id, "ranking": _as_entries(board.ranking, board.ranking)},
+                board.version
+            ))
+        return client
+
+    def unsubscribe(self, competition_id, client):
+        with self._lock:
+            board = self._boards.get(competition_id)
+            if board is None:
+                return
+            board.clients.discard(client)
+            if not board.clients:
+                # Sin clientes no se sigue el ranking: el próximo suscriptor lo vuelve a leer
+                del self._boards[competition_id]
+
+    def events(self, competition_id, client):
+        """
+        Generador de la respuesta SSE: entrega los eventos de la cola y un comentario cada
+        heartbeat_seconds para que proxies y clientes no den la conexión por muerta.
+        """
+        try:
+            while True:
+                try:
+                    event = client.get(timeout=self.heartbeat_seconds)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:  # El cliente quedó atrasado y se lo desconectó
+                    return
+                yield event
+        finally:
+            self.unsubscribe(competition_id, client)
+
+    # Escucha de avisos
+
+    def _ensure_listener(self):
+        # Con preload_app los hilos no sobreviven al fork: cada worker arranca el suyo
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._listen_forever, name="leaderboard-listener", daemon=True)
+            self._thread.start()
+
+    def _listen_forever(self):
+        engine = create_engine(self.listen_uri, poolclass=NullPool)
+        backoff = 1
+        while True:
+            connection = None
+            try:
+                connection = engine.raw_connection()
+                connection.dbapi_connection.autocommit = True
+                cursor = connection.cursor()
+                cursor.execute(f"LISTEN {LEADERBOARD_CHANNEL}")
+                logger.debug("Escuchando %s", LEADERBOARD_CHANNEL)
+                # Los avisos enviados mientras no se escuchaba se perdieron: releer todo lo que se sigue
+                self._refresh(self._watched())
+                backoff = 1
+                self._drain(connection.dbapi_connection)
+            except Exception:
+                logger.exception("Se perdió la escucha de %s, reintentando en %ss", LEADERBOARD_CHANNEL, backoff)
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+    def _drain(self, dbapi_connection):
+        while True:
+            if select.select([dbapi_connection], [], [], self.heartbeat_seconds) == ([], [], []):
+                continue
+            dbapi_connection.poll()
+            changed = set()
+            while dbapi_connection.notifies:
+                notify = dbapi_connection.notifies.pop(0)
+                try:
+                    changed.add(int(json.loads(notify.payload)["competition_id"]))
+                except (ValueError, KeyError, TypeError):
+                    logger.warning("Aviso inválido en %s: %s", LEADERBOARD_CHANNEL, notify.payload)
+            self._refresh(changed & self._watched())
+
+    def _watched(self):
+        with self._lock:
+            return set(self._boards)
+
+    def _refresh(self, competition_ids):
+        for competition_id in competition_ids:
+            with self.app.app_context():
+                ranking = self._load_ranking(competition_id)
+            self._publish(competition_id, ranking)
+
+    def _publish(self, competition_id, ranking):
+        with self._lock:
+            board = self._boards.get(competition_id)
+            if board is None:
+                return
+            changed = [pid for pid, value in ranking.items() if board.ranking.get(pid) != value]
+            removed = [pid for pid in board.ranking if pid not in ranking]
+            if not changed and not removed:
+                return
+            board.version += 1
+            event = _format_event(
+                "delta",
+                {
+                    "competition_id": competition_id,
+                    "changed": _as_entries(ranking, changed),
+                    "removed": sorted(removed),
+                },
+                board.version
+            )
+            board.ranking = ranking
+            for client in list(board.clients):
+                try:
+                    client.put_nowait(event)
+                except queue.Full:
+                    # Un cliente que no consume no frena al resto: se lo corta y al reconectar recibe el snapshot
+                    board.clients.discard(client)
+                    _close_client(client)
+
+    @staticmethod
+    def _load_ranking(competition_id):
+        from app.models import CompetitionParticipant
+
+        rows = db.session.execute(
+            sa_select(CompetitionParticipant.participant_id, CompetitionParticipant.score)
+            .where(CompetitionParticipant.competition_id == competition_id)
+            .order_by(CompetitionParticipant.score.desc(), CompetitionParticipant.participant_id)
+        ).all()
+        return _rank(rows)
+
+
+def _close_client(client):
+    # Vacía la cola para que entre la marca de cierre
+    while True:
+        try:
+            client.get_nowait()
+        except queue.Empty:
+            break
+    client.put_nowait(None)
+
+
+def init_leaderboard_stream(app):
+    """
+    Crea el hub de SSE del ranking. El hilo de escucha arranca con el primer cliente.
+    El cupo de clientes depende del tipo de worker (ver stream_capacity).
+    """
+    max_clients = stream_capacity(
+        app.config.get('WEB_WORKER_CLASS'), app.config.get('WEB_THREADS', 1),
+        app.config['LEADERBOARD_STREAM_MAX_CLIENTS']
+    )
+    if max_clients == 0:
+        logger.warning(
+            "Ranking en vivo (SSE) desactivado con worker %s y %s hilos: usar un proceso con "
+            "COMPETITION_WEB_THREADS > 2 o COMPETITION_WEB_WORKER_CLASS=gevent",
+            app.config.get('WEB_WORKER_CLASS'), app.config.get('WEB_THREADS', 1)
+        )
+    hub = LeaderboardHub(
+        app,
+        listen_uri=app.config.get('LEADERBOARD_LISTEN_URI') or app.config['SQLALCHEMY_DATABASE_URI'],
+        max_clients=max_clients,
+        queue_size=app.config['LEADERBOARD_STREAM_QUEUE_SIZE'],
+        heartbeat_seconds=app.config['LEADERBOARD_STREAM_HEARTBEAT_SECONDS'],
+    )
+    app.extensions['leaderboard_hub'] = hub
+    sampled_gauge('leaderboard_stream_clients', 'Clientes SSE del ranking conectados a este proceso.',
+                  lambda: [({}, hub.client_count())])
+    return hub
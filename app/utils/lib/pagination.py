@@ -0,0 +1,33 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+# Tope de elementos por página en los endpoints paginados por cursor
+MAX_PER_PAGE = 1000
+
+
+def encode_cursor(created_at, row_id):
+    """
+    Codifica la posición (created_at, id) de la última fila de una página como un token opaco.
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decodifica un token de encode_cursor.
+
+    :return: Tupla (created_at, id).
+    :raises ValueError: Si el token no es válido.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as e:
+        raise ValueError(f"Cursor inválido: {token}") from e
+    if type(row_id) is not int or created_at.tzinfo is None:
+        raise ValueError(f"Cursor inválido: {token}")
+    return created_at, row_id
@@ -1,11 +1,11 @@
-from tabulate import tabulate
-
 def pretty_print_dict(data):
     """
     Imprime un diccionario en formato de tabla para mostrar sus claves y valores de forma legible.
     
     :param data: Diccionario con los datos a imprimir.
     """
+    from tabulate import tabulate  # Import perezoso: solo se usa para depurar
+
     if not isinstance(data, dict):
         raise ValueError("El argumento proporcionado debe ser un diccionario.")
     
@@ -0,0 +1,161 @@
+import csv
+import io
+import json
+import zlib
+from flask import Response, request, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+CSV_MIMETYPE = 'text/csv'
+GZIP_MIMETYPE = 'application/gzip'
+
+# Cantidad de filas que se piden al cursor de servidor y que se serializan juntas
+STREAM_BATCH_SIZE = 500
+
+# Bytes acumulados antes de comprimir y enviar un bloque al cliente
+_FLUSH_THRESHOLD = 64 * 1024
+
+
+def wants_ndjson():
+    """
+    Indica si el cliente pidió NDJSON, ya sea con ?format=ndjson o con el header Accept.
+    """
+    fmt = request.args.get('format')
+    if fmt:
+        return fmt.lower() == 'ndjson'
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def wants_stream():
+    """
+    Indica si el cliente pidió una respuesta en streaming (?stream=true o NDJSON).
+    """
+    return wants_ndjson() or request.args.get('stream', '').lower() in ('1', 'true', 'si')
+
+
+def negotiate_encoding():
+    """
+    Elige la codificación de contenido según Accept-Encoding (gzip > deflate > identity).
+    """
+    for encoding in ('gzip', 'deflate'):
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def _compressor(encoding):
+    if encoding == 'gzip':
+        return zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if encoding == 'deflate':
+        return zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS)
+    return None
+
+
+def _encode(chunks, encoding):
+    """
+    Agrupa los fragmentos en bloques y los comprime (si corresponde) sin acumular la respuesta entera.
+    Cada bloque se vacía con Z_SYNC_FLUSH para que el cliente reciba datos cuanto antes.
+    """
+    compressor = _compressor(encoding)
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= _FLUSH_THRESHOLD:
+            block = b''.join(buffer)
+            buffer, size = [], 0
+            yield compressor.compress(block) + compressor.flush(zlib.Z_SYNC_FLUSH) if compressor else block
+
+    block = b''.join(buffer)
+    if compressor:
+        yield compressor.compress(block) + compressor.flush(zlib.Z_FINISH)
+    elif block:
+        yield block
+
+
+def _json_array_chunks(items, serialize, wrap_key):
+    yield '{"%s":[' % wrap_key if wrap_key else '['
+    separator = ''
+    for item in items:
+        yield separator + json.dumps(serialize(item))
+        separator = ','
+    yield ']}' if wrap_key else ']'
+
+
+def _ndjson_chunks(items, serialize):
+    for item in items:
+        yield json.dumps(serialize(item)) + '\n'
+
+
+def csv_chunks(header, rows):
+    """
+    Genera un CSV (RFC 4180) fila por fila: primero el encabezado y luego cada tupla de `rows`.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    if header:
+        writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= _FLUSH_THRESHOLD:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(items, serialize=lambda obj: obj):
+    """
+    Genera una línea JSON por elemento.
+    """
+    return _ndjson_chunks(items, serialize)
+
+
+def stream_chunks_response(chunks, mimetype, status=200, headers=None):
+    """
+    Devuelve una Response en streaming a partir de un generador de fragmentos de texto,
+    aplicando la compresión negociada con el cliente.
+    """
+    encoding = negotiate_encoding()
+    response = Response(
+        stream_with_context(_encode(chunks, encoding)),
+        status=status,
+        mimetype=mimetype,
+        headers=headers,
+    )
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def stream_download_response(chunks, mimetype, filename, gzip_file=False):
+    """
+    Devuelve un archivo descargable en streaming. Con gzip_file=True el archivo mismo es un .gz
+    (Content-Type application/gzip); si no, se aplica la compresión de transporte negociada.
+    """
+    if not gzip_file:
+        return stream_chunks_response(
+            chunks, mimetype, headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        )
+    return Response(
+        stream_with_context(_encode(chunks, 'gzip')),
+        mimetype=GZIP_MIMETYPE,
+        headers={'Content-Disposition': f'attachment; filename="{filename}.gz"'},
+    )
+
+
+def stream_json_response(items, serialize=lambda obj: obj.to_dict(), wrap_key=None, status=200):
+    """
+    Serializa un iterable (idealmente un cursor de servidor con yield_per) como un array JSON
+    o como NDJSON, según lo pedido por el cliente, sin materializar la lista en memoria.
+
+    :param items: Iterable de objetos a serializar.
+    :param serialize: Función que convierte cada objeto en un dict serializable.
+    :param wrap_key: Si se indica, el array se envuelve en {"<wrap_key>": [...]} (solo JSON).
+    """
+    if wants_ndjson():
+        return stream_chunks_response(_ndjson_chunks(items, serialize), NDJSON_MIMETYPE, status)
+    return stream_chunks_response(_json_array_chunks(items, serialize, wrap_key), 'application/json', status)
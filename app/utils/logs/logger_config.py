@@ -1,23 +1,185 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import os
+import queue
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 
-def setup_logging():
+# Contexto de la línea de log: id de la request (o del job) y el instante en que empezó
+_log_request_id = ContextVar('log_request_id', default=None)
+_log_started_at = ContextVar('log_started_at', default=None)
+
+# Atributos propios de LogRecord: todo lo demás se considera un campo `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_queue_handler = None
+_listener = None
+
+
+class ContextFilter(logging.Filter):
+    """
+    Agrega request_id y duration_ms (ms desde el inicio de la request/job) a cada registro.
+    Corre en el hilo que loguea, antes de encolar, así que ve los ContextVar correctos.
+    """
+    def filter(self, record):
+        record.request_id = _log_request_id.get()
+        started_at = _log_started_at.get()
+        record.duration_ms = round((time.perf_counter() - started_at) * 1000, 2) if started_at else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Una línea JSON por registro: ts, level, logger, msg, request_id, duration_ms y los campos `extra`.
+    """
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "request_id": getattr(record, 'request_id', None),
+            "duration_ms": getattr(record, 'duration_ms', None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def parse_log_levels(spec):
+    """
+    Convierte "scheduler=INFO,app.services=DEBUG" en {"scheduler": "INFO", "app.services": "DEBUG"}.
+    """
+    levels = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(level="INFO", module_levels=None, log_format="json"):
     """
-    Configura el logger para registrar errores en un archivo con rotación.
+    Configura el logging de la aplicación sin I/O bloqueante en el camino de las requests:
+    los loggers solo encolan (QueueHandler) y un hilo de fondo (QueueListener) escribe a
+    stdout y, para errores, al archivo rotativo errors.log.
+
+    :param level: Nivel del logger raíz.
+    :param module_levels: Dict {logger: nivel} para subir/bajar el detalle por módulo.
+    :param log_format: "json" (una línea JSON por registro) o "text".
     """
+    global _queue_handler, _listener
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    for name, module_level in (module_levels or {}).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    if _queue_handler is not None:
+        return  # Ya configurado (p. ej. varias apps en el mismo proceso)
+
+    if log_format == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s')
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
     # Configura un handler con rotación de archivos
-    handler = RotatingFileHandler(
+    file_handler = RotatingFileHandler(
         'errors.log',  # Nombre del archivo de log
         maxBytes=100000,  # Tamaño máximo del archivo en bytes (100 KB)
         backupCount=5     # Número de backups antes de sobrescribir
     )
-    handler.setLevel(logging.ERROR)  # Nivel de log (solo errores y más graves)
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    handler.setFormatter(formatter)
+    file_handler.setLevel(logging.ERROR)  # Solo errores y más graves
+    file_handler.setFormatter(formatter)
+
+    _queue_handler = QueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(ContextFilter())
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(_queue_handler.queue, stream_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_stop_listener)
+    # El hilo del listener no sobrevive a un fork (workers de gunicorn): cada hijo arranca el suyo
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+def _stop_listener():
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def _restart_listener_in_child():
+    global _listener
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers, respect_handler_level=True)
+    _listener.start()
+
+
+@contextmanager
+def log_context(request_id=None):
+    """
+    Asocia un id (y un reloj para duration_ms) a todos los logs emitidos dentro del bloque.
+    Lo usan los jobs del scheduler; las requests lo obtienen con init_request_logging.
+    """
+    id_token = _log_request_id.set(request_id or uuid.uuid4().hex)
+    start_token = _log_started_at.set(time.perf_counter())
+    try:
+        yield
+    finally:
+        _log_request_id.reset(id_token)
+        _log_started_at.reset(start_token)
+
+
+def init_request_logging(app):
+    """
+    Asigna un request id a cada request (se respeta X-Request-ID si viene del gateway),
+    lo devuelve en la respuesta y registra una línea de acceso en el logger 'app.access'.
+    Otros hooks pueden sumar campos a esa línea dejándolos en `g.log_fields`; como Flask corre
+    los after_request en orden inverso, deben registrarse después de esta función.
+    """
+    from flask import request, g
+
+    access_logger = logging.getLogger('app.access')
+
+    @app.before_request
+    def _start_request_log_context():
+        g.log_tokens = (
+            _log_request_id.set(request.headers.get('X-Request-ID') or uuid.uuid4().hex),
+            _log_started_at.set(time.perf_counter()),
+        )
+
+    @app.after_request
+    def _log_request(response):
+        request_id = _log_request_id.get()
+        if request_id:
+            response.headers['X-Request-ID'] = request_id
+        if access_logger.isEnabledFor(logging.INFO):
+            access_logger.info(
+                "%s %s %s", request.method, request.path, response.status_code,
+                extra={
+                    "method": request.method, "path": request.path, "status": response.status_code,
+                    **g.get('log_fields', {})
+                }
+            )
+        return response
 
-    # Configura el logger principal
-    logger = logging.getLogger()  # Obtén el logger raíz
-    logger.addHandler(handler)
-    logger.setLevel(logging.ERROR)  # Nivel de log para la aplicación
+    @app.teardown_request
+    def _end_request_log_context(exc):
+        tokens = g.pop('log_tokens', None)
+        if tokens:
+            _log_request_id.reset(tokens[0])
+            _log_started_at.reset(tokens[1])
@@ -0,0 +1,128 @@
+"""
+Métricas de Prometheus (prometheus_client).
+
+Con gunicorn cada worker es un proceso y un scrape llega a uno cualquiera. Si PROMETHEUS_MULTIPROC_DIR
+está definido antes de importar prometheus_client (lo hace gunicorn.conf.py), cada proceso escribe sus
+valores en archivos de ese directorio y /metrics los suma con MultiProcessCollector; el maestro llama a
+mark_process_dead cuando termina un worker.
+
+Los gauges de estado (pool de conexiones, clientes SSE) no se pueden calcular al momento del scrape
+para todos los workers: cada worker los muestrea (sampled_gauge) y se exponen por pid, solo los de
+workers vivos.
+"""
+import logging
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# Gauges muestreados, por nombre: (gauge, callback que devuelve [(dict de etiquetas, valor)])
+_SAMPLED = {}
+_sampled_lock = threading.Lock()
+_sampler = {"thread": None, "pid": None}
+
+
+def multiprocess_enabled():
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def sampled_gauge(name, documentation, callback, labelnames=()):
+    """
+    Registra (o reemplaza el callback de) un gauge cuyo valor calcula `callback`, que devuelve
+    [(dict de etiquetas, valor)]. Se muestrea en cada scrape y, con varios workers, periódicamente
+    en cada uno (start_gauge_sampler). No tiene costo en las requests.
+    """
+    with _sampled_lock:
+        current = _SAMPLED.get(name)
+        metric = current[0] if current else Gauge(
+            name, documentation, labelnames=labelnames, multiprocess_mode='liveall'
+        )
+        _SAMPLED[name] = (metric, callback)
+        return metric
+
+
+def sample_gauges():
+    for name, (metric, callback) in list(_SAMPLED.items()):
+        try:
+            for labels, value in callback():
+                (metric.labels(**labels) if labels else metric).set(value)
+        except Exception:
+            logger.exception("No se pudo muestrear el gauge %s", name)
+
+
+def start_gauge_sampler(interval_seconds):
+    """
+    Arranca en este proceso el hilo que muestrea los gauges (con preload_app los hilos no
+    sobreviven al fork: se llama desde post_fork). Sin modo multiproceso no hace falta.
+    """
+    if not multiprocess_enabled():
+        return
+    thread = _sampler["thread"]
+    if thread is not None and thread.is_alive() and _sampler["pid"] == os.getpid():
+        return
+
+    def sample_forever():
+        while True:
+            sample_gauges()
+            time.sleep(interval_seconds)
+
+    thread = threading.Thread(target=sample_forever, name="metrics-sampler", daemon=True)
+    _sampler.update(thread=thread, pid=os.getpid())
+    thread.start()
+
+
+def render_prometheus():
+    """
+    Serializa las métricas en el formato de texto de Prometheus. En modo multiproceso son las de
+    todos los workers (vivos y terminados) sumadas; si no, las de este proceso.
+    """
+    sample_gauges()
+    if not multiprocess_enabled():
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+# Métricas HTTP
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total',
+    'Requests atendidas, por blueprint, método, ruta y código de estado.',
+    labelnames=('blueprint', 'method', 'route', 'status'),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Latencia de las requests, por blueprint, método y ruta.',
+    labelnames=('blueprint', 'method', 'route'),
+)
+
+
+def init_request_metrics(app, excluded_paths=('/metrics',)):
+    """
+    Registra latencia y código de estado de cada request. La ruta es la regla de Flask
+    (p. ej. /competitions/<int:id>), no la URL, para que la cantidad de series sea acotada.
+    """
+    from flask import request, g
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_started_at = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started_at = g.pop('metrics_started_at', None)
+        if started_at is None or request.path in excluded_paths:
+            return response
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        blueprint = request.blueprint or ''
+        HTTP_REQUEST_DURATION.labels(blueprint, request.method, route).observe(time.perf_counter() - started_at)
+        HTTP_REQUESTS.labels(blueprint, request.method, route, str(response.status_code)).inc()
+        return response
@@ -0,0 +1,83 @@
+"""
+Planes de las consultas calientes sobre un volumen de datos parecido al de producción.
+
+A diferencia de `flask check_plans`, acá no se desactiva enable_seqscan: el planner elige con las
+estadísticas reales. Si un índice falta, o deja de servir para la consulta (cambió el orden, el
+filtro o las columnas que se leen), vuelve a un Seq Scan sobre una tabla grande y el test falla.
+
+Se siembran dos formas de datos:
+    - muchas competencias chicas con los mismos usuarios (historial y búsquedas por participante)
+    - una competencia grande (ranking, puntajes por quiz y respuestas de un quiz)
+"""
+import os
+
+import pytest
+from sqlalchemy import select, func, text
+
+from datasets import seed_competition
+
+# Tablas que en producción crecen con los participantes: sobre ellas un Seq Scan es una regresión.
+# competitions y competition_quizzes tienen pocas filas y leerlas enteras es el plan correcto.
+# Las particiones de competition_quiz_answers (una por competencia) se cuentan como su tabla padre.
+LARGE_TABLES = ('competition_participants', 'competition_quizzes_participants', 'competition_quiz_answers')
+
+# Índices creados para una consulta en particular: que el planner no los elija es una regresión
+# aunque la consulta siga usando otro índice (p. ej. la restricción única que empieza por la misma columna).
+EXPECTED_INDEXES = {
+    "ranking de competencia": "idx_competition_participants_ranking",
+    "competencias de un participante": "idx_competition_participants_participant",
+    "historial de un participante": "idx_cqp_participant_history",
+}
+
+BIG_COMPETITION_PARTICIPANTS = int(os.getenv('BENCH_PLANS_PARTICIPANTS', 20000))
+
+
+def _is_large(table):
+    return any(table == name or table.startswith(f"{name}_") for name in LARGE_TABLES)
+
+
+def _index_names(plan_node):
+    found = {plan_node["Index Name"]} if "Index Name" in plan_node else set()
+    for child in plan_node.get("Plans", []):
+        found |= _index_names(child)
+    return found
+
+
+@pytest.fixture
+def sample_ids():
+    from extensions import db
+    from app.models import CompetitionQuiz, CompetitionQuizParticipants
+    from seeders.synthetic import generate_dataset
+
+    generate_dataset(competitions=40, quizzes=5, participants=500, questions=1, users=2000, seed=30)
+    competition_id = seed_competition(BIG_COMPETITION_PARTICIPANTS, quizzes=2, questions=5, seed=31)
+
+    competition_quiz_id = db.session.scalar(
+        select(func.min(CompetitionQuiz.id)).where(CompetitionQuiz.competition_id == competition_id)
+    )
+    participant_id = db.session.scalar(
+        select(CompetitionQuizParticipants.participant_id)
+        .group_by(CompetitionQuizParticipants.participant_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+    with db.engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+    return {
+        "competition_id": competition_id,
+        "competition_quiz_id": competition_quiz_id,
+        "participant_id": participant_id,
+    }
+
+
+def bench_hot_queries_use_indexes(sample_ids):
+    from app.utils.commands.plans import explain_hot_queries
+
+    failures = {}
+    for name, seq_scans, plan in explain_hot_queries(force_index=False, **sample_ids):
+        large_scans = sorted({table for table in seq_scans if _is_large(table)})
+        if large_scans:
+            failures[name] = f"Seq Scan sobre {', '.join(large_scans)}"
+        elif name in EXPECTED_INDEXES and EXPECTED_INDEXES[name] not in _index_names(plan):
+            failures[name] = f"no usa {EXPECTED_INDEXES[name]} ({', '.join(sorted(_index_names(plan)))})"
+    assert not failures, f"Consultas calientes sin su índice: {failures}"
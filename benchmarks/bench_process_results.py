@@ -0,0 +1,34 @@
+"""
+Duración de CompetitionQuizService.process_quiz_results sobre un quiz con miles de participaciones.
+"""
+import os
+
+from sqlalchemy import select
+from extensions import db
+from app.models import CompetitionQuiz
+from app.services import CompetitionQuizService
+from app.utils.lib.constants import CompetitionQuizStatus
+from datasets import seed_competition, reopen_quiz
+
+PARTICIPANTS = int(os.getenv('BENCH_PROCESS_RESULTS_PARTICIPANTS', 5000))
+
+
+def bench_process_quiz_results(bench):
+    competition_id = seed_competition(PARTICIPANTS, quizzes=5)
+    quiz_id = db.session.scalar(
+        select(CompetitionQuiz.id)
+        .where(
+            CompetitionQuiz.competition_id == competition_id,
+            CompetitionQuiz.status == CompetitionQuizStatus.COMPUTABLE
+        )
+        .order_by(CompetitionQuiz.end_time.desc())
+        .limit(1)
+    )
+
+    def process():
+        assert CompetitionQuizService.process_quiz_results(db.session.get(CompetitionQuiz, quiz_id))
+
+    bench.run(
+        f"process_quiz_results[{PARTICIPANTS}]", process,
+        rounds=5, setup=lambda: reopen_quiz(quiz_id),
+    )
@@ -0,0 +1,39 @@
+"""
+Throughput de start_quiz y finish_quiz a través de la API (QA reemplazado por la clave de los seeders).
+"""
+import os
+
+from datasets import create_live_quiz, answers_for
+
+BATCH = int(os.getenv('BENCH_QUIZ_FLOW_BATCH', 50))
+ROUNDS = int(os.getenv('BENCH_QUIZ_FLOW_ROUNDS', 5))
+QUESTIONS = 10
+
+
+def bench_start_quiz_throughput(client, bench):
+    live = create_live_quiz(participants=BATCH * (ROUNDS + 1))
+    pending = iter(live["participant_ids"])
+
+    def start_batch():
+        for _ in range(BATCH):
+            response = client.post(
+                f"/quiz-participation/{live['competition_quiz_id']}/participant/{next(pending)}/start"
+            )
+            assert response.status_code == 200, response.get_json()
+
+    bench.run("start_quiz", start_batch, rounds=ROUNDS, ops_per_round=BATCH)
+
+
+def bench_finish_quiz_throughput(client, bench):
+    live = create_live_quiz(participants=BATCH * (ROUNDS + 1), started=True)
+    pending = iter(live["participant_ids"])
+
+    def finish_batch():
+        for _ in range(BATCH):
+            response = client.post(
+                f"/quiz-participation/{live['competition_quiz_id']}/participant/{next(pending)}/finish",
+                json={"answers": answers_for(live["quiz_id"], QUESTIONS)},
+            )
+            assert response.status_code == 200, response.get_json()
+
+    bench.run("finish_quiz", finish_batch, rounds=ROUNDS, ops_per_round=BATCH)
@@ -0,0 +1,21 @@
+"""
+Latencia del endpoint de ranking según la cantidad de participantes de la competencia.
+"""
+import os
+
+import pytest
+
+from datasets import seed_competition
+
+SIZES = [int(size) for size in os.getenv('BENCH_RANKING_SIZES', '1000,10000,100000').split(',')]
+
+
+@pytest.mark.parametrize('participants', SIZES)
+def bench_ranking_latency(client, bench, participants):
+    competition_id = seed_competition(participants)
+
+    def fetch_ranking():
+        response = client.get(f"/competitions/{competition_id}/ranking")
+        assert response.status_code == 200
+
+    bench.run(f"ranking[{participants}]", fetch_ranking, rounds=10, warmup=2)
@@ -0,0 +1,28 @@
+"""
+Latencia de GET /competitions/users/<id> para un usuario inscripto en muchas competencias.
+"""
+import os
+
+from sqlalchemy import select, func
+from extensions import db
+from app.models import CompetitionParticipant
+from seeders.synthetic import generate_dataset
+
+COMPETITIONS = int(os.getenv('BENCH_USER_COMPETITIONS', 200))
+
+
+def bench_user_competitions(client, bench):
+    # Universo chico de usuarios: los IDs bajos aparecen en la mayoría de las competencias
+    generate_dataset(competitions=COMPETITIONS, quizzes=2, participants=200, questions=1, users=1000, seed=3)
+    user_id, memberships = db.session.execute(
+        select(CompetitionParticipant.participant_id, func.count())
+        .group_by(CompetitionParticipant.participant_id)
+        .order_by(func.count().desc())
+        .limit(1)
+    ).one()
+
+    def fetch():
+        response = client.get(f"/competitions/users/{user_id}")
+        assert response.status_code == 200
+
+    bench.run(f"user_competitions[{memberships}]", fetch, rounds=10, warmup=2)
@@ -0,0 +1,262 @@
+"""
+Infraestructura de la suite de benchmarks.
+
+    python -m pytest -c benchmarks/pytest.ini benchmarks [--bench-save-baseline] [--bench-fail-on-regression]
+    (o bien, desde benchmarks/: python -m pytest)
+
+Usa una base propia (COMPETITION_BENCH_DB, por defecto competition_bench) en el Postgres
+configurado con las variables COMPETITION_POSTGRES_*, que se recrea en cada corrida
+(COMPETITION_BENCH_RESET=no la conserva). Con COMPETITION_BENCH_EMBEDDED=si se levanta un
+Postgres embebido con pgserver (pip install pgserver) en lugar de usar un servidor externo.
+
+El QA se reemplaza por la clave de los seeders; COMPETITION_BENCH_QA=fake lo llama por HTTP
+a través del QA falso (benchmarks/fake_qa.py).
+
+Los resultados se guardan en benchmarks/results/latest.json y se comparan contra
+benchmarks/baselines/baseline.json si existe.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baselines', 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, 'results', 'latest.json')
+
+
+def _configure_environment():
+    """
+    Ajusta el entorno antes de importar la app (app.config lee las variables al importarse).
+    """
+    if os.getenv('COMPETITION_BENCH_EMBEDDED', 'no') == 'si':
+        try:
+            import pgserver
+        except ImportError:
+            raise pytest.UsageError("COMPETITION_BENCH_EMBEDDED=si requiere `pip install pgserver`")
+        pgdata = os.getenv('COMPETITION_BENCH_PGDATA', os.path.join(BENCH_DIR, '.pgdata'))
+        pgserver.get_server(pgdata, cleanup_mode=None)
+        # Host vacío: libpq se conecta por el socket de PGHOST
+        os.environ['PGHOST'] = pgdata
+        os.environ['COMPETITION_POSTGRES_HOST'] = ''
+        os.environ['COMPETITION_POSTGRES_USER'] = 'postgres'
+
+    os.environ['COMPETITION_POSTGRES_DB'] = os.getenv('COMPETITION_BENCH_DB', 'competition_bench')
+    # Se mide, no se vigila: sin presupuesto de consultas ni logs por request
+    os.environ.setdefault('COMPETITION_DB_QUERY_BUDGET_ENFORCE', 'no')
+    os.environ.setdefault('COMPETITION_LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('COMPETITION_RUN_SCHEDULER', 'no')
+
+
+def _reset_database(uri):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.engine.url import make_url
+
+    url = make_url(uri)
+    engine = create_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    try:
+        with engine.connect() as connection:
+            quoted_name = connection.dialect.identifier_preparer.quote(url.database)
+            connection.execute(text(f"DROP DATABASE IF EXISTS {quoted_name} WITH (FORCE)"))
+    finally:
+        engine.dispose()
+
+
+# Opciones de línea de comandos
+
+def pytest_addoption(parser):
+    group = parser.getgroup('bench', 'benchmarks del servicio de competencias')
+    group.addoption('--bench-baseline', default=DEFAULT_BASELINE, help='JSON de referencia para comparar.')
+    group.addoption('--bench-output', default=DEFAULT_OUTPUT, help='Dónde guardar los resultados.')
+    group.addoption('--bench-save-baseline', action='store_true', help='Guarda los resultados como nueva referencia.')
+    group.addoption('--bench-threshold', type=float, default=0.20,
+                    help='Empeoramiento relativo de p50 que cuenta como regresión (0.20 = 20%%).')
+    group.addoption('--bench-fail-on-regression', action='store_true', help='Termina con error si hay regresiones.')
+
+
+# Registro de resultados
+
+class BenchRecorder:
+    def __init__(self):
+        self.results = {}
+
+    def run(self, name, fn, rounds=10, warmup=1, ops_per_round=1, setup=None):
+        """
+        Ejecuta `fn` `rounds` veces (más `warmup` vueltas descartadas) y registra sus tiempos.
+
+        :param ops_per_round: Operaciones que hace cada llamada a `fn` (para calcular ops/s).
+        :param setup: Callable sin medir que se ejecuta antes de cada vuelta.
+        :return: Estadísticas registradas.
+        """
+        samples = []
+        for index in range(warmup + rounds):
+            if setup:
+                setup()
+            started = time.perf_counter()
+            fn()
+            elapsed = time.perf_counter() - started
+            if index >= warmup:
+                samples.append(elapsed)
+
+        samples.sort()
+        mean = statistics.fmean(samples)
+        stats = {
+            "rounds": rounds,
+            "ops_per_round": ops_per_round,
+            "min_ms": round(samples[0] * 1000, 3),
+            "p50_ms": round(statistics.median(samples) * 1000, 3),
+            "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+            "mean_ms": round(mean * 1000, 3),
+            "ops_per_sec": round(ops_per_round / mean, 2) if mean else None,
+        }
+        self.results[name] = stats
+        return stats
+
+
+def compare(results, baseline, threshold):
+    """
+    Compara p50 contra la referencia.
+
+    :return: Lista de (nombre, p50 referencia, p50 actual, variación relativa) de las regresiones.
+    """
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if not reference or not reference.get('p50_ms'):
+            continue
+        change = stats['p50_ms'] / reference['p50_ms'] - 1
+        if change > threshold:
+            regressions.append((name, reference['p50_ms'], stats['p50_ms'], change))
+    return regressions
+
+
+_recorder = BenchRecorder()
+
+
+@pytest.fixture(scope='session')
+def bench():
+    return _recorder
+
+
+# App y base de datos
+
+@pytest.fixture(scope='session')
+def app():
+    _configure_environment()
+    from run import create_app
+    from app.config import config_dict
+    from app.utils.db import create_database_if_not_exists
+    from flask_migrate import upgrade
+
+    if os.getenv('COMPETITION_BENCH_RESET', 'si') == 'si':
+        _reset_database(config_dict['testing'].SQLALCHEMY_DATABASE_URI)
+
+    app = create_app('testing', run_scheduler=False)
+    create_database_if_not_exists(app)
+    with app.app_context():
+        upgrade(directory=os.path.join(ROOT, 'migrations'))
+    yield app
+
+    from extensions import db
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(autouse=True)
+def app_context(app):
+    with app.app_context():
+        yield
+
+
+@pytest.fixture(scope='session', autouse=True)
+def qa_stub(app):
+    """
+    Reemplaza la llamada HTTP al microservicio de QA por la clave determinística de los seeders,
+    para medir solo este servicio. Con COMPETITION_BENCH_QA=fake se usa en cambio el QA falso por
+    HTTP (benchmarks/fake_qa.py), con la latencia de COMPETITION_BENCH_QA_LATENCY_MS.
+    """
+    from app.services import CompetitionQuizParticipantService
+    from seeders.answer_key import correct_answer_id
+
+    if os.getenv('COMPETITION_BENCH_QA', 'stub') == 'fake':
+        from fake_qa import FakeQAServer
+        with FakeQAServer(latency_ms=float(os.getenv('COMPETITION_BENCH_QA_LATENCY_MS', 0))):
+            yield
+        return
+
+    def check_answers(answers):
+        return {str(item['question_id']): correct_answer_id(item['question_id']) for item in answers}
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(CompetitionQuizParticipantService, '_check_answer_correctness_bulk', staticmethod(check_answers))
+        yield
+
+
+# Reporte
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _recorder.results:
+        return
+    terminalreporter.section('benchmarks')
+    terminalreporter.write_line(f"{'benchmark':<48} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>10}")
+    for name, stats in _recorder.results.items():
+        terminalreporter.write_line(
+            f"{name:<48} {stats['p50_ms']:>10} {stats['p95_ms']:>10} {stats['ops_per_sec'] or '-':>10}"
+        )
+
+    for line in getattr(config, '_bench_report', []):
+        terminalreporter.write_line(line)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    config = session.config
+    if not _recorder.results:
+        return
+
+    payload = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "results": _recorder.results,
+    }
+    output = config.getoption('--bench-output')
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(payload, f, indent=2)
+
+    report = [f"Resultados guardados en {output}"]
+    baseline_path = config.getoption('--bench-baseline')
+    if config.getoption('--bench-save-baseline'):
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, 'w') as f:
+            json.dump(payload, f, indent=2)
+        report.append(f"Referencia actualizada: {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)["results"]
+        threshold = config.getoption('--bench-threshold')
+        regressions = compare(_recorder.results, baseline, threshold)
+        if regressions:
+            report.append(f"⚠️ Regresiones (p50 > +{threshold:.0%} contra {baseline_path}):")
+            for name, before, after, change in regressions:
+                report.append(f"  {name}: {before} ms -> {after} ms ({change:+.0%})")
+            if config.getoption('--bench-fail-on-regression'):
+                session.exitstatus = 1
+        else:
+            report.append(f"Sin regresiones contra {baseline_path}")
+    config._bench_report = report
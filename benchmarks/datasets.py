@@ -0,0 +1,89 @@
+"""
+Escenarios de datos para benchmarks y pruebas de carga (requieren un app context).
+"""
+import random
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import insert, select, func, update
+from extensions import db
+from app.models import Competition, CompetitionQuiz, CompetitionParticipant, CompetitionQuizParticipants
+from app.utils.lib.constants import CompetitionQuizStatus
+from seeders.answer_key import question_ids, answer_ids, correct_answer_id
+from seeders.synthetic import generate_dataset
+
+
+def create_live_quiz(participants, time_limit=0, first_participant_id=1, started=False):
+    """
+    Crea una competencia 'en curso' con un quiz abierto ahora y `participants` inscriptos.
+
+    :param started: Si es True, todos los participantes ya iniciaron el quiz (listos para finish).
+    :return: Dict con competition_id, competition_quiz_id, quiz_id y participant_ids.
+    """
+    now = datetime.now(timezone.utc)
+    competition = Competition(
+        title=f"Benchmark {now.isoformat()}", state='en curso', created_by=1,
+        start_date=now - timedelta(days=1), end_date=now + timedelta(days=1),
+    )
+    db.session.add(competition)
+    db.session.flush()
+    # quiz_id alto para no chocar con los del catálogo de los seeders
+    quiz = CompetitionQuiz(
+        competition_id=competition.id, quiz_id=random.randint(10000, 99999), time_limit=time_limit,
+        start_time=now - timedelta(hours=1), end_time=now + timedelta(hours=2),
+    )
+    db.session.add(quiz)
+    db.session.flush()
+
+    participant_ids = list(range(first_participant_id, first_participant_id + participants))
+    db.session.execute(insert(CompetitionParticipant), [
+        {"competition_id": competition.id, "participant_id": participant_id, "score": 0}
+        for participant_id in participant_ids
+    ])
+    competition.participant_count = participants
+    if started:
+        db.session.execute(insert(CompetitionQuizParticipants), [
+            {"competition_quiz_id": quiz.id, "participant_id": participant_id, "start_time": now}
+            for participant_id in participant_ids
+        ])
+    db.session.commit()
+    return {
+        "competition_id": competition.id,
+        "competition_quiz_id": quiz.id,
+        "quiz_id": quiz.quiz_id,
+        "participant_ids": participant_ids,
+    }
+
+
+def answers_for(quiz_id, questions=10, accuracy=0.7, rng=random):
+    """
+    Respuestas para finish_quiz: acierta con probabilidad `accuracy` según la clave de los seeders.
+    """
+    answers = []
+    for question_id in question_ids(quiz_id, questions):
+        correct_id = correct_answer_id(question_id)
+        chosen = correct_id if rng.random() < accuracy else rng.choice(answer_ids(question_id))
+        answers.append({"question_id": question_id, "answer_id": chosen})
+    return answers
+
+
+def seed_competition(participants, quizzes=5, questions=1, state='finalizada', seed=None):
+    """
+    Siembra una competencia con generate_dataset y devuelve su ID.
+    """
+    generate_dataset(
+        competitions=1, quizzes=quizzes, participants=participants, questions=questions,
+        seed=participants if seed is None else seed, state=state,
+    )
+    return db.session.scalar(select(func.max(Competition.id)))
+
+
+def reopen_quiz(competition_quiz_id):
+    """
+    Devuelve un quiz procesado a ACTIVO para volver a medir process_quiz_results.
+    """
+    db.session.execute(
+        update(CompetitionQuiz)
+        .where(CompetitionQuiz.id == competition_quiz_id)
+        .values(status=CompetitionQuizStatus.ACTIVO, processed=False)
+    )
+    db.session.commit()
@@ -0,0 +1,253 @@
+"""
+Microservicio de QA falso para medir y probar el camino de corrección (finish_quiz) sin el real.
+
+Implementa POST /answer/answers/check con la clave determinística de los seeders
+(seeders/answer_key.py), así que sirve para los datos que generan `flask seed` y
+benchmarks/datasets.py. Permite inyectar latencia, errores y timeouts:
+
+    latency_ms    latencia base de cada respuesta
+    jitter_ms     dispersión: ancho del rango (uniform) o desvío (normal)
+    distribution  fixed | uniform | normal | exponential (media = latency_ms)
+    error_rate    fracción de requests que responden 503
+    timeout_rate  fracción de requests que tardan timeout_s (más que el timeout del cliente)
+    timeout_s     duración de esas requests colgadas
+
+Como servidor aparte (pruebas de carga contra un despliegue local):
+
+    python benchmarks/fake_qa.py --port 5013 --latency-ms 40 --jitter-ms 20 --distribution normal \
+        --error-rate 0.01
+
+y el servicio con QA_HOST=localhost QA_PORT=5013. Los parámetros se pueden cambiar en caliente
+con PUT /_fake/config (JSON con los mismos nombres) y consultar con GET /_fake/config.
+
+En el mismo proceso (tests y benchmarks):
+
+    with FakeQAServer(latency_ms=20) as qa:
+        ...  # finish_quiz llama a qa.url
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from flask import Flask, jsonify, request
+from werkzeug.serving import make_server
+
+from seeders.answer_key import correct_answer_id
+
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "exponential")
+
+
+class FakeQAConfig:
+    """
+    Parámetros de la inyección de fallas. Se leen en cada request, así que pueden cambiarse en caliente.
+    """
+    FIELDS = ("latency_ms", "jitter_ms", "distribution", "error_rate", "timeout_rate", "timeout_s")
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, distribution="fixed",
+                 error_rate=0.0, timeout_rate=0.0, timeout_s=10.0, seed=None):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.distribution = distribution
+        self.error_rate = float(error_rate)
+        self.timeout_rate = float(timeout_rate)
+        self.timeout_s = float(timeout_s)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.validate()
+
+    def validate(self):
+        if self.distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution debe ser una de {DISTRIBUTIONS}")
+        if not (0 <= self.error_rate <= 1 and 0 <= self.timeout_rate <= 1):
+            raise ValueError("error_rate y timeout_rate deben estar entre 0 y 1")
+
+    def update(self, values):
+        """
+        Actualiza los campos recibidos (los demás se conservan).
+        """
+        previous = self.as_dict()
+        for field in self.FIELDS:
+            if field in values:
+                setattr(self, field, values[field] if field == "distribution" else float(values[field]))
+        try:
+            self.validate()
+        except ValueError:
+            for field, value in previous.items():
+                setattr(self, field, value)
+            raise
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def _random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def sample_latency(self):
+        """
+        Latencia (en segundos) para una request, según la distribución configurada.
+        """
+        with self._lock:
+            if self.distribution == "uniform":
+                value = self._rng.uniform(self.latency_ms - self.jitter_ms / 2, self.latency_ms + self.jitter_ms / 2)
+            elif self.distribution == "normal":
+                value = self._rng.gauss(self.latency_ms, self.jitter_ms)
+            elif self.distribution == "exponential":
+                value = self._rng.expovariate(1 / self.latency_ms) if self.latency_ms > 0 else 0
+            else:
+                value = self.latency_ms
+        return max(value, 0) / 1000
+
+    def sample_outcome(self):
+        """
+        Decide si la request se cuelga ("timeout"), falla ("error") o responde ("ok").
+        """
+        draw = self._random()
+        if draw < self.timeout_rate:
+            return "timeout"
+        if draw < self.timeout_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+
+def create_fake_qa_app(config=None):
+    """
+    Crea la app Flask del QA falso.
+
+    :param config: FakeQAConfig; por defecto responde al instante y sin fallas.
+    :return: App Flask (la configuración queda en app.extensions['fake_qa']).
+    """
+    config = config or FakeQAConfig()
+    app = Flask("fake_qa")
+    app.extensions["fake_qa"] = config
+    stats = {"ok": 0, "error": 0, "timeout": 0}
+    stats_lock = threading.Lock()
+
+    # ✅ Misma forma de request/respuesta que el microservicio de QA
+    @app.route("/answer/answers/check", methods=["POST"])
+    def check_answers():
+        payload = request.get_json(silent=True) or {}
+        answers = payload.get("answers")
+        if not isinstance(answers, list):
+            return jsonify({"message": "answers debe ser una lista"}), 400
+
+        outcome = config.sample_outcome()
+        with stats_lock:
+            stats[outcome] += 1
+        if outcome == "timeout":
+            time.sleep(config.timeout_s)
+        else:
+            time.sleep(config.sample_latency())
+        if outcome == "error":
+            return jsonify({"message": "Fallo inyectado por el QA falso"}), 503
+
+        results = []
+        for item in answers:
+            correct_id = correct_answer_id(item["question_id"])
+            results.append({
+                "question_id": item["question_id"],
+                "answer_id": item.get("answer_id"),
+                "correct_answer_id": correct_id,
+                "is_correct": item.get("answer_id") == correct_id,
+            })
+        return jsonify({"answers": results}), 200
+
+    # ⚙️ Configuración en caliente y contadores
+    @app.route("/_fake/config", methods=["GET", "PUT"])
+    def fake_config():
+        if request.method == "PUT":
+            try:
+                config.update(request.get_json(silent=True) or {})
+            except (TypeError, ValueError) as e:
+                return jsonify({"message": str(e)}), 400
+        with stats_lock:
+            return jsonify({"config": config.as_dict(), "stats": dict(stats)}), 200
+
+    @app.route("/health", methods=["GET"])
+    def health():
+        return jsonify({"status": "ok"}), 200
+
+    return app
+
+
+class FakeQAServer:
+    """
+    Levanta el QA falso en un hilo (puerto libre por defecto) y, mientras está activo,
+    apunta el cliente de QA del servicio a él.
+
+    :param host: Interfaz donde escucha.
+    :param port: Puerto; 0 elige uno libre.
+    :param patch_client: Si es True, reemplaza QA_SERVICE_URL del servicio de participaciones.
+    :param config_kwargs: Parámetros de FakeQAConfig (latency_ms, error_rate, ...).
+    """
+    def __init__(self, host="127.0.0.1", port=0, patch_client=True, **config_kwargs):
+        self.config = FakeQAConfig(**config_kwargs)
+        self.app = create_fake_qa_app(self.config)
+        self._server = make_server(host, port, self.app, threaded=True)
+        self.url = f"http://{host}:{self._server.server_port}"
+        self._patch_client = patch_client
+        self._previous_url = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-qa", daemon=True)
+        self._thread.start()
+        if self._patch_client:
+            from app.services import competition_quiz_participant_service as participant_service
+            self._previous_url = participant_service.QA_SERVICE_URL
+            participant_service.QA_SERVICE_URL = self.url
+        return self
+
+    def stop(self):
+        if self._patch_client and self._previous_url is not None:
+            from app.services import competition_quiz_participant_service as participant_service
+            participant_service.QA_SERVICE_URL = self._previous_url
+            self._previous_url = None
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="QA falso con latencia y fallas configurables.")
+    parser.add_argument("--host", default=os.getenv("QA_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("QA_PORT", 5013)))
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-s", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = FakeQAConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, distribution=args.distribution,
+        error_rate=args.error_rate, timeout_rate=args.timeout_rate, timeout_s=args.timeout_s, seed=args.seed,
+    )
+    server = make_server(args.host, args.port, create_fake_qa_app(config), threaded=True)
+    print(f"QA falso escuchando en http://{args.host}:{server.server_port} con {config.as_dict()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
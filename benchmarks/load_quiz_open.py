@@ -0,0 +1,251 @@
+"""
+Escenario de carga "thundering herd": la apertura y el cierre de un quiz popular.
+
+Reproduce los dos picos contra un despliegue local (gunicorn, docker compose, ...):
+    start  -> todos los participantes llaman a POST /quiz-participation/<id>/participant/<pid>/start
+              en el mismo instante (apertura del quiz)
+    finish -> todos llaman a /finish con sus respuestas (cierre del quiz)
+
+Antes del pico, el script crea directamente en la base (variables COMPETITION_POSTGRES_*) una
+competencia en curso con un quiz abierto y `--participants` inscriptos. Durante cada pico muestrea
+pg_stat_activity para contar las conexiones esperando locks.
+
+Reporta p50/p95/p99, throughput, tasa de error y esperas por locks de cada fase. El servicio tiene que
+poder validar respuestas: apuntarlo al QA falso (benchmarks/fake_qa.py) con QA_HOST/QA_PORT.
+
+Uso (desde la raíz del proyecto):
+
+    python benchmarks/fake_qa.py --port 5013 --latency-ms 30 &
+    QA_PORT=5013 gunicorn -c gunicorn.conf.py wsgi:app &
+    python benchmarks/load_quiz_open.py --url http://localhost:5016 --participants 2000 --concurrency 200
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path[:0] = [ROOT, BENCH_DIR]
+
+PHASES = ("start", "finish")
+
+# Conexiones de la base esperando un lock (muestreadas durante el pico)
+_LOCK_WAITS_SQL = """
+    SELECT count(*) FILTER (WHERE wait_event_type = 'Lock'),
+           count(*) FILTER (WHERE state = 'active')
+    FROM pg_stat_activity
+    WHERE datname = current_database() AND pid <> pg_backend_pid()
+"""
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LockWaitSampler:
+    """
+    Hilo que muestrea pg_stat_activity cada `interval` segundos mientras dura una fase.
+    """
+    def __init__(self, engine, interval=0.05):
+        self.engine = engine
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name="lock-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        from sqlalchemy import text
+
+        with self.engine.connect() as connection:
+            while not self._stop.is_set():
+                lock_waits, active = connection.execute(text(_LOCK_WAITS_SQL)).one()
+                connection.rollback()
+                self.samples.append((lock_waits, active))
+                self._stop.wait(self.interval)
+
+    def summary(self):
+        waits = [lock_waits for lock_waits, _ in self.samples] or [0]
+        active = [count for _, count in self.samples] or [0]
+        return {
+            "samples": len(self.samples),
+            "max_lock_waits": max(waits),
+            "mean_lock_waits": round(statistics.fmean(waits), 2),
+            "samples_with_lock_waits": sum(1 for value in waits if value),
+            "max_active_connections": max(active),
+        }
+
+
+class Spike:
+    """
+    Dispara `len(jobs)` requests lo más juntas posible con `concurrency` hilos.
+    """
+    def __init__(self, base_url, concurrency, timeout):
+        self.base_url = base_url.rstrip("/")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        return session
+
+    def _call(self, path, payload, gate):
+        gate.wait()
+        started = time.perf_counter()
+        try:
+            response = self._session().post(self.base_url + path, json=payload, timeout=self.timeout)
+            status = response.status_code
+        except requests.RequestException as e:
+            status = type(e).__name__
+        return time.perf_counter() - started, status
+
+    def run(self, jobs):
+        """
+        :param jobs: Lista de (path, payload JSON o None).
+        :return: Dict con latencias, códigos de estado y duración total.
+        """
+        # Los hilos arrancan y esperan la señal, para que el primer lote salga junto
+        gate = threading.Event()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = [executor.submit(self._call, path, payload, gate) for path, payload in jobs]
+            started = time.perf_counter()
+            gate.set()
+            results = [future.result() for future in futures]
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        statuses = Counter(str(status) for _, status in results)
+        errors = sum(count for status, count in statuses.items() if status != "200")
+        return {
+            "requests": len(results),
+            "duration_s": round(elapsed, 3),
+            "throughput_rps": round(len(results) / elapsed, 1) if elapsed else None,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1),
+            "error_rate": round(errors / len(results), 4),
+            "statuses": dict(statuses),
+        }
+
+
+def prepare_quiz(env, participants):
+    """
+    Crea la competencia y el quiz del escenario directamente en la base.
+
+    :return: (dict de create_live_quiz, engine para el muestreo de locks)
+    """
+    os.environ.setdefault('COMPETITION_LOG_LEVEL', 'WARNING')
+    from run import create_app
+    from extensions import db
+    from datasets import create_live_quiz
+
+    app = create_app(env, run_scheduler=False)
+    with app.app_context():
+        live = create_live_quiz(participants)
+        engine = db.engine
+    return live, engine
+
+
+def print_report(report):
+    print(f"\nCompetencia {report['competition_id']}, quiz {report['competition_quiz_id']}, "
+          f"{report['participants']} participantes, concurrencia {report['concurrency']}")
+    header = f"{'fase':<8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errores':>8} {'locks':>6}"
+    print(header)
+    for phase in PHASES:
+        result = report["phases"].get(phase)
+        if not result:
+            continue
+        print(f"{phase:<8} {result['throughput_rps']:>8} {result['p50_ms']:>9} {result['p95_ms']:>9} "
+              f"{result['p99_ms']:>9} {result['max_ms']:>9} {result['error_rate']:>8.2%} "
+              f"{result['lock_waits']['max_lock_waits']:>6}")
+        failed = {status: count for status, count in result["statuses"].items() if status != "200"}
+        if failed:
+            print(f"         ⚠️ respuestas con error: {failed}")
+    print("(locks = máximo de conexiones esperando un lock en pg_stat_activity durante la fase)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pico de start/finish en la apertura y cierre de un quiz.")
+    parser.add_argument("--url", default=os.getenv("COMPETITION_LOAD_URL", f"http://localhost:{os.getenv('COMPETITION_PORT', '5016')}"))
+    parser.add_argument("--env", default=os.getenv("FLASK_ENV", "development"))
+    parser.add_argument("--participants", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100, help="Requests simultáneas (hilos).")
+    parser.add_argument("--questions", type=int, default=10, help="Preguntas por participante en /finish.")
+    parser.add_argument("--accuracy", type=float, default=0.7)
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout de cada request (s).")
+    parser.add_argument("--pause", type=float, default=1.0, help="Segundos entre el pico de start y el de finish.")
+    parser.add_argument("--phases", default="start,finish", help="Fases a ejecutar, separadas por coma.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="Imprime el reporte como JSON.")
+    args = parser.parse_args(argv)
+
+    phases = [phase.strip() for phase in args.phases.split(",") if phase.strip()]
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        parser.error(f"fases desconocidas: {', '.join(sorted(unknown))}")
+
+    from datasets import answers_for
+
+    live, engine = prepare_quiz(args.env, args.participants)
+    base_path = f"/quiz-participation/{live['competition_quiz_id']}/participant"
+    rng = random.Random(args.seed)
+    jobs = {
+        "start": [(f"{base_path}/{pid}/start", None) for pid in live["participant_ids"]],
+        "finish": [
+            (f"{base_path}/{pid}/finish", {"answers": answers_for(live["quiz_id"], args.questions, args.accuracy, rng)})
+            for pid in live["participant_ids"]
+        ],
+    }
+
+    spike = Spike(args.url, args.concurrency, args.timeout)
+    report = {
+        "competition_id": live["competition_id"],
+        "competition_quiz_id": live["competition_quiz_id"],
+        "participants": args.participants,
+        "concurrency": args.concurrency,
+        "phases": {},
+    }
+    for index, phase in enumerate(phases):
+        if index:
+            time.sleep(args.pause)
+        with LockWaitSampler(engine) as sampler:
+            result = spike.run(jobs[phase])
+        result["lock_waits"] = sampler.summary()
+        report["phases"][phase] = result
+    engine.dispose()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if any(result["error_rate"] for result in report["phases"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Benchmark de arranque: mide el tiempo hasta la primera request en un proceso nuevo.
+
+Cada corrida es un intérprete limpio (sin módulos cacheados en memoria) que mide:
+    import   -> importar run.py (Flask, SQLAlchemy, modelos, servicios, blueprints)
+    create   -> create_app()
+    first    -> primera request a `/` (sin base de datos)
+    first_db -> primera request a `/health/db` (abre la primera conexión del pool)
+
+Uso (desde la raíz del proyecto, con las variables COMPETITION_* configuradas):
+
+    python benchmarks/startup.py --runs 10 [--env development] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("import", "create", "first", "first_db")
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from run import create_app
+t1 = time.perf_counter()
+app = create_app(sys.argv[1], run_scheduler=False)
+t2 = time.perf_counter()
+client = app.test_client()
+status = client.get('/').status_code
+t3 = time.perf_counter()
+db_status = client.get('/health/db').status_code
+t4 = time.perf_counter()
+print(json.dumps({
+    "import": t1 - t0, "create": t2 - t1, "first": t3 - t2, "first_db": t4 - t3,
+    "status": status, "db_status": db_status,
+}))
+"""
+
+
+def run_once(env):
+    """
+    Ejecuta una corrida en un subproceso y devuelve los tiempos (segundos) por fase.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _CHILD, env],
+        cwd=ROOT,
+        env={**os.environ, "PYTHONPATH": ROOT},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # La última línea es el JSON; lo anterior son logs de arranque
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    """
+    :return: Dict {fase: {"p50_ms", "max_ms"}} más el total hasta la primera request.
+    """
+    summary = {}
+    for phase in PHASES + ("total",):
+        if phase == "total":
+            values = [s["import"] + s["create"] + s["first"] for s in samples]
+        else:
+            values = [s[phase] for s in samples]
+        summary[phase] = {
+            "p50_ms": round(statistics.median(values) * 1000, 1),
+            "max_ms": round(max(values) * 1000, 1),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo hasta la primera request del servicio.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--env", default=os.getenv("FLASK_ENV", "development"))
+    parser.add_argument("--json", action="store_true", help="Imprime el resumen como JSON.")
+    args = parser.parse_args()
+
+    samples = [run_once(args.env) for _ in range(args.runs)]
+    failed = [s for s in samples if s["status"] != 200 or s["db_status"] != 200]
+    summary = summarize(samples)
+
+    if args.json:
+        print(json.dumps({"runs": args.runs, "failed": len(failed), "phases": summary}, indent=2))
+    else:
+        print(f"{'fase':<10} {'p50 (ms)':>10} {'max (ms)':>10}")
+        for phase, values in summary.items():
+            print(f"{phase:<10} {values['p50_ms']:>10} {values['max_ms']:>10}")
+        if failed:
+            print(f"⚠️ {len(failed)} corrida(s) con status distinto de 200")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
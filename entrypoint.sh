@@ -20,5 +20,35 @@ fi
 echo "⏳ Esperando a que PostgreSQL esté listo..."
 
 
-# Inicia la aplicación
-python run.py
+# Creación de la DB, migraciones y seeders: paso explícito, fuera del arranque de la app.
+# Con COMPETITION_INIT_DB=no (p. ej. varias réplicas) se corre una sola vez con COMPETITION_PROCESS=init.
+run_init_db() {
+    flask --app wsgi:app init_db || exit 1
+}
+
+# Inicia el proceso según COMPETITION_PROCESS:
+#   web (por defecto): gunicorn multi-worker con la app precargada
+#   scheduler: solo los jobs en segundo plano (una única instancia)
+#   init: solo inicializa la base de datos y termina
+#   dev: servidor de desarrollo de Flask
+case "${COMPETITION_PROCESS:-web}" in
+    web)
+        if [[ "${COMPETITION_INIT_DB:-si}" == "si" ]]; then
+            run_init_db
+        fi
+        exec gunicorn -c gunicorn.conf.py wsgi:app
+        ;;
+    scheduler)
+        exec flask --app wsgi:app run_scheduler
+        ;;
+    init)
+        run_init_db
+        ;;
+    dev)
+        exec python run.py
+        ;;
+    *)
+        echo "Error: COMPETITION_PROCESS debe ser 'web', 'scheduler', 'init' o 'dev'."
+        exit 1
+        ;;
+esac
@@ -0,0 +1,64 @@
+# Configuración de gunicorn para producción (ver wsgi.py)
+import gc
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('COMPETITION_PORT', os.getenv('PORT', '5016'))}"
+workers = int(os.getenv('COMPETITION_WEB_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('COMPETITION_WEB_THREADS', 1))
+# gevent/eventlet (instalados aparte) para un proceso dedicado al ranking en vivo por SSE
+worker_class = os.getenv('COMPETITION_WEB_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync')
+timeout = int(os.getenv('COMPETITION_WEB_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('COMPETITION_WEB_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('COMPETITION_WEB_KEEPALIVE', 5))
+# Reciclar workers de a poco evita que la memoria crezca sin límite
+max_requests = int(os.getenv('COMPETITION_WEB_MAX_REQUESTS', 5000))
+max_requests_jitter = int(os.getenv('COMPETITION_WEB_MAX_REQUESTS_JITTER', 500))
+
+# La app se carga una vez en el maestro y se comparte por copy-on-write
+preload_app = True
+accesslog = '-'
+errorlog = '-'
+
+# Cada worker escribe sus métricas en este directorio y /metrics las suma (ver app/utils/metrics.py).
+# prometheus_client elige el modo multiproceso al importarse: se define antes de cargar la app.
+metrics_dir = os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', tempfile.mkdtemp(prefix='competition-metrics-'))
+# El SSE del ranking ocupa un hilo por cliente: la app dimensiona su cupo según el worker
+os.environ['COMPETITION_WEB_WORKER_CLASS'] = worker_class
+os.environ['COMPETITION_WEB_THREADS'] = str(threads)
+
+
+def on_starting(server):
+    # Los archivos de una ejecución anterior sumarían sus contadores a los de esta
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+        os.remove(path)
+
+
+def when_ready(server):
+    # Congela los objetos creados durante la precarga: el GC de los workers no los recorre
+    # ni modifica sus cabeceras, así que esas páginas siguen compartidas con el maestro.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Las conexiones del pool no pueden compartirse entre procesos: cada worker abre las suyas
+    from extensions import db
+    from wsgi import app
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+    router = app.extensions.get('replica_router')
+    if router:
+        router.dispose(close=False)
+
+    from app.utils.metrics import start_gauge_sampler
+    start_gauge_sampler(app.config['METRICS_SAMPLE_SECONDS'])
+
+
+def child_exit(server, worker):
+    # En el maestro: sus contadores siguen sumando; sus gauges (pool, SSE) dejan de exponerse
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid, metrics_dir)
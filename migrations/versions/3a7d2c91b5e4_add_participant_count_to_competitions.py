@@ -0,0 +1,40 @@
+"""Add participant_count to competitions
+
+Revision ID: 3a7d2c91b5e4
+Revises: fc4f9ff3c2a7
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a7d2c91b5e4'
+down_revision = 'fc4f9ff3c2a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('competitions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('participant_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_check_constraint('check_participant_count_positive', 'participant_count >= 0')
+
+    # Inicializar el contador con las inscripciones existentes
+    op.execute("""
+        UPDATE competitions c
+        SET participant_count = sub.total
+        FROM (
+            SELECT competition_id, COUNT(*) AS total
+            FROM competition_participants
+            GROUP BY competition_id
+        ) sub
+        WHERE sub.competition_id = c.id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('competitions', schema=None) as batch_op:
+        batch_op.drop_constraint('check_participant_count_positive', type_='check')
+        batch_op.drop_column('participant_count')
@@ -0,0 +1,45 @@
+"""Covering index for the participant history
+
+Revision ID: 4c8e2f6a1b57
+Revises: d7a4c1e9f253
+Create Date: 2026-10-19 17:22:08.413095
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e2f6a1b57'
+down_revision = 'd7a4c1e9f253'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    # Si una creación falla, Postgres deja el índice como INVALID: eliminarlo y volver a correr la migración.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_cqp_participant_history', 'competition_quizzes_participants',
+            ['participant_id', 'end_time', 'id'],
+            unique=False,
+            postgresql_include=['competition_quiz_id', 'score', 'score_competition', 'start_time', 'updated_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # El nuevo índice empieza por participant_id: idx_cqp_participant queda redundante
+        op.drop_index('idx_cqp_participant', table_name='competition_quizzes_participants',
+                      postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_cqp_participant', 'competition_quizzes_participants', ['participant_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index('idx_cqp_participant_history', table_name='competition_quizzes_participants',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,71 @@
+"""Hot path indexes (scheduler, rankings, participant lookups)
+
+Revision ID: 8e51f0c4d2a9
+Revises: 3a7d2c91b5e4
+Create Date: 2026-10-19 11:03:27.540917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e51f0c4d2a9'
+down_revision = '3a7d2c91b5e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    # Si una creación falla, Postgres deja el índice como INVALID: eliminarlo y volver a correr la migración.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_competition_quizzes_active_end_time', 'competition_quizzes', ['end_time'],
+            unique=False,
+            postgresql_where=sa.text("status = 'ACTIVO'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_competition_participants_ranking', 'competition_participants',
+            ['competition_id', sa.text('score DESC')],
+            unique=False,
+            postgresql_include=['participant_id'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_competition_participants_participant', 'competition_participants', ['participant_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_cqp_quiz_score', 'competition_quizzes_participants',
+            ['competition_quiz_id', sa.text('score DESC')],
+            unique=False,
+            postgresql_include=['participant_id', 'end_time', 'score_competition'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_cqp_participant', 'competition_quizzes_participants', ['participant_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('idx_cqp_participant', table_name='competition_quizzes_participants',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_cqp_quiz_score', table_name='competition_quizzes_participants',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_competition_participants_participant', table_name='competition_participants',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_competition_participants_ranking', table_name='competition_participants',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('idx_competition_quizzes_active_end_time', table_name='competition_quizzes',
+                      postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,60 @@
+"""Keyset index for competition_quiz_answers (competition_quiz_id, created_at, id)
+
+Revision ID: 9b3f6d2e8a41
+Revises: 5f2e8b3d7c10
+Create Date: 2026-10-19 15:12:40.218734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3f6d2e8a41'
+down_revision = '5f2e8b3d7c10'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'idx_quiz_answers_keyset'
+TABLE_NAME = 'competition_quiz_answers'
+
+
+def _partitions(connection):
+    return connection.execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass) ORDER BY c.relname"
+    ), {"parent": TABLE_NAME}).scalars().all()
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY no se admite sobre una tabla particionada. Se crea el índice
+    # solo en la tabla padre (queda inválido), luego en cada partición sin bloquear escrituras,
+    # y se adjuntan: cuando todas las particiones tienen el suyo, el índice padre pasa a válido.
+    # Las particiones creadas después lo heredan automáticamente.
+    # Si una creación falla, Postgres deja el índice como INVALID: eliminarlo y volver a correr la migración.
+    connection = op.get_bind()
+    op.execute(
+        f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} "
+        f"ON ONLY {TABLE_NAME} (competition_quiz_id, created_at, id)"
+    )
+    partitions = _partitions(connection)
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_keyset_idx "
+                f"ON {partition} (competition_quiz_id, created_at, id)"
+            )
+
+    for partition in partitions:
+        attached = connection.execute(sa.text(
+            "SELECT 1 FROM pg_inherits WHERE inhrelid = CAST(:child AS regclass)"
+            " AND inhparent = CAST(:parent AS regclass)"
+        ), {"child": f"{partition}_keyset_idx", "parent": INDEX_NAME}).first()
+        if not attached:
+            op.execute(f"ALTER INDEX {INDEX_NAME} ATTACH PARTITION {partition}_keyset_idx")
+
+
+def downgrade():
+    # Eliminar el índice padre elimina también los de las particiones
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
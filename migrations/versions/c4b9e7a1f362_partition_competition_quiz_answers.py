@@ -0,0 +1,117 @@
+"""Partition competition_quiz_answers by competition_id
+
+Revision ID: c4b9e7a1f362
+Revises: 8e51f0c4d2a9
+Create Date: 2026-10-19 12:26:54.104733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4b9e7a1f362'
+down_revision = '8e51f0c4d2a9'
+branch_labels = None
+depends_on = None
+
+
+# Igual que el nombre de CompetitionQuizAnswer.OVERFLOW_PARTITION
+OVERFLOW_PARTITION = 'competition_quiz_answers_overflow'
+
+
+def upgrade():
+    # Una copia grande puede superar el statement_timeout de la app
+    op.execute("SET LOCAL statement_timeout = 0")
+
+    # 1. Apartar la tabla actual (y liberar los nombres de sus índices/constraints)
+    op.execute("ALTER TABLE competition_quiz_answers RENAME TO competition_quiz_answers_legacy")
+    op.execute("ALTER TABLE competition_quiz_answers_legacy RENAME CONSTRAINT uq_quiz_participant_answer TO uq_quiz_participant_answer_legacy")
+    op.execute("ALTER TABLE competition_quiz_answers_legacy RENAME CONSTRAINT competition_quiz_answers_pkey TO competition_quiz_answers_legacy_pkey")
+    op.execute("ALTER INDEX idx_quiz_participant RENAME TO idx_quiz_participant_legacy")
+
+    # 2. Tabla particionada por RANGE (competition_id), reutilizando la secuencia de ids.
+    #    competition_id repite el del quiz: una competencia finalizada se quita con DETACH + DROP.
+    op.execute("""
+        CREATE TABLE competition_quiz_answers (
+            id INTEGER NOT NULL DEFAULT nextval('competition_quiz_answers_id_seq'),
+            competition_id INTEGER NOT NULL,
+            competition_quiz_id INTEGER NOT NULL,
+            participant_id INTEGER NOT NULL,
+            answer_id INTEGER NOT NULL,
+            is_correct BOOLEAN NOT NULL,
+            question_id INTEGER,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            CONSTRAINT competition_quiz_answers_pkey PRIMARY KEY (id, competition_id),
+            CONSTRAINT competition_quiz_answers_competition_quiz_id_fkey FOREIGN KEY (competition_quiz_id) REFERENCES competition_quizzes (id),
+            CONSTRAINT uq_quiz_participant_answer UNIQUE (competition_id, competition_quiz_id, participant_id, question_id)
+        ) PARTITION BY RANGE (competition_id)
+    """)
+    op.execute("CREATE INDEX idx_quiz_participant ON competition_quiz_answers (competition_quiz_id, participant_id)")
+    op.execute("ALTER SEQUENCE competition_quiz_answers_id_seq OWNED BY competition_quiz_answers.id")
+
+    # 3. Una partición por competencia existente y, por encima, la de desborde (sin DEFAULT:
+    #    impediría DETACH CONCURRENTLY). Las de las próximas competencias las crea el job de mantenimiento.
+    op.execute(f"""
+        DO $$
+        DECLARE
+            competition_id INTEGER;
+            next_id INTEGER;
+        BEGIN
+            FOR competition_id IN SELECT id FROM competitions LOOP
+                EXECUTE format(
+                    'CREATE TABLE competition_quiz_answers_c%s PARTITION OF competition_quiz_answers FOR VALUES FROM (%s) TO (%s)',
+                    competition_id, competition_id, competition_id + 1
+                );
+            END LOOP;
+            SELECT GREATEST(
+                COALESCE((SELECT MAX(id) FROM competitions), 0),
+                COALESCE(pg_sequence_last_value(CAST(pg_get_serial_sequence('competitions', 'id') AS regclass)), 0)
+            ) + 1 INTO next_id;
+            EXECUTE format(
+                'CREATE TABLE {OVERFLOW_PARTITION} PARTITION OF competition_quiz_answers FOR VALUES FROM (%s) TO (MAXVALUE)',
+                next_id
+            );
+        END $$
+    """)
+
+    # 4. Copiar los datos (con la competencia de cada quiz) y eliminar la tabla original
+    op.execute("""
+        INSERT INTO competition_quiz_answers (id, competition_id, competition_quiz_id, participant_id, answer_id, is_correct, question_id, created_at)
+        SELECT a.id, q.competition_id, a.competition_quiz_id, a.participant_id, a.answer_id, a.is_correct, a.question_id, a.created_at
+        FROM competition_quiz_answers_legacy a
+        JOIN competition_quizzes q ON q.id = a.competition_quiz_id
+    """)
+    op.execute("DROP TABLE competition_quiz_answers_legacy")
+    op.execute("ANALYZE competition_quiz_answers")
+
+
+def downgrade():
+    op.execute("SET LOCAL statement_timeout = 0")
+    op.execute("ALTER TABLE competition_quiz_answers RENAME TO competition_quiz_answers_partitioned")
+    op.execute("ALTER TABLE competition_quiz_answers_partitioned RENAME CONSTRAINT uq_quiz_participant_answer TO uq_quiz_participant_answer_partitioned")
+    op.execute("ALTER TABLE competition_quiz_answers_partitioned RENAME CONSTRAINT competition_quiz_answers_pkey TO competition_quiz_answers_partitioned_pkey")
+    op.execute("ALTER INDEX idx_quiz_participant RENAME TO idx_quiz_participant_partitioned")
+
+    op.create_table('competition_quiz_answers',
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('competition_quiz_answers_id_seq')"), nullable=False),
+    sa.Column('competition_quiz_id', sa.Integer(), nullable=False),
+    sa.Column('participant_id', sa.Integer(), nullable=False),
+    sa.Column('answer_id', sa.Integer(), nullable=False),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['competition_quiz_id'], ['competition_quizzes.id'], name='competition_quiz_answers_competition_quiz_id_fkey'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('competition_quiz_id', 'participant_id', 'question_id', name='uq_quiz_participant_answer')
+    )
+    op.create_index('idx_quiz_participant', 'competition_quiz_answers', ['competition_quiz_id', 'participant_id'], unique=False)
+    op.execute("ALTER SEQUENCE competition_quiz_answers_id_seq OWNED BY competition_quiz_answers.id")
+
+    op.execute("""
+        INSERT INTO competition_quiz_answers (id, competition_quiz_id, participant_id, answer_id, is_correct, question_id, created_at)
+        SELECT id, competition_quiz_id, participant_id, answer_id, is_correct, question_id, created_at
+        FROM competition_quiz_answers_partitioned
+    """)
+    # Elimina la tabla particionada junto con todas sus particiones
+    op.execute("DROP TABLE competition_quiz_answers_partitioned")
@@ -1,37 +1,74 @@
 import os
 
-from flask import Flask, jsonify
+from flask import Flask, jsonify, Response
 from app.config import config_dict
 from extensions import db, migrate
 from sqlalchemy import text
-from app.utils.commands.cli import seed, init_db
+from app.utils.commands.cli import (
+    seed, init_db, check_plans, purge_answers, maintain_answer_partitions, archive_answers, backfill_question_stats,
+    run_scheduler_command
+)
 from app.routes.competitions import competition_bp
 from app.routes.quizz_participation import quiz_participation_bp
 from app.routes.competition_quiz import competition_quiz_bp
-from app.utils.db import create_database_if_not_exists
+from app.routes.participants import participant_bp
+from app.utils.db import create_database_if_not_exists, run_migrations_and_seeders
+from app.utils.db_pool import register_engine_events, register_pool_gauges, pool_status
+from app.utils.db_routing import init_replicas
+from app.utils.leaderboard_stream import init_leaderboard_stream
+from app.utils.db_queries import init_query_tracking
+from app.utils.metrics import init_request_metrics, render_prometheus, PROMETHEUS_CONTENT_TYPE
 
 from app.utils.errors.handlers import register_error_handlers
+from app.utils.logs.logger_config import setup_logging, parse_log_levels, init_request_logging
 
-from scheduler import start_scheduler
 
-def create_app(config_name='development'):
+def create_app(config_name='development', run_scheduler=None):
+    """
+    Crea la aplicación Flask.
+
+    :param run_scheduler: Si es None se usa RUN_SCHEDULER de la configuración. En producción
+        los workers web no ejecutan jobs: el scheduler corre en su propio proceso (flask run_scheduler).
+    """
     app = Flask(__name__)
     app.config.from_object(config_dict[config_name])
-    print(app.config['SQLALCHEMY_DATABASE_URI'])
+    if run_scheduler is None:
+        run_scheduler = app.config['RUN_SCHEDULER'] == 'si'
+    setup_logging(
+        level=app.config['LOG_LEVEL'],
+        module_levels=parse_log_levels(app.config['LOG_LEVELS']),
+        log_format=app.config['LOG_FORMAT'],
+    )
     db.init_app(app)
     migrate.init_app(app, db)
-
-    # Intentar crear la base de datos si no existe
-    create_database_if_not_exists(app)
+    with app.app_context():
+        register_engine_events(db.engine, app.config)
+        primary_engine = db.engine
+    init_replicas(app)
+    init_leaderboard_stream(app)
+    register_pool_gauges(lambda: {
+        "primary": primary_engine,
+        **{
+            f"replica{index}": engine
+            for index, engine in enumerate(getattr(app.extensions.get('replica_router'), 'engines', []))
+        },
+    })
 
     app.cli.add_command(init_db)
     app.cli.add_command(seed)
+    app.cli.add_command(check_plans)
+    app.cli.add_command(purge_answers)
+    app.cli.add_command(maintain_answer_partitions)
+    app.cli.add_command(archive_answers)
+    app.cli.add_command(backfill_question_stats)
+    app.cli.add_command(run_scheduler_command)
 
     # app.register_blueprint(category_bp, url_prefix='/categories')
     # app.register_blueprint(question_bp, url_prefix='/questions')
     app.register_blueprint(competition_bp, url_prefix='/competitions')
     app.register_blueprint(quiz_participation_bp, url_prefix='/quiz-participation')
     app.register_blueprint(competition_quiz_bp, url_prefix='/competition-quiz')
+    app.register_blueprint(participant_bp, url_prefix='/participants')
 
     @app.route('/')
     def index():
@@ -46,20 +83,29 @@ def create_app(config_name='development'):
         try:
             # Usa text() para declarar la consulta
             db.session.execute(text('SELECT 1'))
-            return jsonify({'status': 'ok', 'message': 'Database connection successful'}), 200
+            return jsonify({'status': 'ok', 'message': 'Database connection successful', 'pool': pool_status(db.engine)}), 200
         except Exception as e:
-            return jsonify({'status': 'error', 'message': str(e)}), 500
-    
+            return jsonify({'status': 'error', 'message': str(e), 'pool': pool_status(db.engine)}), 500
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        # Latencias por ruta, pool de DB y cliente de QA; con gunicorn, sumadas entre todos los workers
+        return Response(render_prometheus(), content_type=PROMETHEUS_CONTENT_TYPE)
 
     # Registra manejadores de errores
     
     register_error_handlers(app)
+    init_request_logging(app)
+    init_query_tracking(app)  # Después del logging: sus campos se suman a la línea de acceso
+    init_request_metrics(app)
 
     # with app.app_context():
     #     start_scheduler()  # Iniciar el scheduler
 
     # Verifica que el scheduler solo se inicie una vez
-    if not hasattr(app, 'scheduler_started'):
+    if run_scheduler and not hasattr(app, 'scheduler_started'):
+        from scheduler import start_scheduler  # APScheduler solo se carga si este proceso corre los jobs
+
         with app.app_context():
             start_scheduler(app)  # 🔹 PASAMOS LA APP
             app.scheduler_started = True
@@ -71,5 +117,9 @@ if __name__ == '__main__':
     env = os.getenv('FLASK_ENV', 'development')
     PORT = os.getenv('COMPETITION_PORT', 5016)
     app = create_app(env)
+    # En desarrollo se mantiene la creación automática; en producción se usa `flask init_db`.
+    # Una base recién creada está vacía: se migra (y se siembra si SEED_DB = 'si') antes de servir.
+    if create_database_if_not_exists(app):
+        run_migrations_and_seeders(app)
     app.run(host='0.0.0.0', port=PORT, debug=True)
 
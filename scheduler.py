@@ -1,17 +1,24 @@
+import logging
+import signal
+import threading
 from datetime import datetime, timezone
+from uuid import uuid4
 from apscheduler.schedulers.background import BackgroundScheduler
 from sqlalchemy import select, and_
 from extensions import db
-from app.models import CompetitionQuiz
-from app.services import CompetitionQuizService
+from app.models import CompetitionQuiz, CompetitionQuizAnswer
+from app.services import CompetitionQuizService, AnswerArchiveService
 from app.utils.lib.constants import CompetitionQuizStatus
+from app.utils.logs.logger_config import log_context
+
+logger = logging.getLogger(__name__)
 
 def check_pending_quizzes(app):
     """Verificación robusta de quizzes pendientes con gestión de contexto"""
-    with app.app_context():
+    with app.app_context(), log_context(f"job-check_pending_quizzes-{uuid4().hex[:8]}"):
         try:
-            print(f"⏰ Iniciando chequeo de quizzes pendientes ({datetime.now(timezone.utc)})")
-            
+            logger.debug("Iniciando chequeo de quizzes pendientes")
+
             # Bloquear registros para procesamiento exclusivo (PostgreSQL/Mysql)
             pending = db.session.execute(
                 select(CompetitionQuiz)
@@ -24,20 +31,43 @@ def check_pending_quizzes(app):
                 .with_for_update(skip_locked=True)  # Solo para bases que soportan SKIP LOCKED
             ).scalars().all()
 
-            print(f"🔍 {len(pending)} quizzes pendientes encontrados")
+            if pending:
+                logger.info("%s quizzes pendientes encontrados", len(pending))
 
             for quiz in pending:
-                print(f"⚙️ Procesando quiz {quiz.id}")
                 if CompetitionQuizService.process_quiz_results(quiz):
-                    print(f"✅ Quiz {quiz.id} procesado exitosamente")
+                    logger.debug("Quiz %s procesado exitosamente", quiz.id)
                 else:
-                    print(f"⚠️ Quiz {quiz.id} falló en procesamiento")
+                    logger.warning("Quiz %s falló en procesamiento", quiz.id)
 
             db.session.commit()
 
-        except Exception as e:
+        except Exception:
+            db.session.rollback()
+            logger.exception("Error catastrófico en scheduler")
+            raise
+
+def archive_finished_answers(app):
+    """Mueve al archivo frío las respuestas de las competencias finalizadas"""
+    with app.app_context(), log_context(f"job-archive_finished_answers-{uuid4().hex[:8]}"):
+        try:
+            archived = AnswerArchiveService.archive_finished_competitions()
+            if archived:
+                logger.info("Respuestas archivadas", extra={"archived": archived})
+        except Exception:
             db.session.rollback()
-            print(f"🚨 Error catastrófico en scheduler: {str(e)}")
+            logger.exception("Error archivando respuestas")
+            raise
+
+def maintain_answer_partitions(app):
+    """Crea por adelantado las particiones de respuestas de las próximas competencias"""
+    with app.app_context(), log_context(f"job-maintain_answer_partitions-{uuid4().hex[:8]}"):
+        try:
+            created = CompetitionQuizAnswer.maintain_partitions(db.session)
+            if created:
+                logger.info("Particiones de respuestas creadas", extra={"created": created})
+        except Exception:
+            logger.exception("Error manteniendo particiones de respuestas")
             raise
 
 def start_scheduler(app):
@@ -52,6 +82,30 @@ def start_scheduler(app):
             max_instances=1,
             coalesce=True
         )
+        scheduler.add_job(
+            lambda: maintain_answer_partitions(app),
+            'interval',
+            minutes=app.config['ANSWERS_PARTITION_INTERVAL_MINUTES'],
+            max_instances=1,
+            coalesce=True
+        )
+        scheduler.add_job(
+            lambda: archive_finished_answers(app),
+            'interval',
+            hours=app.config['ANSWERS_ARCHIVE_INTERVAL_HOURS'],
+            max_instances=1,
+            coalesce=True
+        )
         scheduler.start()
         app.scheduler = scheduler
-        print("🚀 Scheduler iniciado en modo seguro")
\ No newline at end of file
+        logger.info("Scheduler iniciado en modo seguro")
+
+def run_scheduler_forever(app):
+    """Ejecuta solo el scheduler, bloqueando hasta recibir SIGTERM/SIGINT (proceso dedicado)"""
+    start_scheduler(app)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    stop.wait()
+    app.scheduler.shutdown(wait=True)
+    logger.info("Scheduler detenido")
@@ -1,8 +1,13 @@
-# from seeders.seed_categories import seed_categories
-# from seeders.seed_questions import seed_questions
-# from seeders.seed_answers import seed_answers
-
-def run_seeders():
-    print("Iniciando seeders...NO HAGO NADA AUN")
+def run_seeders(**params):
+    """
+    Carga datos sintéticos (ver seeders.synthetic.generate_dataset para los parámetros).
+    Sin parámetros genera un conjunto chico, útil para desarrollo.
+    """
+    from seeders.synthetic import generate_dataset
 
+    print("Iniciando seeders...")
+    counts = generate_dataset(**params)
+    for table, rows in counts.items():
+        print(f"  {table}: {rows} filas")
     print("Seeders completados con éxito.")
+    return counts
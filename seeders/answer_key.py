@@ -0,0 +1,30 @@
+"""
+Clave de respuestas determinística compartida por los datos sintéticos y el QA falso.
+
+Los IDs de preguntas y respuestas pertenecen al microservicio de QA; para poder sembrar datos
+y validar respuestas sin él, ambos lados derivan los mismos IDs de esta función:
+    pregunta n del quiz q       -> q * QUESTION_ID_STRIDE + n
+    respuesta k de la pregunta p -> p * ANSWER_ID_STRIDE + k   (k = 1..ANSWERS_PER_QUESTION)
+"""
+
+QUESTION_ID_STRIDE = 1000
+ANSWER_ID_STRIDE = 10
+ANSWERS_PER_QUESTION = 4
+
+
+def question_ids(quiz_id, count):
+    """IDs de las primeras `count` preguntas del quiz."""
+    base = int(quiz_id) * QUESTION_ID_STRIDE
+    return [base + n for n in range(1, count + 1)]
+
+
+def answer_ids(question_id):
+    """IDs de las opciones de una pregunta."""
+    base = int(question_id) * ANSWER_ID_STRIDE
+    return [base + k for k in range(1, ANSWERS_PER_QUESTION + 1)]
+
+
+def correct_answer_id(question_id):
+    """ID de la opción correcta de una pregunta (repartida entre las opciones, no siempre la primera)."""
+    question_id = int(question_id)
+    return question_id * ANSWER_ID_STRIDE + (question_id * 7919) % ANSWERS_PER_QUESTION + 1
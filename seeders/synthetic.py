@@ -0,0 +1,367 @@
+"""
+Generador de datos sintéticos para pruebas de carga.
+
+Llena las cinco tablas del servicio (competencias × quizzes × participantes × preguntas)
+con distribuciones realistas y las carga con COPY, en una sola transacción.
+"""
+import csv
+import io
+import logging
+import random
+import time
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import text
+from extensions import db
+from app.models import CompetitionQuizAnswer
+from app.utils.lib.constants import CompetitionQuizStatus
+from seeders.answer_key import question_ids, answer_ids, correct_answer_id
+
+logger = logging.getLogger(__name__)
+
+# Tablas en orden de carga (padres antes que hijos) y columnas que se copian
+TABLES = {
+    'competitions': (
+        'id', 'title', 'description', 'state', 'created_by', 'modified_by', 'created_at', 'updated_at',
+        'start_date', 'end_date', 'participant_limit', 'participant_count', 'currency_cost', 'ticket_cost', 'credit_cost',
+    ),
+    'competition_quizzes': (
+        'id', 'competition_id', 'quiz_id', 'time_limit', 'processed', 'status',
+        'start_time', 'end_time', 'created_at', 'updated_at',
+    ),
+    'competition_participants': (
+        'id', 'competition_id', 'participant_id', 'score', 'created_at', 'updated_at',
+    ),
+    'competition_quizzes_participants': (
+        'id', 'competition_quiz_id', 'participant_id', 'score', 'score_competition',
+        'start_time', 'end_time', 'created_at', 'updated_at',
+    ),
+    'competition_quiz_answers': (
+        'id', 'competition_id', 'competition_quiz_id', 'participant_id', 'answer_id', 'is_correct', 'question_id', 'created_at',
+    ),
+}
+
+# Mismos valores que usa el servicio al procesar resultados
+PUNTOS_POR_PUESTO = [10, 8, 6, 5, 4, 3, 2, 1]
+MAX_COMPUTABLE_QUIZZES = 5
+
+STATE_WEIGHTS = (('finalizada', 0.5), ('en curso', 0.25), ('lista', 0.15), ('preparacion', 0.1))
+TIME_LIMIT_WEIGHTS = ((0, 0.1), (60, 0.15), (120, 0.25), (300, 0.3), (600, 0.15), (900, 0.05))
+
+
+class _IdAllocator:
+    """
+    Reserva bloques de IDs de la secuencia de una tabla, para asignarlos en memoria
+    y poder referenciarlos desde las filas hijas antes de copiarlas.
+    """
+    def __init__(self, connection, table, block_size=10000):
+        self.connection = connection
+        self.sequence = connection.execute(
+            text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}
+        ).scalar()
+        self.block_size = block_size
+        self._next = 0
+        self._last = -1
+
+    def next(self):
+        if self._next > self._last:
+            self._last = self.connection.execute(
+                text("SELECT setval(CAST(:seq AS regclass), nextval(CAST(:seq AS regclass)) + :n - 1)"),
+                {"seq": self.sequence, "n": self.block_size}
+            ).scalar()
+            self._next = self._last - self.block_size + 1
+        value = self._next
+        self._next += 1
+        return value
+
+
+class _CopyBuffer:
+    """
+    Acumula filas CSV por tabla y las envía con COPY cada `chunk_rows` filas.
+    Al vaciar se copian todas las tablas en orden, así una fila hija nunca llega antes que su padre.
+    """
+    def __init__(self, cursor, chunk_rows):
+        self.cursor = cursor
+        self.chunk_rows = chunk_rows
+        self.counts = {table: 0 for table in TABLES}
+        self._targets = dict.fromkeys(TABLES)  # Tabla real donde se copia (p. ej. una partición)
+        self._buffers = {}
+        self._writers = {}
+        self._pending = 0
+        for table in TABLES:
+            self._reset(table)
+
+    def _reset(self, table):
+        self._buffers[table] = io.StringIO()
+        self._writers[table] = csv.writer(self._buffers[table])
+
+    def writer(self, table):
+        return self._writers[table]
+
+    def set_target(self, table, target):
+        """Las próximas filas de `table` se copian directamente a `target`."""
+        if self._buffers[table].tell():
+            self.flush()
+        self._targets[table] = target
+
+    def added(self, table, rows=1):
+        self.counts[table] += rows
+        self._pending += rows
+        if self._pending >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        for table, columns in TABLES.items():
+            buffer = self._buffers[table]
+            if buffer.tell() == 0:
+                continue
+            buffer.seek(0)
+            target = self._targets[table] or table
+            self.cursor.copy_expert(f"COPY {target} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            self._reset(table)
+        self._pending = 0
+
+
+def _weighted_choice(rng, weights):
+    values, probabilities = zip(*weights)
+    return rng.choices(values, probabilities)[0]
+
+
+def _sample_users(rng, users, count):
+    """
+    Elige `count` participantes distintos de 1..users, favoreciendo IDs bajos
+    (unos pocos usuarios participan en muchas competencias).
+    """
+    if count * 2 >= users:
+        return rng.sample(range(1, users + 1), count)
+    chosen = set()
+    while len(chosen) < count:
+        chosen.add(int(users * rng.random() ** 1.6) + 1)
+    return list(chosen)
+
+
+def _competition_window(rng, state, now):
+    if state == 'finalizada':
+        end_date = now - timedelta(days=rng.uniform(1, 180))
+        start_date = end_date - timedelta(days=rng.uniform(7, 60))
+    elif state == 'en curso':
+        start_date = now - timedelta(days=rng.uniform(1, 20))
+        end_date = now + timedelta(days=rng.uniform(1, 30))
+    else:
+        start_date = now + timedelta(days=rng.uniform(3, 60))
+        end_date = start_date + timedelta(days=rng.uniform(7, 45))
+    return start_date, end_date
+
+
+def generate_dataset(competitions=10, quizzes=5, participants=100, questions=10, users=None,
+                     seed=42, chunk_rows=200000, state=None):
+    """
+    Genera y carga un conjunto de datos sintético.
+
+    :param competitions: Cantidad de competencias.
+    :param quizzes: Quizzes por competencia.
+    :param participants: Participantes inscriptos por competencia.
+    :param questions: Preguntas por quiz (IDs según seeders.answer_key).
+    :param users: Tamaño del universo de usuarios (por defecto 2 × participants).
+    :param seed: Semilla: con los mismos parámetros se generan los mismos datos.
+    :param chunk_rows: Filas acumuladas en memoria antes de cada COPY.
+    :param state: Estado fijo para todas las competencias (por defecto, una mezcla realista).
+    :return: Dict {tabla: filas insertadas}.
+    """
+    from faker import Faker  # Import perezoso: solo se usa al sembrar
+
+    rng = random.Random(seed)
+    fake = Faker('es_ES')
+    fake.seed_instance(seed)
+    users = max(users or participants * 2, participants)
+    quiz_catalog = max(50, quizzes * 4)
+    now = datetime.now(timezone.utc)
+    started = time.perf_counter()
+
+    with db.engine.begin() as connection:
+        # Una carga grande puede superar el statement_timeout configurado para la app
+        connection.execute(text("SET LOCAL statement_timeout = 0"))
+        cursor = connection.connection.cursor()
+        copy = _CopyBuffer(cursor, chunk_rows)
+        ids = {table: _IdAllocator(connection, table) for table in TABLES}
+        # Solo los ids de competencia que se usan: el job de particiones crea las de los próximos a asignar
+        ids['competitions'] = _IdAllocator(connection, 'competitions', block_size=max(competitions, 1))
+
+        detached = set()  # Competencias cuyas particiones se crearon sueltas en esta carga
+        for _ in range(competitions):
+            _generate_competition(
+                rng, fake, now, connection, copy, ids, detached,
+                quizzes=quizzes, participants=participants, questions=questions,
+                users=users, quiz_catalog=quiz_catalog, state=state,
+            )
+        copy.flush()
+        cursor.close()
+
+        # Las particiones se cargaron sueltas: al adjuntarlas se construyen sus índices y se valida la FK
+        CompetitionQuizAnswer.ensure_partitions(connection, loaded=detached)
+
+    # Estadísticas al día para que el planner use los índices desde la primera consulta
+    with db.engine.connect() as connection:
+        for table in TABLES:
+            connection.execute(text(f"ANALYZE {table}"))
+
+    logger.info(
+        "Datos sintéticos cargados en %.1fs", time.perf_counter() - started,
+        extra={"rows": copy.counts}
+    )
+    return copy.counts
+
+
+def _generate_competition(rng, fake, now, connection, copy, ids, detached, quizzes, participants, questions, users,
+                          quiz_catalog, state=None):
+    """
+    Genera una competencia con sus quizzes, participantes, participaciones y respuestas.
+
+    :param detached: Competencias con partición creada suelta (se agrega esta si hace falta; se adjuntan al final).
+    :return: IDs de los CompetitionQuiz creados.
+    """
+    state = state or _weighted_choice(rng, STATE_WEIGHTS)
+    start_date, end_date = _competition_window(rng, state, now)
+    competition_id = ids['competitions'].next()
+    created_by = rng.randint(1, users)
+    created_at = min(start_date, now) - timedelta(days=rng.uniform(1, 30))
+    participant_limit = rng.choice((0, participants, participants + rng.randint(0, participants)))
+
+    copy.writer('competitions').writerow((
+        competition_id, fake.catch_phrase()[:255], fake.paragraph(nb_sentences=3), state,
+        created_by, None, created_at, created_at, start_date, end_date,
+        participant_limit, participants, rng.choice((0, 50, 100, 200)), rng.choice((0, 0, 1, 2)), rng.choice((0, 0, 5)),
+    ))
+    copy.added('competitions')
+
+    # Quizzes repartidos a lo largo de la competencia
+    slot = (end_date - start_date) / quizzes
+    quiz_rows = []
+    for index, quiz_id in enumerate(rng.sample(range(1, quiz_catalog + 1), quizzes)):
+        start_time = start_date + slot * (index + rng.uniform(0, 0.2))
+        end_time = start_time + slot * rng.uniform(0.5, 0.8)
+        quiz_rows.append([
+            ids['competition_quizzes'].next(), quiz_id, _weighted_choice(rng, TIME_LIMIT_WEIGHTS),
+            start_time, end_time, end_time <= now,
+        ])
+
+    # Los quizzes vencidos ya fueron procesados: los últimos MAX_COMPUTABLE_QUIZZES cuentan para el ranking
+    processed = [row for row in quiz_rows if row[5]]
+    computable_ids = {row[0] for row in processed[-MAX_COMPUTABLE_QUIZZES:]}
+    for competition_quiz_id, quiz_id, time_limit, start_time, end_time, is_processed in quiz_rows:
+        if not is_processed:
+            status = CompetitionQuizStatus.ACTIVO
+        elif competition_quiz_id in computable_ids:
+            status = CompetitionQuizStatus.COMPUTABLE
+        else:
+            status = CompetitionQuizStatus.NO_COMPUTABLE
+        copy.writer('competition_quizzes').writerow((
+            competition_quiz_id, competition_id, quiz_id, time_limit, is_processed, status,
+            start_time, end_time, created_at, end_time if is_processed else created_at,
+        ))
+    copy.added('competition_quizzes', len(quiz_rows))
+
+    # Si el job de mantenimiento todavía no creó la partición, se carga suelta y se adjunta al final
+    partition = CompetitionQuizAnswer.partition_name(competition_id)
+    if not connection.execute(text("SELECT to_regclass(:name)"), {"name": partition}).scalar():
+        CompetitionQuizAnswer.create_detached_partition(connection, competition_id)
+        detached.add(competition_id)
+
+    # Participantes: habilidad (probabilidad de acertar) con distribución beta
+    members = _sample_users(rng, users, participants)
+    skills = {participant_id: rng.betavariate(5, 3) for participant_id in members}
+    competition_scores = dict.fromkeys(members, 0)
+
+    copy.set_target('competition_quiz_answers', partition)
+    for competition_quiz_id, quiz_id, time_limit, start_time, end_time, is_processed in quiz_rows:
+        if start_time > now:
+            continue
+        scores = _generate_quiz_participations(
+            rng, now, copy, ids, competition_id, competition_quiz_id, quiz_id, time_limit, start_time, end_time,
+            members, skills, questions, counts_for_ranking=competition_quiz_id in computable_ids,
+        )
+        for participant_id, points in scores.items():
+            competition_scores[participant_id] += points
+    copy.set_target('competition_quiz_answers', None)
+
+    writer = copy.writer('competition_participants')
+    registration_window = max((min(start_date, now) - created_at).total_seconds(), 1)
+    for participant_id in members:
+        registered_at = created_at + timedelta(seconds=rng.uniform(0, registration_window))
+        writer.writerow((
+            ids['competition_participants'].next(), competition_id, participant_id,
+            competition_scores[participant_id], registered_at, registered_at,
+        ))
+    copy.added('competition_participants', len(members))
+    return [row[0] for row in quiz_rows]
+
+
+def _generate_quiz_participations(rng, now, copy, ids, competition_id, competition_quiz_id, quiz_id, time_limit,
+                                  start_time, end_time, members, skills, questions, counts_for_ranking):
+    """
+    Genera las participaciones y respuestas de un quiz ya iniciado.
+
+    :return: Dict {participant_id: score_competition} (vacío si el quiz no cuenta para el ranking).
+    """
+    quiz_questions = [(question_id, correct_answer_id(question_id), answer_ids(question_id))
+                      for question_id in question_ids(quiz_id, questions)]
+    window = (min(end_time, now) - start_time).total_seconds()
+    # Duración típica: la mitad del límite, o ~15s por pregunta si no hay límite
+    median_duration = time_limit * 0.5 if time_limit else 15 * questions
+
+    answers_writer = copy.writer('competition_quiz_answers')
+    next_answer_id = ids['competition_quiz_answers'].next
+    random_ = rng.random
+    finished = []  # (score, fila) de las participaciones terminadas
+    unfinished = []
+
+    for participant_id in members:
+        if random_() > 0.85:
+            continue  # No jugó este quiz
+        quiz_start = start_time + timedelta(seconds=window * random_() ** 2)  # La mayoría entra temprano
+        duration = rng.lognormvariate(0, 0.5) * median_duration
+        if time_limit:
+            duration = min(duration, time_limit * 0.98)
+        quiz_end = quiz_start + timedelta(seconds=duration)
+        if quiz_end > now or random_() < 0.03:
+            unfinished.append((participant_id, quiz_start))  # En curso o abandonado
+            continue
+
+        skill = skills[participant_id]
+        correct = 0
+        step = timedelta(seconds=duration / (questions + 1))
+        answered_at = quiz_start
+        for question_id, correct_id, options in quiz_questions:
+            answered_at += step
+            if random_() < skill:
+                chosen = correct_id
+                correct += 1
+            else:
+                chosen = options[int(random_() * len(options))]
+            answers_writer.writerow((
+                next_answer_id(), competition_id, competition_quiz_id, participant_id, chosen, chosen == correct_id, question_id, answered_at,
+            ))
+        copy.added('competition_quiz_answers', len(quiz_questions))
+
+        score = correct if time_limit == 0 else int(correct * (time_limit - duration))
+        finished.append((score, participant_id, quiz_start, quiz_end))
+
+    # Puntos de competencia según el puesto (igual que CompetitionQuizService._calculate_results)
+    finished.sort(key=lambda row: row[0], reverse=True)
+    writer = copy.writer('competition_quizzes_participants')
+    points_by_participant = {}
+    for position, (score, participant_id, quiz_start, quiz_end) in enumerate(finished):
+        points = PUNTOS_POR_PUESTO[position] if position < len(PUNTOS_POR_PUESTO) else 1
+        if counts_for_ranking:
+            points_by_participant[participant_id] = points
+        writer.writerow((
+            ids['competition_quizzes_participants'].next(), competition_quiz_id, participant_id,
+            score, points if end_time <= now else 0, quiz_start, quiz_end, quiz_start, quiz_end,
+        ))
+    for participant_id, quiz_start in unfinished:
+        writer.writerow((
+            ids['competition_quizzes_participants'].next(), competition_quiz_id, participant_id,
+            0, 0, quiz_start, None, quiz_start, quiz_start,
+        ))
+    copy.added('competition_quizzes_participants', len(finished) + len(unfinished))
+    return points_by_participant
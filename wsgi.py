@@ -0,0 +1,33 @@
+"""
+Punto de entrada WSGI para producción:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+La app se crea una sola vez en el proceso maestro (preload_app) y los workers la heredan
+por fork (copy-on-write). Los workers web nunca ejecutan el scheduler: corre aparte con
+`flask --app wsgi:app run_scheduler`.
+
+El ranking en vivo (SSE) retiene un hilo por cliente y está desactivado con workers sync.
+Para atenderlo, enrutar /competitions/<id>/ranking/stream a una instancia propia, p. ej.:
+
+    COMPETITION_WEB_WORKERS=2 COMPETITION_WEB_THREADS=64 gunicorn -c gunicorn.conf.py wsgi:app
+"""
+import os
+from sqlalchemy.orm import configure_mappers
+from run import create_app
+
+app = create_app(os.getenv('FLASK_ENV', 'production'), run_scheduler=False)
+
+
+def warmup(application):
+    """
+    Deja resuelto en el maestro todo lo que se calcularía perezosamente en la primera request,
+    para que los workers lo compartan en lugar de repetirlo (y ensuciar páginas) tras el fork.
+    """
+    configure_mappers()
+    application.url_map.update()
+    with application.app_context():
+        application.json.dumps({})
+
+
+warmup(app)